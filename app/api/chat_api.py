@@ -1,4 +1,5 @@
 # app/api/chat_api.py
+import asyncio
 import logging
 from app.services.emotion_service import EmotionService
 from app.services.langchain_rag_service import LangChainRAGService
@@ -16,39 +17,70 @@ class ChatAPI:
     def process_message(self, text: str) -> dict:
         """사용자 입력을 분석하고 응답 생성"""
         if not text or not text.strip():
-            return {
-                "emotion": "none",
-                "similar_cases": [],
-                "response": "메시지를 입력해주세요 😊"
-            }
+            return self._empty_reply()
 
         try:
-            # 1️⃣ 감정 분석
-            emotion_result = self.emotion.analyze(text)
-            
-            # 결과가 dict인지 str인지 확인
-            if isinstance(emotion_result, dict):
-                emotion = emotion_result.get("emotion", "중립")
-            else:
-                emotion = emotion_result
-
-            # 2️⃣ 유사 피드백 검색 (LangChain RAG)
-            similar_cases = self.rag.search_similar_feedback(text, top_k=3)
+            # 1️⃣ 감정 분석 + 2️⃣ 유사 피드백 검색 (LangChain RAG)
+            emotion = self._emotion_label(self.emotion.analyze(text))
+            similar_cases = self._search(text)
 
             # 3️⃣ LangChain으로 응답 생성
-            reply = self.rag.generate_response(text, emotion, similar_cases)
+            return self._reply(text, emotion, similar_cases)
 
-            logger.info(f"CHAT: 응답 생성 완료 — 감정={emotion}, 유사사례={len(similar_cases)}")
-            return {
-                "emotion": emotion,
-                "similar_cases": similar_cases,
-                "response": reply,
-            }
+        except Exception as e:
+            return self._error_reply(e)
+
+    async def aprocess_message(self, text: str) -> dict:
+        """process_message 의 비동기 버전 (추론은 프로세스 풀, 블로킹 I/O 는 스레드)"""
+        if not text or not text.strip():
+            return self._empty_reply()
+
+        try:
+            # 1️⃣ 감정 분석 (프로세스 풀) + 2️⃣ 유사 피드백 검색 (스레드) 동시 실행
+            emotion, similar_cases = await asyncio.gather(
+                self.emotion.aanalyze(text),
+                asyncio.to_thread(self._search, text),
+            )
+
+            # 3️⃣ LangChain으로 응답 생성 (OpenAI 호출 → 스레드)
+            return await asyncio.to_thread(self._reply, text, self._emotion_label(emotion), similar_cases)
 
         except Exception as e:
-            logger.exception(f"❌ ChatAPI 처리 중 오류: {e}")
-            return {
-                "emotion": "error",
-                "similar_cases": [],
-                "response": "⚠️ 대화를 처리하는 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.",
-            }
\ No newline at end of file
+            return self._error_reply(e)
+
+    # ✅ 동기 / 비동기 공통 처리
+    @staticmethod
+    def _emotion_label(result) -> str:
+        """감정 분석 결과가 dict 이면 라벨만 추출"""
+        if isinstance(result, dict):
+            return result.get("emotion", "중립")
+        return result
+
+    def _search(self, text: str) -> list:
+        return self.rag.search_similar_feedback(text, top_k=3)
+
+    def _reply(self, text: str, emotion: str, similar_cases: list) -> dict:
+        reply = self.rag.generate_response(text, emotion, similar_cases)
+        logger.info(f"CHAT: 응답 생성 완료 — 감정={emotion}, 유사사례={len(similar_cases)}")
+        return {
+            "emotion": emotion,
+            "similar_cases": similar_cases,
+            "response": reply,
+        }
+
+    @staticmethod
+    def _empty_reply() -> dict:
+        return {
+            "emotion": "none",
+            "similar_cases": [],
+            "response": "메시지를 입력해주세요 😊"
+        }
+
+    @staticmethod
+    def _error_reply(e: Exception) -> dict:
+        logger.exception(f"❌ ChatAPI 처리 중 오류: {e}")
+        return {
+            "emotion": "error",
+            "similar_cases": [],
+            "response": "⚠️ 대화를 처리하는 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.",
+        }
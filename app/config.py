@@ -26,6 +26,104 @@ class Settings(BaseSettings):
     # ✅ 로깅 (선택적)
     log_level: str | None = "INFO"
 
+    # ✅ 임베딩 백엔드 (openai / local / hashing) — 컬렉션은 만든 백엔드로만 사용 가능
+    #    embedding_openai_dimensions: text-embedding-3-* 는 512 / 256 등으로 줄여 요청 가능 (바꾸면 컬렉션 재생성 필요)
+    embedding_backend: str = "openai"
+    embedding_openai_model: str = "text-embedding-3-small"
+    embedding_openai_dimensions: int = 1536
+    embedding_local_model: str = "jhgan/ko-sroberta-multitask"
+    embedding_local_batch_size: int = 32
+    embedding_hashing_dimensions: int = 256
+
+    # ✅ RAG 중복 피드백 판정 (정확 중복은 항상, SimHash 근사 중복은 선택)
+    rag_near_duplicate_enabled: bool = False
+    rag_near_duplicate_max_distance: int = 3
+
+    # ✅ 벡터 검색 백엔드 (chroma / numpy: 메모리 매핑 행렬 정확 검색, Chroma 는 원본 저장소로 유지)
+    vector_backend: str = "chroma"
+    numpy_index_dir: str = "data/vector_index"
+    # float32 / float16 / int8 (int8 은 상위 후보를 인덱스의 float16 원본으로 재점수,
+    # Chroma 에는 임베딩 없이 문서 / 메타데이터만 별도 컬렉션에 저장)
+    numpy_index_dtype: str = "float32"
+    numpy_index_rescore_factor: int = 4
+
+    # ✅ 문서 수집 청크 (토큰 기준 목표 크기 / 겹침, 임베딩 배치당 청크 수)
+    rag_chunk_tokens: int = 400
+    rag_chunk_overlap_tokens: int = 50
+    rag_ingest_batch_size: int = 256
+
+    # ✅ 문서 추출 프로세스 풀 (0 이면 CPU 코어 수) + 증분 수집 매니페스트
+    ingest_workers: int = 0
+    ingest_pages_per_task: int = 8
+    ingest_manifest_path: str = "data/cache/ingest_manifest.json"
+
+    # ✅ 하이브리드 검색 (BM25 + 벡터, RRF 결합)
+    rag_hybrid_candidates: int = 20
+    rag_rrf_k: int = 60
+    rag_lexical_refresh_seconds: float = 30.0  # 다른 워커 쓰기로 버전이 바뀌었을 때 BM25 재적재 최소 간격
+    rag_chat_search_mode: str = "vector"  # 챗봇(LangChain) 유사 사례 검색 방식: vector / lexical / hybrid
+
+    # ✅ RAG 대량 upsert 배치 크기 (Chroma 최대 배치 크기를 넘지 않게 자동 조정)
+    rag_upsert_batch_size: int = 1000
+
+    # ✅ 컬렉션 파티션 (none / property: 숙소별 / property_year: 숙소 + 연도별)
+    #    검색은 필터에 맞는 파티션만 병렬 조회 후 top-k 병합
+    rag_partition_by: str = "none"
+    rag_default_property: str = "default"
+    rag_partition_search_workers: int = 8
+
+    # ✅ RAG 통계 카운터 (수집/삭제 시 증감, 주기적으로 실제 컬렉션과 재집계)
+    rag_stats_path: str = "data/cache/rag_stats.sqlite"
+    rag_stats_reconcile_minutes: int = 60
+
+    # ✅ 검색 결과 캐시 (컬렉션 버전이 바뀌면 무효화, 버전 파일은 워커 간 공유 — BM25 색인 갱신에도 사용)
+    rag_query_cache_enabled: bool = True
+    rag_query_cache_max_entries: int = 2048
+    rag_query_cache_version_path: str = "data/cache/rag_versions.sqlite"
+    rag_query_cache_time_bucket_seconds: int = 300  # since_days 기준 시각을 이 단위로 내림 (캐시 키 고정)
+
+    # ✅ 임베딩 API 클라이언트 (토큰 기준 배치 + 동시 요청 + 재시도)
+    embedding_max_concurrency: int = 4
+    embedding_max_retries: int = 6
+
+    # ✅ 임베딩 캐시 (SQLite, 두 RAG 스택 공유)
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = "data/cache/embeddings.sqlite"
+
+    # ✅ 감정 분석 모델 (허깅페이스 이름 또는 증류 학생 모델 경로, 예: models/emotion_student)
+    emotion_model_path: str = "WhitePeak/bert-base-cased-Korean-sentiment"
+
+    # ✅ 감정 분석 추론 백엔드 (torch / onnx-fp32 / onnx-int8)
+    emotion_backend: str = "torch"
+    emotion_onnx_dir: str = "models/onnx"
+
+    # ✅ 감정 분석 마이크로 배치
+    emotion_batch_max_size: int = 32
+    emotion_batch_max_wait_ms: float = 10.0
+
+    # ✅ 감정 예측 캐시 (메모리 LRU + 선택적 SQLite)
+    emotion_cache_enabled: bool = True
+    emotion_cache_max_entries: int = 10000
+    emotion_cache_path: str | None = None
+
+    # ✅ 시작 시 모델 워밍업 (시퀀스 길이 버킷별 합성 배치)
+    warmup_enabled: bool = True
+    warmup_seq_lengths: list[int] = [16, 64, 128]
+    warmup_batch_size: int = 8
+
+    # ✅ 추론 프로세스 풀 (0 이면 비활성 → 스레드 추론)
+    inference_pool_size: int = 0
+    inference_threads_per_worker: int = 1
+
+    # ✅ 대량 감정 분석 (길이 버킷 배치)
+    emotion_bulk_batch_size: int = 32
+    emotion_bulk_bucket_batches: int = 8
+    emotion_bulk_max_texts: int = 10000
+
+    # ✅ 긴 문서 슬라이딩 윈도우 (stride = 인접 윈도우가 겹치는 토큰 수)
+    emotion_long_window: int = 128
+    emotion_long_stride: int = 32
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -1,3 +1,5 @@
+import asyncio
+from functools import lru_cache
 from fastapi import APIRouter, Request
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
@@ -13,8 +15,13 @@ async def chat_page(request: Request):
 class ChatRequest(BaseModel):
     message: str
 
+@lru_cache(maxsize=1)
+def get_chat_api() -> ChatAPI:
+    """ChatAPI 는 LLM/벡터스토어 클라이언트를 만들므로 1회만 생성해서 재사용"""
+    return ChatAPI()
+
 @router.post("/chat")
 async def chat(request: ChatRequest):
-    service = ChatAPI()
-    result = service.process_message(request.message)
+    service = await asyncio.to_thread(get_chat_api)
+    result = await service.aprocess_message(request.message)
     return result
@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, Request, Form
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Depends, Request, Form, Body, HTTPException
+from fastapi.responses import HTMLResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 import logging
+import json
 
 from app.database import get_db
 from app.services.emotion_service import analyze_emotion
+from app.services.local_emotion_model import (
+    get_batcher_stats,
+    get_cache_stats,
+    analyze_emotion_local_batch,
+    analyze_emotion_local_long,
+)
 from app.models.user import User
-from app.core.auth_utils import get_current_user_optional
+from app.core.auth_utils import get_current_user_optional, get_current_user
+from app.config import settings
 from app.services.rag_service import RAGService   # ✅ 수정
 from app.models.emotion_log import EmotionLog
 
@@ -19,6 +28,12 @@ templates = Jinja2Templates(directory="app/templates")
 rag_service = RAGService()   # ✅ 수정
 
 
+# ✅ 대량 분석 요청 모델
+class BulkAnalyzeRequest(BaseModel):
+    texts: list[str] = Field(..., min_length=1, description="분석할 문장 목록")
+    long_text: bool = Field(default=False, description="긴 문서 모드 (슬라이딩 윈도우, 윈도우별 점수 포함)")
+
+
 @router.get("/", response_class=HTMLResponse)
 def render_emotion_page(request: Request):
     """감정 분석 페이지"""
@@ -29,6 +44,41 @@ def render_emotion_page(request: Request):
     })
 
 
+@router.get("/stats")
+def emotion_batch_stats():
+    """감정 분석 마이크로 배치 / 예측 캐시 통계"""
+    return {"batcher": get_batcher_stats(), "cache": get_cache_stats()}
+
+
+@router.post("/analyze/batch")
+def handle_bulk_emotion_analysis(
+    request: BulkAnalyzeRequest = Body(...),
+    current_user: User = Depends(get_current_user),
+):
+    """대량 감정 분석 (DB/RAG 저장 없이 NDJSON 스트리밍, 입력 순서 유지)"""
+    if len(request.texts) > settings.emotion_bulk_max_texts:
+        raise HTTPException(
+            status_code=413,
+            detail=f"한 번에 최대 {settings.emotion_bulk_max_texts}건까지 분석할 수 있습니다.",
+        )
+
+    logger.info(f"📦 대량 감정 분석 요청 (user_id={current_user.id}, {len(request.texts)}건)")
+
+    def stream():
+        if request.long_text:
+            group = settings.emotion_bulk_batch_size
+            for offset in range(0, len(request.texts), group):
+                results = analyze_emotion_local_long(request.texts[offset:offset + group])
+                for i, result in enumerate(results):
+                    yield json.dumps({"index": offset + i, **result}, ensure_ascii=False) + "\n"
+            return
+
+        for result in analyze_emotion_local_batch(request.texts):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.post("/analyze", response_class=HTMLResponse)
 def handle_emotion_analysis(
     request: Request,
@@ -79,7 +129,7 @@ def handle_emotion_analysis(
         db.add(log_entry)
 
         # 3️⃣ RAG 저장 (수정됨)
-        rag_service.add_feedback_to_rag(user_id=user_id, feedback_text=text)
+        rag_service.add_feedback_to_rag(user_id=user_id, feedback_text=text, emotion=emotion, source="emotion")
         logger.info(f"🟢 RAG 저장 완료 (user_id={user_id})")
 
         # ✅ 커밋
@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
+from app.services.model_registry import registry
+from app.services.warmup import warmup_state
 import logging
 import datetime
 
@@ -16,6 +19,14 @@ def ping():
         "timestamp": datetime.datetime.utcnow().isoformat() + "Z"  # ✅ 시간 표시
     }
 
+@router.get("/ready")
+def readiness():
+    """모델 워밍업 완료 여부 (완료 전에는 503 → 로드밸런서가 트래픽을 보내지 않음, 실패 시 degraded 로 200)"""
+    state = warmup_state.to_dict()
+    if not warmup_state.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up", **state})
+    return {"status": "degraded" if warmup_state.degraded else "ready", **state}
+
 @router.get("/db")
 def check_database(db: Session = Depends(get_db)):
     """데이터베이스 연결 상태 확인"""
@@ -34,3 +45,9 @@ def check_database(db: Session = Depends(get_db)):
             "message": str(e),
             "checked_at": datetime.datetime.utcnow().isoformat() + "Z"
         }
+
+
+@router.get("/models")
+def model_diagnostics():
+    """프로세스에 로드된 모델과 모델별 메모리 사용량"""
+    return registry.memory_report()
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Literal
 from sqlalchemy.orm import Session
 from app.services.rag_service import RAGService
 from app.routes.auth import get_current_user
@@ -14,11 +16,26 @@ logger = logging.getLogger("soulstay.rag_route")
 # ✅ 요청 모델 정의
 class FeedbackAdd(BaseModel):
     feedback_text: str = Field(..., min_length=1, max_length=1000, description="피드백 내용")
+    property_id: str | None = Field(default=None, max_length=100, description="숙소 id (파티션 / 필터용)")
+
+
+class SearchFilters(BaseModel):
+    emotion: list[str] | None = Field(default=None, description="감정 (positive / negative / neutral)")
+    user_id: int | None = Field(default=None, description="작성자 user_id")
+    source: list[str] | None = Field(default=None, description="출처 (user / api / 파일 이름)")
+    property_id: list[str] | None = Field(default=None, description="숙소 id (해당 숙소 파티션만 검색)")
+    created_after: datetime | None = Field(default=None, description="이 시각 이후 등록")
+    created_before: datetime | None = Field(default=None, description="이 시각 이전 등록")
+    since_days: int | None = Field(default=None, ge=1, le=3650, description="최근 N일")
 
 
 class SearchQuery(BaseModel):
     query: str = Field(..., min_length=1, max_length=500, description="검색 쿼리")
     top_k: int = Field(default=3, ge=1, le=10, description="결과 개수 (1~10)")
+    filters: SearchFilters | None = Field(default=None, description="메타데이터 필터 (벡터DB where 절로 적용)")
+    mode: Literal["vector", "lexical", "hybrid"] = Field(
+        default="vector", description="검색 방식 (vector / lexical: BM25, 임베딩 호출 없음 / hybrid: RRF 결합)"
+    )
 
 
 # ✅ 피드백 추가
@@ -30,7 +47,9 @@ def add_feedback(
 ):
     """새로운 피드백을 RAG 벡터DB에 추가"""
     try:
-        rag_service.add_feedback_to_rag(user_id=current_user.id, feedback_text=request.feedback_text)
+        rag_service.add_feedback_to_rag(
+            user_id=current_user.id, feedback_text=request.feedback_text, source="api", property_id=request.property_id
+        )
         logger.info(f"🆕 RAG 피드백 추가 — user_id={current_user.id}")
         return {"message": "✅ 피드백이 벡터DB에 저장되었습니다."}
     except Exception as e:
@@ -49,7 +68,10 @@ def search_feedback(
 ):
     """유사 피드백 검색"""
     try:
-        results = rag_service.search_similar_feedback(query=request.query, top_k=request.top_k)
+        filters = request.filters.model_dump(exclude_none=True) if request.filters else None
+        results = rag_service.search_similar_feedback(
+            query=request.query, top_k=request.top_k, filters=filters, mode=request.mode
+        )
         return {"count": len(results), "results": results}
     except Exception as e:
         logger.exception(f"❌ 유사 피드백 검색 실패: {e}")
@@ -57,3 +79,17 @@ def search_feedback(
             status_code=500,
             detail=f"검색 실패: {type(e).__name__} - {e}",
         )
+
+
+# ✅ RAG 통계
+@router.get("/stats")
+def rag_stats(current_user: User = Depends(get_current_user)):
+    """출처 / 감정 / 사용자별 문서 수와 인덱스 디스크 사용량 (수집 시 갱신되는 카운터 조회)"""
+    return rag_service.get_rag_stats()
+
+
+# ✅ 검색 결과 캐시 통계
+@router.get("/cache")
+def query_cache_stats(current_user: User = Depends(get_current_user)):
+    """검색 결과 캐시 적중률과 절약된 검색 시간"""
+    return rag_service.get_query_cache_stats()
@@ -0,0 +1,178 @@
+# app/services/chunker.py
+import io
+import re
+import csv
+from typing import Iterable, Iterator
+
+# 문장 경계 (문장부호 뒤 공백, 줄바꿈)
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        import tiktoken
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """임베딩 모델 기준 토큰 수 (cl100k_base)"""
+    return len(_get_encoding().encode(text))
+
+
+def _sentences(text: str) -> Iterator[tuple[int, str]]:
+    """(문자 오프셋, 문장) 순회"""
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        if match.start() > start:
+            yield start, text[start:match.start()]
+        start = match.end()
+    if start < len(text):
+        yield start, text[start:]
+
+
+def _split_long(offset: int, sentence: str, max_tokens: int) -> Iterator[tuple[int, str, int]]:
+    """
+    목표 토큰 수보다 긴 문장은 토큰 단위로 잘라서 (오프셋, 조각, 토큰 수) 반환
+
+    조각 경계는 문자 경계에 맞춤 (한 글자가 여러 토큰으로 나뉘어도 깨진 문자 없이 원문 그대로),
+    오프셋은 조각마다 원문 기준으로 증가
+    """
+    encoding = _get_encoding()
+    tokens = encoding.encode(sentence)
+    if len(tokens) <= max_tokens:
+        yield offset, sentence, len(tokens)
+        return
+    raw = sentence.encode("utf-8")
+    byte_end = char_start = 0
+    for start in range(0, len(tokens), max_tokens):
+        piece = tokens[start:start + max_tokens]
+        byte_end += len(encoding.decode_bytes(piece))
+        char_end = len(raw[:byte_end].decode("utf-8", errors="ignore"))
+        if char_end > char_start:
+            yield offset + char_start, sentence[char_start:char_end], len(piece)
+            char_start = char_end
+
+
+def chunk_prose(
+    pages: Iterable[str],
+    source: str,
+    target_tokens: int = 400,
+    overlap_tokens: int = 50,
+) -> Iterator[dict]:
+    """
+    문서(페이지 단위 텍스트)를 토큰 수 기준 청크로 나눔 (스트리밍)
+
+    - 문장 단위로 target_tokens 까지 채우고, 다음 청크는 직전 문장들 overlap_tokens 만큼 겹쳐서 시작
+    - 메타데이터: source / chunk_index / page(시작 페이지) / char_start(페이지 내 오프셋) / tokens
+    """
+    window: list[tuple[int, int, str, int]] = []  # (page, offset, text, tokens)
+    window_tokens = 0
+    index = 0
+
+    def emit():
+        page, offset = window[0][0], window[0][1]
+        return {
+            "text": " ".join(piece for _, _, piece, _ in window),
+            "metadata": {
+                "source": source,
+                "chunk_index": index,
+                "page": page,
+                "char_start": offset,
+                "tokens": window_tokens,
+            },
+        }
+
+    for page_no, page_text in enumerate(pages, start=1):
+        for offset, sentence in _sentences(page_text or ""):
+            offset += len(sentence) - len(sentence.lstrip())
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            for piece_offset, piece, n in _split_long(offset, sentence, target_tokens):
+                if window and window_tokens + n > target_tokens:
+                    yield emit()
+                    index += 1
+                    # 겹침: 뒤에서부터 overlap_tokens 안에 드는 문장만 남김
+                    tail, tail_tokens = [], 0
+                    for item in reversed(window):
+                        if tail_tokens + item[3] > overlap_tokens:
+                            break
+                        tail.insert(0, item)
+                        tail_tokens += item[3]
+                    if tail_tokens + n > target_tokens:
+                        tail, tail_tokens = [], 0
+                    window, window_tokens = tail, tail_tokens
+                window.append((page_no, piece_offset, piece, n))
+                window_tokens += n
+
+    # 청크를 내보낸 직후엔 항상 새 문장이 추가되므로 남은 window 는 새 내용을 포함
+    if window:
+        yield emit()
+
+
+def _csv_line(values) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(["" if v is None else v for v in values])
+    return buffer.getvalue().rstrip("\r\n")
+
+
+def chunk_table(
+    header: list[str],
+    rows: Iterable[list],
+    source: str,
+    target_tokens: int = 400,
+) -> Iterator[dict]:
+    """
+    표(CSV) 행들을 토큰 수 기준 행 묶음 청크로 나눔 (스트리밍)
+
+    - 각 청크 맨 앞에 헤더 줄을 반복 → 청크만 봐도 컬럼 의미를 알 수 있음
+    - 메타데이터: source / chunk_index / row_start / row_end(미포함) / tokens
+    """
+    header_line = _csv_line(header)
+    header_tokens = count_tokens(header_line)
+    lines: list[str] = []
+    tokens = header_tokens
+    row_start = 0
+    index = 0
+
+    def emit(row_end: int):
+        return {
+            "text": "\n".join([header_line, *lines]),
+            "metadata": {
+                "source": source,
+                "chunk_index": index,
+                "row_start": row_start,
+                "row_end": row_end,
+                "tokens": tokens,
+            },
+        }
+
+    row_no = 0
+    for row_no, row in enumerate(rows):
+        line = _csv_line(row)
+        n = count_tokens(line) + 1
+        if lines and tokens + n > target_tokens:
+            yield emit(row_no)
+            index += 1
+            lines, tokens, row_start = [], header_tokens, row_no
+        lines.append(line)
+        tokens += n
+
+    if lines:
+        yield emit(row_no + 1)
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    """스트림을 size 개씩 묶음 (전체를 메모리에 올리지 않음)"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,95 @@
+# app/services/document_extraction.py
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+logger = logging.getLogger("soulstay.document_extraction")
+
+
+# ✅ 워커 프로세스에서 실행되는 함수 (pickle 가능하도록 모듈 최상위에 정의)
+def _pdf_page_count(path: str) -> int | None:
+    from PyPDF2 import PdfReader
+    try:
+        return len(PdfReader(path).pages)
+    except Exception:
+        return None
+
+
+def _extract_pdf_pages(path: str, start: int, end: int) -> list[str] | None:
+    """PDF 의 [start, end) 페이지 텍스트"""
+    from PyPDF2 import PdfReader
+    try:
+        reader = PdfReader(path)
+        return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+    except Exception:
+        return None
+
+
+def _extract_docx(path: str) -> list[str] | None:
+    """DOCX 는 페이지 개념이 없으므로 문단 전체를 한 페이지로 반환"""
+    from docx import Document
+    try:
+        doc = Document(path)
+        return ["\n".join(p.text for p in doc.paragraphs if p.text.strip())]
+    except Exception:
+        return None
+
+
+def _is_pdf(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() == ".pdf"
+
+
+def extract_documents(
+    paths: list[str],
+    max_workers: int | None = None,
+    pages_per_task: int = 8,
+) -> Iterator[tuple[str, list[str] | None]]:
+    """
+    PDF / DOCX 텍스트 병렬 추출
+
+    - PDF 는 pages_per_task 페이지 단위 작업으로 나눠 프로세스 풀에 분배 (큰 파일 1개도 병렬 처리)
+    - 결과는 파일 순서대로 (경로, 페이지 텍스트 리스트) 반환, 읽기 실패 시 None
+    """
+    if not paths:
+        return
+
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pdfs = [p for p in paths if _is_pdf(p)]
+        page_counts = dict(zip(pdfs, pool.map(_pdf_page_count, pdfs)))
+
+        tasks = {}
+        for path in paths:
+            if not _is_pdf(path):
+                tasks[path] = [pool.submit(_extract_docx, path)]
+            elif page_counts.get(path) is None:
+                tasks[path] = None
+            else:
+                total = page_counts[path]
+                tasks[path] = [
+                    pool.submit(_extract_pdf_pages, path, start, min(start + pages_per_task, total))
+                    for start in range(0, total, pages_per_task)
+                ]
+
+        for path in paths:
+            futures = tasks[path]
+            if futures is None:
+                logger.error(f"❌ PDF 읽기 실패: {path}")
+                yield path, None
+                continue
+
+            pages: list[str] = []
+            failed = False
+            for future in futures:
+                result = future.result()
+                if result is None:
+                    failed = True
+                    break
+                pages.extend(result)
+
+            if failed:
+                logger.error(f"❌ 문서 읽기 실패: {path}")
+                yield path, None
+            else:
+                yield path, pages
@@ -0,0 +1,180 @@
+# app/services/embedding_backends.py
+import re
+import hashlib
+import logging
+import numpy as np
+from app.services.embedding_client import EmbeddingClient, ProgressCallback
+from app.services.model_registry import registry
+
+logger = logging.getLogger("soulstay.embedding_backends")
+
+# ✅ 지원 백엔드
+BACKENDS = ("openai", "local", "hashing")
+
+
+class EmbeddingBackend:
+    """
+    임베딩 백엔드 공통 인터페이스
+
+    - name / model / dimensions 는 컬렉션 메타데이터에 기록되어 백엔드 혼용을 막는 데 사용
+    - cacheable 이 False 면 디스크 임베딩 캐시를 거치지 않음 (캐시보다 계산이 더 빠른 경우)
+    """
+
+    name = "base"
+    cacheable = True
+
+    def __init__(self, model: str, dimensions: int | None = None):
+        self.model = model
+        self._dimensions = dimensions
+
+    @property
+    def dimensions(self) -> int:
+        return self._dimensions
+
+    def embed(self, texts: list[str], progress: ProgressCallback | None = None) -> list[list[float]]:
+        raise NotImplementedError
+
+    def describe(self) -> dict:
+        return {"backend": self.name, "model": self.model, "dimensions": self.dimensions}
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """
+    OpenAI 임베딩 API (토큰 기준 배치 + 동시 요청 클라이언트 사용)
+
+    text-embedding-3-* 는 API dimensions 파라미터로 짧은 벡터(예: 512 / 256)를 받아 저장 공간을 줄일 수 있음
+    """
+
+    name = "openai"
+
+    def __init__(self, client, model: str, dimensions: int, max_concurrency: int = 4, max_retries: int = 6):
+        super().__init__(model, dimensions)
+        shortenable = model.startswith("text-embedding-3")
+        if not shortenable and dimensions != 1536:
+            raise ValueError(f"{model} 은 dimensions 를 지원하지 않습니다 (1536 고정, 요청: {dimensions})")
+        self.client = EmbeddingClient(
+            client,
+            model=model,
+            dimensions=dimensions if shortenable else None,
+            max_concurrency=max_concurrency,
+            max_retries=max_retries,
+        )
+
+    def embed(self, texts, progress=None):
+        return self.client.embed(texts, progress)
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """
+    로컬 한국어 문장 임베딩 (sentence-transformers, CPU)
+
+    - 모델은 레지스트리로 프로세스당 1회만 로드
+    - batch_size 단위로 인코딩, L2 정규화된 벡터 반환
+    """
+
+    name = "local"
+
+    def __init__(self, model: str, batch_size: int = 32):
+        super().__init__(model)
+        self.batch_size = batch_size
+        self._registry_key = f"embedding:{model}"
+        registry.register(
+            self._registry_key,
+            lambda: self._load(model),
+            description=f"로컬 문장 임베딩 ({model})",
+            warmup=lambda m: m.encode(["워밍업 문장입니다."], batch_size=1),
+        )
+
+    @staticmethod
+    def _load(model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        logger.info(f"🔄 로컬 임베딩 모델 로딩 중: {model_name}")
+        return SentenceTransformer(model_name, device="cpu")
+
+    def _get_model(self):
+        return registry.get(self._registry_key)
+
+    @property
+    def dimensions(self) -> int:
+        if self._dimensions is None:
+            self._dimensions = int(self._get_model().get_sentence_embedding_dimension())
+        return self._dimensions
+
+    def embed(self, texts, progress=None):
+        if not texts:
+            return []
+        model = self._get_model()
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            encoded = model.encode(
+                batch,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+            vectors.extend(encoded.astype(np.float32).tolist())
+            if progress:
+                progress(len(vectors), len(texts))
+        return vectors
+
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    결정적 해싱 임베딩 (테스트 / 벤치마크용)
+
+    - 단어 + 문자 n-gram 을 blake2b 로 차원에 사상 (부호 해싱), L2 정규화
+    - 모델 / 네트워크 없이 같은 입력엔 항상 같은 벡터
+    """
+
+    name = "hashing"
+    cacheable = False
+
+    def __init__(self, dimensions: int = 256, ngram: int = 3):
+        super().__init__(f"hashing-char{ngram}", dimensions)
+        self.ngram = ngram
+
+    def _features(self, text: str) -> list[str]:
+        text = " ".join(text.lower().split())
+        features = _TOKEN.findall(text)
+        padded = f" {text} "
+        features.extend(padded[i:i + self.ngram] for i in range(max(0, len(padded) - self.ngram + 1)))
+        return features
+
+    def _vector(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dimensions] += 1.0 if (value >> 63) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def embed(self, texts, progress=None):
+        vectors = [self._vector(t).tolist() for t in texts]
+        if progress and texts:
+            progress(len(texts), len(texts))
+        return vectors
+
+
+def create_embedding_backend(settings, openai_client=None) -> EmbeddingBackend:
+    """Settings.embedding_backend 에 맞는 백엔드 생성"""
+    name = settings.embedding_backend
+    if name == "openai":
+        return OpenAIEmbeddingBackend(
+            openai_client,
+            model=settings.embedding_openai_model,
+            dimensions=settings.embedding_openai_dimensions,
+            max_concurrency=settings.embedding_max_concurrency,
+            max_retries=settings.embedding_max_retries,
+        )
+    if name == "local":
+        return LocalEmbeddingBackend(settings.embedding_local_model, settings.embedding_local_batch_size)
+    if name == "hashing":
+        return HashingEmbeddingBackend(settings.embedding_hashing_dimensions)
+    raise ValueError(f"지원하지 않는 임베딩 백엔드입니다: {name} (지원: {', '.join(BACKENDS)})")
@@ -0,0 +1,105 @@
+# app/services/embedding_cache.py
+import os
+import sqlite3
+import hashlib
+import logging
+import threading
+import numpy as np
+from typing import Callable
+
+logger = logging.getLogger("soulstay.embedding_cache")
+
+# SQLite 한 쿼리당 바인딩 변수 제한을 넘지 않도록 조회 단위 제한
+_LOOKUP_CHUNK = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    디스크 기반 임베딩 캐시 (SQLite)
+
+    - 키: (모델, 차원, sha256(텍스트))
+    - 여러 워커 / 두 RAG 스택(rag_service, LangChain)이 같은 파일을 공유
+    - 배치 중 캐시에 없는 텍스트만 임베딩 함수로 전달
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, dims INTEGER NOT NULL, hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL, PRIMARY KEY (model, dims, hash))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, model: str, dims: int, hashes: list[str]) -> dict[str, list[float]]:
+        """해시 목록 중 캐시에 있는 것만 {hash: vector} 로 반환"""
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            for i in range(0, len(hashes), _LOOKUP_CHUNK):
+                chunk = hashes[i:i + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND dims = ? AND hash IN ({placeholders})",
+                    (model, dims, *chunk),
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model: str, dims: int, items: dict[str, list[float]]) -> None:
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, dims, hash, vector) VALUES (?, ?, ?, ?)",
+                [(model, dims, h, np.asarray(v, dtype=np.float32).tobytes()) for h, v in items.items()],
+            )
+            self._conn.commit()
+
+    def embed(
+        self,
+        texts: list[str],
+        model: str,
+        dims: int,
+        embed_fn: Callable[[list[str]], list[list[float]]],
+    ) -> list[list[float]]:
+        """캐시 우선 임베딩 — 미스(중복 제거)만 embed_fn 으로 계산 후 저장, 입력 순서대로 반환"""
+        hashes = [text_hash(t) for t in texts]
+        cached = self.get_many(model, dims, list(set(hashes)))
+
+        missing: dict[str, str] = {}
+        for h, t in zip(hashes, texts):
+            if h not in cached and h not in missing:
+                missing[h] = t
+
+        self.hits += len(texts) - sum(1 for h in hashes if h in missing)
+        self.misses += len(missing)
+
+        if missing:
+            vectors = embed_fn(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self.put_many(model, dims, computed)
+            cached.update(computed)
+            logger.info(f"🧮 임베딩 캐시: 요청 {len(texts)}개 중 {len(missing)}개만 API 호출")
+
+        return [cached[h] for h in hashes]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
@@ -0,0 +1,216 @@
+# app/services/embedding_client.py
+import re
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import openai
+
+logger = logging.getLogger("soulstay.embedding_client")
+
+# ✅ OpenAI 임베딩 API 제한 (요청당)
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_REQUEST = 300_000
+MAX_TOKENS_PER_INPUT = 8191
+
+_RETRYABLE = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def _parse_duration(value: str | None) -> float | None:
+    """'1s', '6m0s', '250ms', '2' 형태의 헤더 값을 초 단위로 변환"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _UNIT_SECONDS[unit] for n, unit in parts)
+
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """rate limit 응답 헤더에서 재시도 대기 시간 추출"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_ms = headers.get("retry-after-ms")
+    if retry_ms:
+        try:
+            return float(retry_ms) / 1000.0
+        except ValueError:
+            pass
+
+    candidates = [
+        _parse_duration(headers.get("retry-after")),
+        _parse_duration(headers.get("x-ratelimit-reset-requests")),
+        _parse_duration(headers.get("x-ratelimit-reset-tokens")),
+    ]
+    candidates = [c for c in candidates if c is not None]
+    return max(candidates) if candidates else None
+
+
+class EmbeddingClient:
+    """
+    토큰 수 기준 배치 + 동시 요청 임베딩 클라이언트
+
+    - 입력을 요청당 토큰/개수 제한 안에서 묶어서 전송 (너무 긴 입력은 토큰 한도에서 자름)
+    - 최대 max_concurrency 개 요청을 동시에 실행 (BoundedSemaphore)
+    - rate limit / 일시 오류는 지수 백오프 + 지터로 재시도, 응답 헤더의 대기 시간 준수
+    - 결과는 항상 입력 순서대로 반환
+    """
+
+    def __init__(
+        self,
+        client: openai.OpenAI,
+        model: str,
+        dimensions: int | None = None,
+        max_tokens_per_request: int = MAX_TOKENS_PER_REQUEST,
+        max_inputs_per_request: int = MAX_INPUTS_PER_REQUEST,
+        max_concurrency: int = 4,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        # 재시도는 이 클래스에서 직접 처리
+        self.client = client.with_options(max_retries=0)
+        self.model = model
+        self.dimensions = dimensions
+        self.max_tokens_per_request = max_tokens_per_request
+        self.max_inputs_per_request = min(max_inputs_per_request, MAX_INPUTS_PER_REQUEST)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._encoding = None
+
+    # ✅ 토큰화
+    def _get_encoding(self):
+        if self._encoding is None:
+            import tiktoken
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+        return self._encoding
+
+    def _prepare(self, text: str) -> tuple[str, int]:
+        """입력 1개의 토큰 수 계산 (입력당 한도를 넘으면 잘라냄)"""
+        encoding = self._get_encoding()
+        tokens = encoding.encode(text or " ")
+        if len(tokens) > MAX_TOKENS_PER_INPUT:
+            logger.warning(f"⚠️ 임베딩 입력이 {len(tokens)} 토큰 — {MAX_TOKENS_PER_INPUT} 토큰으로 자름")
+            tokens = tokens[:MAX_TOKENS_PER_INPUT]
+            return encoding.decode(tokens), len(tokens)
+        return text or " ", len(tokens)
+
+    def plan_batches(self, texts: list[str]) -> list[tuple[list[int], list[str]]]:
+        """토큰 수 / 입력 개수 한도 안에서 (원래 인덱스, 텍스트) 배치 구성"""
+        batches = []
+        indices, inputs, tokens = [], [], 0
+        for i, text in enumerate(texts):
+            prepared, n_tokens = self._prepare(text)
+            if inputs and (tokens + n_tokens > self.max_tokens_per_request
+                           or len(inputs) >= self.max_inputs_per_request):
+                batches.append((indices, inputs))
+                indices, inputs, tokens = [], [], 0
+            indices.append(i)
+            inputs.append(prepared)
+            tokens += n_tokens
+        if inputs:
+            batches.append((indices, inputs))
+        return batches
+
+    # ✅ 단일 요청 (재시도 포함)
+    def _request(self, inputs: list[str]) -> list[list[float]]:
+        kwargs = {"model": self.model, "input": inputs}
+        if self.dimensions:
+            kwargs["dimensions"] = self.dimensions
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._semaphore:
+                    response = self.client.embeddings.create(**kwargs)
+                data = sorted(response.data, key=lambda item: item.index)
+                return [item.embedding for item in data]
+            except _RETRYABLE as e:
+                if attempt >= self.max_retries:
+                    raise
+                backoff = min(self.max_delay, self.base_delay * (2 ** attempt))
+                delay = random.uniform(0, backoff)
+                hinted = retry_after_seconds(e)
+                if hinted is not None:
+                    # 헤더 값도 max_delay 를 넘지 않게 (잘못된 / 아주 긴 reset 값으로 작업이 멈추지 않도록)
+                    delay = max(delay, min(hinted, self.max_delay))
+                logger.warning(
+                    f"⚠️ 임베딩 요청 재시도 {attempt + 1}/{self.max_retries} "
+                    f"({type(e).__name__}, {delay:.2f}s 대기)"
+                )
+                time.sleep(delay)
+
+    # ✅ 전체 임베딩
+    def embed(self, texts: list[str], progress: ProgressCallback | None = None) -> list[list[float]]:
+        """여러 텍스트 임베딩 — 입력 순서대로 반환, progress(완료 수, 전체 수) 호출"""
+        if not texts:
+            return []
+
+        batches = self.plan_batches(texts)
+        results: list[list[float] | None] = [None] * len(texts)
+        done = 0
+        done_lock = threading.Lock()
+
+        def run(batch):
+            nonlocal done
+            indices, inputs = batch
+            vectors = self._request(inputs)
+            for i, vector in zip(indices, vectors):
+                results[i] = vector
+            with done_lock:
+                done += len(indices)
+                current = done
+            if progress:
+                progress(current, len(texts))
+
+        if len(batches) == 1:
+            run(batches[0])
+        else:
+            logger.info(f"🧮 임베딩 {len(texts)}개 → {len(batches)}개 요청 (동시 {self.max_concurrency}개)")
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                # result() 로 첫 실패를 그대로 전파
+                for future in [executor.submit(run, b) for b in batches]:
+                    future.result()
+
+        return results
+
+
+def logging_progress(label: str, step_ratio: float = 0.1) -> ProgressCallback:
+    """수집 스크립트용 진행률 콜백 (약 step_ratio 간격으로 로그 출력)"""
+    state = {"next": 0.0}
+    lock = threading.Lock()
+
+    def callback(done: int, total: int):
+        ratio = done / total if total else 1.0
+        with lock:
+            if ratio < state["next"] and done < total:
+                return
+            state["next"] = ratio + step_ratio
+        logger.info(f"📈 {label}: {done}/{total} ({ratio:.0%})")
+
+    return callback
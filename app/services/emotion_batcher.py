@@ -0,0 +1,156 @@
+# app/services/emotion_batcher.py
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Any
+
+logger = logging.getLogger("soulstay.emotion_batcher")
+
+
+class _Request:
+    """대기열에 들어가는 개별 요청 (입력 + 결과 Future + 도착 시각)"""
+
+    __slots__ = ("item", "future", "enqueued_at")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    동시 요청을 모아 한 번의 배치 추론으로 처리하는 마이크로 배치 스케줄러
+
+    - max_batch_size 개가 모이거나 max_wait_ms 가 지나면 즉시 flush
+    - batch_fn(list) → list 결과를 순서대로 각 호출자의 Future 에 전달
+    - 배치 크기 / 대기 시간 통계 제공
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+        name: str = "emotion",
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._reset_stats()
+
+    # ✅ 요청 제출
+    def submit(self, item: Any) -> Future:
+        """단일 입력을 대기열에 넣고 Future 반환"""
+        self._ensure_worker()
+        request = _Request(item)
+        self._queue.put(request)
+        return request.future
+
+    def predict(self, item: Any, timeout: float | None = None) -> Any:
+        """단일 입력을 배치 경유로 처리하고 결과를 기다림"""
+        return self.submit(item).result(timeout=timeout)
+
+    # ✅ 통계
+    def get_stats(self) -> dict:
+        """배치 크기 / 대기열 대기 시간 통계"""
+        with self._lock:
+            batches = self._batches
+            requests = self._requests
+            return {
+                "name": self.name,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "total_batches": batches,
+                "total_requests": requests,
+                "avg_batch_size": (requests / batches) if batches else 0.0,
+                "max_observed_batch_size": self._max_batch,
+                "avg_queue_wait_ms": (self._wait_sum / requests * 1000.0) if requests else 0.0,
+                "max_queue_wait_ms": self._wait_max * 1000.0,
+                "avg_batch_latency_ms": (self._latency_sum / batches * 1000.0) if batches else 0.0,
+                "pending": self._queue.qsize(),
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._reset_stats()
+
+    def _reset_stats(self):
+        self._batches = 0
+        self._requests = 0
+        self._max_batch = 0
+        self._wait_sum = 0.0
+        self._wait_max = 0.0
+        self._latency_sum = 0.0
+
+    # ✅ 워커 스레드
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name=f"{self.name}-batcher", daemon=True
+                )
+                self._worker.start()
+                logger.info(
+                    f"🧵 마이크로 배치 워커 시작 ({self.name}, "
+                    f"max_batch={self.max_batch_size}, wait={self.max_wait * 1000:.1f}ms)"
+                )
+
+    def _collect(self) -> List[_Request]:
+        """첫 요청을 기다린 뒤, 크기 또는 대기 시간 한도까지 추가 요청 수집"""
+        batch = [self._queue.get()]
+        deadline = batch[0].enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                # 대기 시간이 지났어도 이미 쌓여 있는 요청은 함께 처리
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            try:
+                results = self.batch_fn([r.item for r in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"배치 결과 개수 불일치 (입력 {len(batch)}개, 결과 {len(results)}개)"
+                    )
+                for request, result in zip(batch, results):
+                    request.future.set_result(result)
+            except Exception as e:
+                logger.exception(f"❌ 배치 추론 실패 ({self.name}, size={len(batch)}): {e}")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+            finally:
+                self._record(batch, started)
+
+    def _record(self, batch: List[_Request], started: float):
+        finished = time.perf_counter()
+        waits = [started - r.enqueued_at for r in batch]
+        with self._lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._max_batch = max(self._max_batch, len(batch))
+            self._wait_sum += sum(waits)
+            self._wait_max = max(self._wait_max, max(waits))
+            self._latency_sum += finished - started
@@ -0,0 +1,135 @@
+# app/services/emotion_onnx.py
+import os
+import re
+import inspect
+import logging
+import numpy as np
+import torch
+
+logger = logging.getLogger("soulstay.emotion_onnx")
+
+# ✅ 지원 백엔드
+BACKENDS = ("torch", "onnx-fp32", "onnx-int8")
+OPSET_VERSION = 17
+
+# torch 2.5+ 는 dynamo 기반 export 가 생기고 2.9 부터 기본값 → onnxscript 없이 쓰던 TorchScript 방식으로 고정
+_EXPORT_KWARGS = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+
+
+def _artifact_dir(base_dir: str, model_name: str, revision: str | None) -> str:
+    """모델 이름 + 리비전 기준 캐시 디렉토리 (리비전이 바뀌면 새로 export)"""
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    return os.path.join(base_dir, safe_name, revision or "main")
+
+
+def _temp_path(path: str) -> str:
+    """같은 디렉토리의 임시 경로 (완성된 파일만 os.replace 로 옮겨 중단 / 동시 export 시 깨진 파일 방지)"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.tmp-{os.getpid()}{ext}"
+
+
+def export_onnx(model, tokenizer, out_path: str) -> str:
+    """PyTorch 모델을 ONNX(fp32)로 1회 export (배치/시퀀스 길이는 동적 축)"""
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp_path = _temp_path(out_path)
+
+    sample = tokenizer(["샘플 문장입니다."], return_tensors="pt")
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    model.eval()
+    try:
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (dict(sample),),
+                tmp_path,
+                input_names=input_names,
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                opset_version=OPSET_VERSION,
+                do_constant_folding=True,
+                **_EXPORT_KWARGS,
+            )
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    logger.info(f"📦 ONNX export 완료: {out_path}")
+    return out_path
+
+
+def quantize_onnx(fp32_path: str, int8_path: str) -> str:
+    """ONNX Runtime 동적 int8 양자화 (가중치 int8, 활성값은 런타임 양자화)"""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    tmp_path = _temp_path(int8_path)
+    try:
+        quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, int8_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    logger.info(f"📦 ONNX int8 양자화 완료: {int8_path}")
+    return int8_path
+
+
+def get_onnx_artifact(backend: str, model, tokenizer, model_name: str, base_dir: str,
+                      revision: str | None = None) -> str:
+    """
+    백엔드에 맞는 ONNX 파일 경로 반환 (없으면 export/양자화 후 디스크에 캐시)
+    """
+    if backend not in ("onnx-fp32", "onnx-int8"):
+        raise ValueError(f"ONNX 백엔드가 아닙니다: {backend}")
+
+    revision = revision or getattr(model.config, "_commit_hash", None)
+    artifact_dir = _artifact_dir(base_dir, model_name, revision)
+    fp32_path = os.path.join(artifact_dir, "model.onnx")
+    int8_path = os.path.join(artifact_dir, "model.int8.onnx")
+
+    if not os.path.exists(fp32_path):
+        export_onnx(model, tokenizer, fp32_path)
+
+    if backend == "onnx-fp32":
+        return fp32_path
+
+    if not os.path.exists(int8_path):
+        quantize_onnx(fp32_path, int8_path)
+    return int8_path
+
+
+class OnnxEmotionSession:
+    """ONNX Runtime 추론 세션 (CPU)"""
+
+    def __init__(self, onnx_path: str, intra_op_threads: int | None = None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+
+        self.path = onnx_path
+        self.session = ort.InferenceSession(
+            onnx_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        logger.info(f"✅ ONNX Runtime 세션 생성 완료 ({onnx_path})")
+
+    def logits(self, encoded) -> np.ndarray:
+        """토크나이저 출력(np 또는 pt) → logits (np.ndarray)"""
+        feeds = {}
+        for name in self.input_names:
+            value = encoded[name]
+            if isinstance(value, torch.Tensor):
+                value = value.numpy()
+            feeds[name] = value.astype(np.int64)
+        return self.session.run(["logits"], feeds)[0]
+
+
+def create_onnx_session(backend: str, model, tokenizer, model_name: str, base_dir: str,
+                        revision: str | None = None) -> OnnxEmotionSession:
+    """백엔드 설정에 맞는 ONNX 세션 생성 (artifact 캐시 재사용)"""
+    path = get_onnx_artifact(backend, model, tokenizer, model_name, base_dir, revision)
+    return OnnxEmotionSession(path)
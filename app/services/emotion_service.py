@@ -1,28 +1,30 @@
 import logging
-from transformers import pipeline
-from app.services.local_emotion_model import analyze_emotion_local
+from app.services.local_emotion_model import analyze_emotion_local, predict_emotion
+from app.services.inference_pool import inference_pool
 
 logger = logging.getLogger("soulstay.emotion")
 
-# 모델 1회만 로드
-_model = pipeline(
-    "sentiment-analysis",
-    model="WhitePeak/bert-base-cased-Korean-sentiment",
-    device=-1
-)
+# 로컬 모델 라벨 → 응답 생성기용 영문 라벨
+_LABEL_MAP = {"긍정": "positive", "부정": "negative", "중립": "neutral"}
+
 
 class EmotionService:
-    """Hugging Face BERT 기반 감정 분석 서비스"""
+    """Hugging Face BERT 기반 감정 분석 서비스 (마이크로 배치 경유)"""
 
     def analyze(self, text: str) -> str:
+        """감정 라벨 (positive / negative / neutral), 추론 실패 시 error"""
+        try:
+            result = predict_emotion(text)
+            return _LABEL_MAP.get(result.get("emotion"), "neutral")
+        except Exception:
+            logger.exception("❌ 감정 분석 오류")
+            return "error"
+
+    async def aanalyze(self, text: str) -> str:
+        """비동기 버전 — 추론 프로세스 풀에서 실행되어 이벤트 루프를 막지 않음"""
         try:
-            result = _model(text)[0]
-            label = result["label"].lower()
-            if "pos" in label:
-                return "positive"
-            elif "neg" in label:
-                return "negative"
-            return "neutral"
+            result = await inference_pool.analyze(text)
+            return _LABEL_MAP.get(result.get("emotion"), "neutral")
         except Exception:
             logger.exception("❌ 감정 분석 오류")
             return "error"
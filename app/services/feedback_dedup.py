@@ -0,0 +1,176 @@
+# app/services/feedback_dedup.py
+import re
+import hashlib
+import logging
+import threading
+from app.services.prediction_cache import normalize_text
+
+logger = logging.getLogger("soulstay.feedback_dedup")
+
+SIMHASH_BITS = 64
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def content_hash(text: str) -> str:
+    """정확 중복 판정용 해시 (정규화된 텍스트의 sha256)"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def feedback_id(text: str, *scope) -> str:
+    """
+    콘텐츠 주소 기반 문서 id (같은 텍스트 → 항상 같은 id, 동시 작업자 간 충돌 없음)
+
+    scope: 숙소 id 등 — 주어지면 같은 텍스트라도 scope 별로 다른 문서 (None / 빈 값은 무시)
+    """
+    digest = content_hash(text)
+    parts = [str(part) for part in scope if part is not None and part != ""]
+    if parts:
+        digest = hashlib.sha256("\x00".join([digest, *parts]).encode("utf-8")).hexdigest()
+    return f"fb_{digest[:32]}"
+
+
+def simhash(text: str, ngram: int = 3) -> int:
+    """문자 n-gram SimHash (64bit) — 공백/문장부호 차이는 무시, 비슷한 문장은 해밍 거리가 작음"""
+    text = _NON_WORD.sub("", normalize_text(text).lower())
+    if len(text) < ngram:
+        grams = [text]
+    else:
+        grams = [text[i:i + ngram] for i in range(len(text) - ngram + 1)]
+
+    weights = [0] * SIMHASH_BITS
+    for gram in grams:
+        value = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "little")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (value >> bit) & 1 else -1
+
+    result = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            result |= 1 << bit
+    return result
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def find_exact_duplicate(col, hash_value: str, scope: dict | None = None) -> str | None:
+    """
+    content_hash 메타데이터로 기존 문서 조회 (임베딩 계산 없음), 있으면 id 반환
+
+    scope: 함께 일치해야 하는 메타데이터 (예: {"property_id": "a"} → 같은 숙소 안에서만 중복 판정)
+    """
+    clauses = [{"content_hash": hash_value}] + [{key: value} for key, value in (scope or {}).items()]
+    where = clauses[0] if len(clauses) == 1 else {"$and": clauses}
+    existing = col.get(where=where, limit=1, include=[])
+    ids = existing.get("ids") if existing else None
+    return ids[0] if ids else None
+
+
+class SimHashIndex:
+    """
+    SimHash 근사 중복 인덱스 (메모리)
+
+    - 64bit 를 (max_distance + 1) 개 밴드로 나눠 밴드 값별 버킷에 보관
+    - 해밍 거리 max_distance 이하인 두 해시는 비둘기집 원리로 최소 한 밴드가 일치
+      → 같은 버킷 후보만 거리 계산
+    - scope(예: 숙소 id)가 다르면 서로 중복으로 보지 않음
+    - doc_id 와 함께 추가한 해시는 remove(ids) 로 개별 삭제 (같은 해시를 여러 문서가 쓰면 참조 수로 관리)
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = SIMHASH_BITS // self.bands
+        # 밴드별 (scope, 밴드 값) → {해시: 참조 수}
+        self._buckets: list[dict[tuple, dict[int, int]]] = [{} for _ in range(self.bands)]
+        self._entries: dict[str, tuple[int, object]] = {}  # doc_id → (해시, scope)
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def _band_values(self, value: int):
+        mask = (1 << self.band_bits) - 1
+        for band in range(self.bands):
+            yield band, (value >> (band * self.band_bits)) & mask
+
+    def add(self, value: int, scope=None, doc_id: str | None = None) -> None:
+        with self._lock:
+            if doc_id is not None:
+                previous = self._entries.get(doc_id)
+                if previous == (value, scope):
+                    return
+                if previous is not None:
+                    self._discard(*previous)
+                self._entries[doc_id] = (value, scope)
+            for band, key in self._band_values(value):
+                bucket = self._buckets[band].setdefault((scope, key), {})
+                bucket[value] = bucket.get(value, 0) + 1
+
+    def _discard(self, value: int, scope) -> None:
+        for band, key in self._band_values(value):
+            bucket = self._buckets[band].get((scope, key))
+            if not bucket or value not in bucket:
+                continue
+            bucket[value] -= 1
+            if bucket[value] == 0:
+                del bucket[value]
+                if not bucket:
+                    del self._buckets[band][(scope, key)]
+
+    def remove(self, ids: list[str]) -> None:
+        """삭제된 문서의 해시 제거 (doc_id 와 함께 추가된 것만)"""
+        with self._lock:
+            for doc_id in ids:
+                entry = self._entries.pop(doc_id, None)
+                if entry is not None:
+                    self._discard(*entry)
+
+    def find(self, value: int, scope=None) -> int | None:
+        """같은 scope 에서 거리 max_distance 이하인 기존 해시 반환 (없으면 None)"""
+        with self._lock:
+            for band, key in self._band_values(value):
+                for candidate in self._buckets[band].get((scope, key), ()):
+                    if hamming_distance(candidate, value) <= self.max_distance:
+                        return candidate
+        return None
+
+    def load_from_collection(self, col, scope_key: str | None = None) -> None:
+        """컬렉션 메타데이터의 simhash 값으로 인덱스 1회 구성 (scope_key: scope 로 쓸 메타데이터 키)"""
+        if self.loaded:
+            return
+        records = col.get(include=["metadatas"])
+        count = 0
+        for doc_id, metadata in zip(records.get("ids") or [], records.get("metadatas") or []):
+            metadata = metadata or {}
+            value = metadata.get("simhash")
+            if value:
+                self.add(int(value, 16), metadata.get(scope_key) if scope_key else None, doc_id)
+                count += 1
+        self.loaded = True
+        logger.info(f"🧬 SimHash 인덱스 구성 완료 ({count}개)")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets = [{} for _ in range(self.bands)]
+            self._entries = {}
+        self.loaded = False
+
+
+class DuplicateStats:
+    """수집 중 건너뛴 중복 피드백 카운터"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.exact = 0
+        self.near = 0
+
+    def record(self, kind: str, count: int = 1) -> None:
+        with self._lock:
+            if kind == "exact":
+                self.exact += count
+            else:
+                self.near += count
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"exact": self.exact, "near": self.near, "total": self.exact + self.near}
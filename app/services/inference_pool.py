@@ -0,0 +1,121 @@
+# app/services/inference_pool.py
+import os
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from app.config import settings
+from app.services import local_emotion_model as lem
+
+logger = logging.getLogger("soulstay.inference_pool")
+
+
+# ✅ 워커 프로세스 측 함수 (fork 이후 실행)
+def _init_worker(num_threads: int):
+    """워커별 torch 스레드 수 제한 (코어 과다 점유 방지) + 부모에서 물려받은 스레드 / 연결 상태 초기화"""
+    import torch
+
+    lem.reset_after_fork()
+
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # 부모에서 이미 병렬 작업이 시작된 경우 변경 불가 — intra-op 설정만 적용
+        pass
+    os.environ["OMP_NUM_THREADS"] = str(num_threads)
+
+
+def _predict_in_worker(texts: list[str]) -> list[str]:
+    return lem._predict_batch(texts)
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+class InferencePool:
+    """
+    프로세스 풀 기반 감정 분석 추론 서비스
+
+    - 부모 프로세스에서 모델을 먼저 로드한 뒤 fork → 가중치를 copy-on-write 로 공유
+    - 배치 스케줄러 / 예측 캐시(SQLite)는 fork 후 워커에서 새로 만듦 (lem.reset_after_fork)
+    - async 라우트는 Future 를 await 하므로 이벤트 루프가 막히지 않음
+    - fork 를 지원하지 않는 환경(Windows 등)이나 size=0 이면 스레드로 대체
+    """
+
+    def __init__(self, size: int, threads_per_worker: int = 1):
+        self.size = max(0, size)
+        self.threads_per_worker = max(1, threads_per_worker)
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        """모델 로드 후 워커 프로세스 fork"""
+        if self.running or self.size == 0:
+            return
+        if "fork" not in multiprocessing.get_all_start_methods():
+            logger.warning("⚠️ fork 미지원 환경 — 프로세스 풀 비활성화 (스레드 추론 사용)")
+            return
+
+        tokenizer, model = lem.get_emotion_model()
+        if model is None:
+            logger.warning("⚠️ 감정 분석 모델이 없어 프로세스 풀을 시작하지 않습니다.")
+            return
+        lem._get_onnx_session()
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker,),
+        )
+        # 워커를 지금 바로 fork 해두어 첫 요청이 프로세스 생성 비용을 내지 않도록 함
+        pids = set(f.result() for f in [self._executor.submit(_noop) for _ in range(self.size * 2)])
+        logger.info(
+            f"🚀 추론 프로세스 풀 시작 (workers={self.size}, "
+            f"threads/worker={self.threads_per_worker}, pids={sorted(pids)})"
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            logger.info("🛑 추론 프로세스 풀 종료")
+
+    async def analyze_batch(self, texts: list[str]) -> list[str]:
+        """여러 문장 라벨 예측 (워커 프로세스 또는 스레드에서 실행)"""
+        if not self.running:
+            return await asyncio.to_thread(lem._predict_batch, texts)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _predict_in_worker, texts)
+
+    def _predict_one(self, text: str) -> str:
+        """워커 프로세스에서 한 문장 예측 (결과가 나올 때까지 대기)"""
+        return self._executor.submit(_predict_in_worker, [text]).result()[0]
+
+    async def analyze(self, text: str) -> dict:
+        """predict_emotion 과 같은 형식의 결과를 비동기로 반환 (추론 오류는 예외로 전달)"""
+        if not self.running:
+            return await asyncio.to_thread(lem.predict_emotion, text)
+
+        if not text or not text.strip():
+            return {"emotion": "중립", "reason": "입력이 비어있습니다."}
+
+        # 캐시 조회(SQLite) 와 워커 결과 대기 모두 블로킹 → 스레드에서 실행
+        emotion = await asyncio.to_thread(lem.cached_predict, text, self._predict_one)
+        return {
+            "emotion": emotion,
+            "reason": f"Hugging Face 모델({lem.MODEL_PATH}, {lem.active_backend()}) 예측 결과",
+        }
+
+
+# ✅ 전역 풀 (main.py lifespan 에서 start/shutdown)
+inference_pool = InferencePool(
+    size=settings.inference_pool_size,
+    threads_per_worker=settings.inference_threads_per_worker,
+)
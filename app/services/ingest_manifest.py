@@ -0,0 +1,101 @@
+# app/services/ingest_manifest.py
+import os
+import json
+import time
+import hashlib
+import logging
+
+logger = logging.getLogger("soulstay.ingest_manifest")
+
+_HASH_BLOCK = 1 << 20
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """
+    수집 매니페스트 (JSON): 경로 → (크기, mtime, 내용 해시, 생성된 청크 id)
+
+    - 크기 + mtime 이 같으면 파일을 열지 않고 변경 없음으로 판단
+    - 크기 / mtime 이 달라도 내용 해시가 같으면 변경 없음 (stat 만 갱신)
+    - 변경된 파일은 새 청크를 넣은 뒤 예전 청크 id 를 지울 수 있도록 id 목록 보관
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ 매니페스트를 읽지 못해 새로 만듭니다 ({path}): {e}")
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.abspath(path)
+
+    def classify(self, paths: list[str]) -> tuple[dict[str, dict], list[str]]:
+        """
+        파일들을 변경 / 미변경으로 분류
+
+        Returns:
+            (변경된 파일 → 새 지문 {"size", "mtime_ns", "sha256"}, 변경 없는 파일 목록)
+        """
+        changed, unchanged = {}, []
+        for path in paths:
+            stat = os.stat(path)
+            entry = self.entries.get(self._key(path))
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                unchanged.append(path)
+                continue
+
+            fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_hash(path)}
+            if entry and entry["sha256"] == fingerprint["sha256"]:
+                entry.update(size=fingerprint["size"], mtime_ns=fingerprint["mtime_ns"])
+                unchanged.append(path)
+            else:
+                changed[path] = fingerprint
+        return changed, unchanged
+
+    def record(self, path: str, fingerprint: dict, chunk_ids: list[str] | None = None) -> list[str]:
+        """수집 완료 기록, 이 파일의 예전 청크 id 반환"""
+        key = self._key(path)
+        previous = (self.entries.get(key) or {}).get("chunk_ids", [])
+        self.entries[key] = {**fingerprint, "chunk_ids": chunk_ids or [], "ingested_at": int(time.time())}
+        return previous
+
+    def forget(self, path: str) -> list[str]:
+        """매니페스트에서 제거, 이 파일의 청크 id 반환"""
+        entry = self.entries.pop(self._key(path), None) or {}
+        return entry.get("chunk_ids", [])
+
+    def missing(self, paths: list[str], directory: str | None = None) -> list[str]:
+        """
+        매니페스트에는 있지만 이번 목록에 없는(삭제 / 이름 변경된) 파일
+
+        directory: 주어지면 이 폴더 안의 항목만 비교 (같은 매니페스트를 쓰는 다른 폴더의 파일은 제외)
+        """
+        current = {self._key(p) for p in paths}
+        prefix = os.path.join(self._key(directory), "") if directory else ""
+        return [key for key in self.entries if key.startswith(prefix) and key not in current]
+
+    def referenced_ids(self) -> set[str]:
+        """다른 파일이 아직 쓰는 청크 id (같은 내용의 청크는 id 가 같음)"""
+        ids = set()
+        for entry in self.entries.values():
+            ids.update(entry.get("chunk_ids", []))
+        return ids
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
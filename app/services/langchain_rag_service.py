@@ -1,19 +1,21 @@
 import logging
 from typing import List, Dict
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_chroma import Chroma
+from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
-from langchain_core.documents import Document
-from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from app.config import settings
-import csv
+from app.services import rag_service
 
 logger = logging.getLogger("soulstay.langchain_rag")
 
 
 class LangChainRAGService:
-    """LangChain 기반 RAG 서비스"""
+    """
+    LangChain 기반 RAG 서비스 (응답 생성은 LCEL 체인)
+
+    적재 / 추가 / 검색은 rag_service 를 그대로 사용 → 같은 문서 id·메타데이터 형식,
+    NumPy / BM25 / SimHash 색인, 통계 카운터, 검색 캐시가 한 경로로 갱신됨
+    """
 
     def __init__(self):
         # OpenAI LLM 초기화
@@ -23,19 +25,6 @@ class LangChainRAGService:
             openai_api_key=settings.OPENAI_API_KEY
         )
         
-        # OpenAI Embeddings 초기화
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            openai_api_key=settings.OPENAI_API_KEY
-        )
-        
-        # ChromaDB vectorstore 초기화
-        self.vectorstore = Chroma(
-            collection_name="feedback_embeddings",
-            embedding_function=self.embeddings,
-            persist_directory=settings.CHROMA_DB_PATH
-        )
-        
         # 프롬프트 템플릿 정의
         self.prompt_template = PromptTemplate(
             input_variables=["customer_feedback", "emotion", "similar_cases"],
@@ -61,85 +50,20 @@ class LangChainRAGService:
         
         logger.info("✅ LangChain RAG 서비스 초기화 완료")
 
-    def load_feedback_csv(self, csv_path: str):
-        """CSV에서 피드백 데이터를 읽어 vectorstore에 추가"""
-        try:
-            # 기존 데이터 삭제
-            try:
-                self.vectorstore.delete_collection()
-                self.vectorstore = Chroma(
-                    collection_name="feedback_embeddings",
-                    embedding_function=self.embeddings,
-                    persist_directory=settings.CHROMA_DB_PATH
-                )
-                logger.info("🗑️ 기존 vectorstore 초기화")
-            except:
-                pass
-
-            # CSV 읽기
-            documents = []
-            with open(csv_path, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for i, row in enumerate(reader):
-                    if row.get("text"):
-                        doc = Document(
-                            page_content=row["text"].strip(),
-                            metadata={"id": f"fb_{i}", "emotion": row.get("emotion", "neutral")}
-                        )
-                        documents.append(doc)
-
-            if not documents:
-                logger.warning("⚠️ CSV 파일이 비어있습니다.")
-                return
-
-            # Vectorstore에 추가
-            self.vectorstore.add_documents(documents)
-            logger.info(f"✅ {len(documents)}개의 피드백을 vectorstore에 추가 완료")
-
-        except FileNotFoundError:
-            logger.error(f"❌ CSV 파일을 찾을 수 없습니다: {csv_path}")
-        except Exception as e:
-            logger.exception(f"❌ CSV 로드 중 오류 발생: {e}")
+    def load_feedback_csv(self, csv_path: str, rebuild: bool = False):
+        """CSV 피드백을 벡터DB 와 동기화 (바뀐 행만 임베딩, rebuild=True 면 이 CSV 문서를 지우고 재적재)"""
+        return rag_service.load_feedback_csv(csv_path, rebuild=rebuild)
 
-    def add_feedback_to_rag(self, user_id: int, feedback_text: str):
-        """새로운 피드백 추가"""
-        try:
-            if not feedback_text.strip():
-                logger.warning("⚠️ 빈 피드백은 추가하지 않습니다.")
-                return
-
-            doc = Document(
-                page_content=feedback_text.strip(),
-                metadata={"id": f"fb_user_{user_id}", "user_id": user_id}
-            )
-            
-            self.vectorstore.add_documents([doc])
-            logger.info(f"🆕 새로운 피드백 추가 완료 (user_id={user_id})")
+    def add_feedback_to_rag(self, user_id: int, feedback_text: str, emotion: str | None = None, source: str = "user",
+                            property_id: str | None = None):
+        """새로운 피드백 추가 (중복 체크 포함, emotion / source / property_id 는 검색 필터용 메타데이터)"""
+        return rag_service.add_feedback_to_rag(user_id, feedback_text, emotion, source, property_id)
 
-        except Exception as e:
-            logger.exception(f"❌ 새 피드백 추가 실패: {e}")
-
-    def search_similar_feedback(self, query: str, top_k: int = 3) -> List[Dict]:
-        """유사한 피드백 검색"""
-        try:
-            if not query.strip():
-                logger.warning("⚠️ 빈 쿼리로 검색 요청됨.")
-                return []
-
-            # Vectorstore에서 유사 문서 검색
-            results = self.vectorstore.similarity_search_with_score(query, k=top_k)
-            
-            matches = [
-                {"text": doc.page_content, "score": float(score)}
-                for doc, score in results
-            ]
-
-            logger.info(f"🔍 유사 피드백 {len(matches)}개 검색 완료")
-            return matches
-
-        except Exception as e:
-            logger.exception(f"❌ 유사 피드백 검색 실패: {e}")
-            return []
+    def search_similar_feedback(self, query: str, top_k: int = 3, filters: Dict | None = None) -> List[Dict]:
+        """유사한 피드백 검색 (검색 방식은 settings.rag_chat_search_mode, 결과 캐시는 rag_service 와 공유)"""
+        return rag_service.search_similar_feedback(
+            query, top_k, filters=filters, mode=settings.rag_chat_search_mode
+        )
 
     def generate_response(self, customer_feedback: str, emotion: str, similar_cases: List[Dict]) -> str:
         """LangChain LCEL을 사용하여 응답 생성"""
@@ -171,11 +95,8 @@ class LangChainRAGService:
             return responses.get(emotion, "피드백 감사드립니다.")
 
     def get_rag_status(self) -> Dict:
-        """RAG 상태 확인"""
-        try:
-            # Collection의 문서 개수 확인
-            count = len(self.vectorstore.get()['ids']) if self.vectorstore.get()['ids'] else 0
-            return {"total_documents": count}
-        except Exception as e:
-            logger.exception(f"RAG 상태 확인 실패: {e}")
-            return {"error": str(e)}
\ No newline at end of file
+        """RAG 상태 확인 (문서 수 + 카운터 기반 세부 통계, 전체 문서를 읽지 않음)"""
+        status = rag_service.get_rag_status()
+        if "error" not in status:
+            status["stats"] = rag_service.get_rag_stats()
+        return status
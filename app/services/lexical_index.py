@@ -0,0 +1,224 @@
+# app/services/lexical_index.py
+import re
+import math
+import time
+import logging
+import threading
+from collections import Counter
+from app.services.prediction_cache import normalize_text
+from app.services.rag_filters import matches_where
+
+logger = logging.getLogger("soulstay.lexical_index")
+
+# 숫자·영문 덩어리와 그 외(한글 등) 덩어리를 분리 → "1203호" 는 "1203" + "호"
+_TOKEN = re.compile(r"[0-9a-z]+|[^\W0-9a-z_]+", re.UNICODE)
+_ASCII_TOKEN = re.compile(r"^[0-9a-z]+$")
+
+
+def analyze(text: str, ngram_sizes: tuple[int, ...] = (2, 3)) -> list[str]:
+    """
+    BM25 용어 추출
+
+    - 한국어: 어절별 문자 n-gram (조사/어미가 붙어도 "미니바", "룸서비스" 가 매칭되도록)
+    - 숫자 / 영문 토큰(객실 번호 등)은 통째로도 용어로 사용
+    """
+    terms = []
+    for token in _TOKEN.findall(normalize_text(text).lower()):
+        if _ASCII_TOKEN.match(token) or len(token) < min(ngram_sizes):
+            terms.append(token)
+            continue
+        for n in ngram_sizes:
+            terms.extend(token[i:i + n] for i in range(len(token) - n + 1))
+    return terms
+
+
+class BM25Index:
+    """
+    프로세스 내 BM25 역색인 (네트워크 / 임베딩 호출 없음)
+
+    - 용어 → {문서 번호: tf} 포스팅, 문서별 길이 / 용어 빈도 보관 (삭제·갱신 지원)
+    - 벡터 컬렉션에서 1회 적재 후 수집 시점에 함께 갱신
+    - version: 색인이 반영한 컬렉션 버전 (query_cache.CollectionVersion)
+      → 자기 쓰기는 advance 로 버전만 올리고, 다른 워커의 쓰기로 버전이 달라지면
+        백그라운드에서 다시 적재 (그동안 예전 색인으로 검색, 재적재는 refresh_seconds 에 최대 1회)
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, refresh_seconds: float = 30.0):
+        self.k1 = k1
+        self.b = b
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self.loaded = False
+        self.version: int | None = None
+        self._reloading = False
+        self._reloaded_at = float("-inf")
+        self._reset()
+
+    _INDEX_STATE = (
+        "_postings", "_doc_terms", "_doc_len", "_slot_of", "_ids", "_texts", "_metadatas", "_next_slot", "_total_len",
+    )
+
+    def _reset(self) -> None:
+        self._postings: dict[str, dict[int, int]] = {}
+        self._doc_terms: dict[int, Counter] = {}
+        self._doc_len: dict[int, int] = {}
+        self._slot_of: dict[str, int] = {}
+        self._ids: dict[int, str] = {}
+        self._texts: dict[int, str] = {}
+        self._metadatas: dict[int, dict] = {}
+        self._next_slot = 0
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    # ✅ 쓰기
+    def _remove_slot(self, slot: int) -> None:
+        for term in self._doc_terms.pop(slot):
+            postings = self._postings[term]
+            postings.pop(slot, None)
+            if not postings:
+                del self._postings[term]
+        self._total_len -= self._doc_len.pop(slot)
+        del self._slot_of[self._ids.pop(slot)]
+        self._texts.pop(slot)
+        self._metadatas.pop(slot)
+
+    def add(self, ids: list[str], texts: list[str], metadatas: list[dict] | None = None) -> None:
+        """문서 추가 (같은 id 는 교체)"""
+        metadatas = metadatas or [{}] * len(ids)
+        with self._lock:
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                if doc_id in self._slot_of:
+                    self._remove_slot(self._slot_of[doc_id])
+                slot = self._next_slot
+                self._next_slot += 1
+
+                terms = Counter(analyze(text or ""))
+                for term, tf in terms.items():
+                    self._postings.setdefault(term, {})[slot] = tf
+                length = sum(terms.values())
+                self._doc_terms[slot] = terms
+                self._doc_len[slot] = length
+                self._total_len += length
+                self._slot_of[doc_id] = slot
+                self._ids[slot] = doc_id
+                self._texts[slot] = text
+                self._metadatas[slot] = metadata or {}
+
+    def update_metadata(self, ids: list[str], metadatas: list[dict]) -> None:
+        with self._lock:
+            for doc_id, metadata in zip(ids, metadatas):
+                slot = self._slot_of.get(doc_id)
+                if slot is not None:
+                    self._metadatas[slot] = metadata or {}
+
+    def remove(self, ids: list[str]) -> None:
+        with self._lock:
+            for doc_id in ids:
+                slot = self._slot_of.get(doc_id)
+                if slot is not None:
+                    self._remove_slot(slot)
+
+    # ✅ 컬렉션 동기화
+    def load_from_collection(self, col, version: int | None = None, batch_size: int = 1000) -> None:
+        """컬렉션 전체 문서로 다시 적재 (새 색인을 따로 만든 뒤 교체 → 적재 중에도 기존 색인으로 검색 가능)"""
+        started = time.perf_counter()
+        fresh = BM25Index(self.k1, self.b)
+        total = col.count()
+        for offset in range(0, total, batch_size):
+            page = col.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+            if not page["ids"]:
+                break
+            fresh.add(page["ids"], page["documents"], page["metadatas"])
+        with self._lock:
+            for key in self._INDEX_STATE:
+                setattr(self, key, getattr(fresh, key))
+            self.loaded = True
+            self.version = version
+            self._reloaded_at = time.monotonic()
+        logger.info(f"📚 BM25 색인 적재 완료 ({len(self)}개, 버전 {version}, {time.perf_counter() - started:.2f}s)")
+
+    def _reload_in_background(self, col, version: int | None) -> None:
+        try:
+            self.load_from_collection(col, version)
+        except Exception as e:
+            logger.exception(f"❌ BM25 색인 재적재 실패 (기존 색인 유지): {e}")
+        finally:
+            with self._lock:
+                self._reloading = False
+
+    def ensure_fresh(self, col, version: int | None = None) -> None:
+        """
+        처음 사용 시 적재 (동기), 이후 컬렉션 버전이 색인 버전과 다르면 백그라운드 재적재
+        (요청 경로에서는 버전 조회만 함, 재적재가 끝날 때까지는 예전 색인으로 검색)
+        """
+        if not self.loaded:
+            self.load_from_collection(col, version)
+            return
+        with self._lock:
+            if version == self.version or self._reloading:
+                return
+            if time.monotonic() - self._reloaded_at < self.refresh_seconds:
+                return
+            self._reloading = True
+        threading.Thread(
+            target=self._reload_in_background, args=(col, version), name="bm25-reload", daemon=True
+        ).start()
+
+    def advance(self, version: int) -> None:
+        """자기 쓰기를 색인에 반영한 뒤 호출 — 직전 버전에서 1만 올랐으면 재적재 없이 버전만 갱신"""
+        with self._lock:
+            if self.loaded and self.version is not None and self.version == version - 1:
+                self.version = version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+            self.loaded = False
+            self.version = None
+
+    # ✅ 검색
+    def search(self, query: str, top_k: int = 3, where: dict | None = None) -> list[dict]:
+        """BM25 top-k → [{"id", "text", "metadata", "score"}] (점수 내림차순)"""
+        terms = Counter(analyze(query))
+        with self._lock:
+            n_docs = len(self._slot_of)
+            if not terms or n_docs == 0:
+                return []
+            avg_len = self._total_len / n_docs
+
+            scores: dict[int, float] = {}
+            for term, query_tf in terms.items():
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for slot, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_len[slot] / avg_len)
+                    scores[slot] = scores.get(slot, 0.0) + query_tf * idf * tf * (self.k1 + 1) / (tf + norm)
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            results = []
+            for slot, score in ranked:
+                if where and not matches_where(self._metadatas[slot], where):
+                    continue
+                results.append({
+                    "id": self._ids[slot],
+                    "text": self._texts[slot],
+                    "metadata": self._metadatas[slot],
+                    "score": score,
+                })
+                if len(results) >= top_k:
+                    break
+            return results
+
+
+def reciprocal_rank_fusion(result_lists: list[list[dict]], k: int = 60, top_k: int = 3) -> list[dict]:
+    """RRF: 목록별 순위 r 에 1 / (k + r) 를 더해 합산 (점수 척도가 달라도 결합 가능)"""
+    fused: dict[str, dict] = {}
+    for results in result_lists:
+        for rank, hit in enumerate(results, start=1):
+            entry = fused.setdefault(hit["id"], {"id": hit["id"], "text": hit["text"], "score": 0.0})
+            entry["score"] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda item: item["score"], reverse=True)[:top_k]
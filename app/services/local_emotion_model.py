@@ -1,57 +1,445 @@
 # app/services/emotion_analyzer.py
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
+import numpy as np
+import os
 import logging
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+from app.config import settings
+from app.services.emotion_batcher import MicroBatcher
+from app.services.emotion_onnx import BACKENDS, create_onnx_session
+from app.services.model_registry import registry
+from app.services.prediction_cache import PredictionCache
 
 logger = logging.getLogger("soulstay.emotion")
 
 # ✅ 모델 경로 및 라벨 정의
-MODEL_PATH = "WhitePeak/bert-base-cased-Korean-sentiment"
+# (emotion_model_path 로 train_emotion_model.py --mode distill 의 학생 모델 지정 가능)
+MODEL_PATH = settings.emotion_model_path
 LABELS = ["부정", "중립", "긍정"]
+MAX_LENGTH = 128
 
-# ✅ 모델 & 토크나이저 로드 (CPU 전용)
-try:
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
-    model = AutoModelForSequenceClassification.from_pretrained(MODEL_PATH)
-    model.eval()
-    logger.info(f"✅ 감정 분석 모델 로드 완료 ({MODEL_PATH}, CPU 모드)")
-except Exception as e:
-    logger.error(f"❌ 감정 분석 모델 로드 실패: {e}")
-    tokenizer, model = None, None
+# ✅ 추론 백엔드 선택 (torch / onnx-fp32 / onnx-int8)
+BACKEND = settings.emotion_backend
+if BACKEND not in BACKENDS:
+    logger.warning(f"⚠️ 알 수 없는 감정 분석 백엔드 '{BACKEND}' — torch 사용")
+    BACKEND = "torch"
 
 
-def analyze_emotion_local(text: str):
+# ✅ 모델 & 토크나이저 로드 (CPU 전용, 레지스트리 경유 1회만 로드)
+def _load_emotion_model():
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
+        model = AutoModelForSequenceClassification.from_pretrained(MODEL_PATH)
+        model.eval()
+        logger.info(f"✅ 감정 분석 모델 로드 완료 ({MODEL_PATH}, CPU 모드)")
+        return tokenizer, model
+    except Exception as e:
+        logger.error(f"❌ 감정 분석 모델 로드 실패: {e}")
+        return None, None
+
+
+def _load_onnx_session():
+    tokenizer, model = get_emotion_model()
+    if model is None:
+        return None
+    try:
+        session = create_onnx_session(
+            BACKEND, model, tokenizer, MODEL_PATH, settings.emotion_onnx_dir, model_revision()
+        )
+        logger.info(f"✅ 감정 분석 백엔드: {BACKEND}")
+        return session
+    except Exception as e:
+        logger.error(f"❌ ONNX 백엔드 초기화 실패, torch 사용: {e}")
+        return None
+
+
+def _synthetic_batches():
+    """워밍업용 합성 입력 (설정된 시퀀스 길이 버킷마다 1배치)"""
+    tokenizer, _ = get_emotion_model()
+    for length in settings.warmup_seq_lengths:
+        length = min(length, MAX_LENGTH)
+        feature = {"input_ids": [tokenizer.cls_token_id] + [tokenizer.unk_token_id] * (length - 2) + [tokenizer.sep_token_id]}
+        if "token_type_ids" in tokenizer.model_input_names:
+            feature["token_type_ids"] = [0] * length
+        features = [dict(feature) for _ in range(settings.warmup_batch_size)]
+        yield tokenizer.pad(features, return_tensors="pt")
+
+
+def _warmup_torch(instance):
+    tokenizer, model = instance
+    if model is None:
+        return
+    with torch.no_grad():
+        for inputs in _synthetic_batches():
+            model(**inputs)
+
+
+def _warmup_onnx(session):
+    if session is None:
+        return
+    for inputs in _synthetic_batches():
+        session.logits(inputs)
+
+
+registry.register("emotion_bert", _load_emotion_model, MODEL_PATH, warmup=_warmup_torch)
+if BACKEND != "torch":
+    registry.register("emotion_onnx", _load_onnx_session, f"{MODEL_PATH} ({BACKEND})", warmup=_warmup_onnx)
+
+
+def get_emotion_model():
+    """공유 (tokenizer, model) 반환 — 로드 실패 시 (None, None)"""
+    return registry.get("emotion_bert")
+
+
+def model_revision() -> str:
+    """모델 리비전 (허브 모델은 커밋 해시, 로컬 모델은 가중치 파일 수정 시각)"""
+    _, model = get_emotion_model()
+    commit = getattr(model.config, "_commit_hash", None) if model is not None else None
+    if commit:
+        return commit
+    if os.path.isdir(MODEL_PATH):
+        mtimes = [
+            os.path.getmtime(os.path.join(MODEL_PATH, name))
+            for name in os.listdir(MODEL_PATH)
+            if name.endswith((".safetensors", ".bin", ".json"))
+        ]
+        if mtimes:
+            return f"local-{int(max(mtimes))}"
+    return "unknown"
+
+
+def _get_onnx_session():
+    if BACKEND == "torch":
+        return None
+    return registry.get("emotion_onnx")
+
+
+def active_backend() -> str:
+    """실제로 사용 중인 백엔드 (ONNX 초기화 실패 시 torch)"""
+    return BACKEND if _get_onnx_session() is not None else "torch"
+
+
+def _tokenize(texts: list[str]):
+    tokenizer, _ = get_emotion_model()
+    return tokenizer(
+        texts,
+        return_tensors="pt",
+        truncation=True,
+        padding=True,
+        max_length=MAX_LENGTH
+    )
+
+
+def _torch_logits(texts: list[str]) -> np.ndarray:
+    """PyTorch eager 모드 logits"""
+    _, model = get_emotion_model()
+    inputs = _tokenize(texts)
+    with torch.no_grad():
+        return model(**inputs).logits.numpy()
+
+
+def _logits_from_inputs(inputs) -> np.ndarray:
+    """이미 토크나이즈된 배치 입력 → logits (설정된 백엔드 사용)"""
+    onnx_session = _get_onnx_session()
+    if onnx_session is not None:
+        return onnx_session.logits(inputs)
+    _, model = get_emotion_model()
+    with torch.no_grad():
+        return model(**inputs).logits.numpy()
+
+
+def _predict_logits(texts: list[str]) -> np.ndarray:
+    """설정된 백엔드로 패딩 배치 logits 계산"""
+    return _logits_from_inputs(_tokenize(texts))
+
+
+def _predict_batch(texts: list[str]) -> list[str]:
+    """여러 문장을 하나의 패딩 배치로 추론하여 라벨 리스트 반환"""
+    preds = _predict_logits(texts).argmax(axis=1).tolist()
+    return [LABELS[p] for p in preds]
+
+
+# ✅ 동시 요청을 묶어서 처리하는 배치 스케줄러
+batcher = MicroBatcher(
+    _predict_batch,
+    max_batch_size=settings.emotion_batch_max_size,
+    max_wait_ms=settings.emotion_batch_max_wait_ms,
+    name="emotion",
+)
+
+
+def get_batcher_stats() -> dict:
+    """배치 크기 / 대기 시간 통계"""
+    return batcher.get_stats()
+
+
+# ✅ 예측 캐시 (모델 리비전 + 백엔드가 바뀌면 자동 무효화)
+@lru_cache(maxsize=1)
+def get_prediction_cache() -> PredictionCache | None:
+    if not settings.emotion_cache_enabled:
+        return None
+    _, model = get_emotion_model()
+    if model is None:
+        return None
+    return PredictionCache(
+        model_id=MODEL_PATH,
+        revision=f"{model_revision()}:{active_backend()}",
+        max_entries=settings.emotion_cache_max_entries,
+        disk_path=settings.emotion_cache_path,
+    )
+
+
+# fork 로 물려받은 예측 캐시 (자식에서 닫지 않도록 참조만 보관)
+_inherited_caches: list[PredictionCache] = []
+
+
+def reset_after_fork():
     """
-    한국어 감정 분석 (CPU 전용)
-    Args:
-        text (str): 분석할 문장
-    Returns:
-        dict: {"emotion": 감정라벨, "reason": 분석결과설명}
+    fork 된 워커 프로세스에서 호출 — 부모의 배치 스케줄러 / 예측 캐시를 자식 전용으로 교체
+
+    - 부모의 배치 워커 스레드는 자식에 없고 락 / 대기열 상태만 복사됨 → 새 스케줄러 생성 (스레드는 첫 요청 때 시작)
+    - 부모의 SQLite 연결은 fork 이후 사용하거나 닫으면 안 됨 → 참조만 보관하고 첫 사용 시 새로 연결
+    """
+    global batcher
+    batcher = MicroBatcher(
+        _predict_batch,
+        max_batch_size=batcher.max_batch_size,
+        max_wait_ms=batcher.max_wait * 1000.0,
+        name=batcher.name,
+    )
+    if get_prediction_cache.cache_info().currsize:
+        cache = get_prediction_cache()
+        if cache is not None:
+            _inherited_caches.append(cache)
+        get_prediction_cache.cache_clear()
+
+
+def get_cache_stats() -> dict | None:
+    """예측 캐시 히트/미스 통계 (캐시 비활성 시 None)"""
+    cache = get_prediction_cache()
+    return cache.stats() if cache else None
+
+
+def cached_predict(text: str, predict_fn: Callable[[str], str]) -> str:
+    """예측 캐시 조회 → 미스면 predict_fn 으로 추론 후 저장 (캐시 비활성 시 바로 추론)"""
+    cache = get_prediction_cache()
+    emotion = cache.get(text) if cache else None
+    if emotion is None:
+        emotion = predict_fn(text)
+        if cache:
+            cache.set(text, emotion)
+    return emotion
+
+
+def predict_emotion(text: str) -> dict:
+    """
+    analyze_emotion_local 과 같은 결과를 반환하되 추론 오류(배치 / 모델)는 예외로 전달
+    (빈 입력 / 모델 미로드는 기존처럼 '중립' 결과)
+
+    Raises:
+        Exception: 배치 추론 실패 시 — 호출하는 쪽에서 오류로 처리
     """
     if not text or not text.strip():
         logger.warning("⚠️ 감정 분석 실패 — 입력이 비어 있음")
         return {"emotion": "중립", "reason": "입력이 비어있습니다."}
 
+    tokenizer, model = get_emotion_model()
     if model is None or tokenizer is None:
         return {"emotion": "중립", "reason": "모델이 로드되지 않았습니다."}
 
-    try:
-        inputs = tokenizer(
-            text,
-            return_tensors="pt",
-            truncation=True,
-            padding=True,
-            max_length=128
-        )
-
-        with torch.no_grad():
-            outputs = model(**inputs)
-            pred = torch.argmax(outputs.logits, dim=1).item()
-            emotion = LABELS[pred]
+    emotion = cached_predict(text, batcher.predict)
+    logger.info(f"🧠 감정 분석 결과: '{text[:30]}...' → {emotion}")
+    return {"emotion": emotion, "reason": f"Hugging Face 모델({MODEL_PATH}, {active_backend()}) 예측 결과"}
 
-        logger.info(f"🧠 감정 분석 결과: '{text[:30]}...' → {emotion}")
-        return {"emotion": emotion, "reason": f"Hugging Face 모델({MODEL_PATH}) 예측 결과"}
 
+def analyze_emotion_local(text: str):
+    """
+    한국어 감정 분석 (CPU 전용, 마이크로 배치 경유)
+    Args:
+        text (str): 분석할 문장
+    Returns:
+        dict: {"emotion": 감정라벨, "reason": 분석결과설명} (추론 오류 시 '중립' + 오류 내용)
+    """
+    try:
+        return predict_emotion(text)
     except Exception as e:
         logger.error(f"❌ 감정 분석 오류: {e}")
         return {"emotion": "중립", "reason": f"분석 중 오류 발생: {e}"}
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def analyze_emotion_local_long(
+    texts: list[str],
+    window: int | None = None,
+    stride: int | None = None,
+    batch_size: int | None = None,
+) -> list[dict]:
+    """
+    긴 문서용 감정 분석 (슬라이딩 윈도우)
+
+    - 각 입력을 window 토큰 크기의 윈도우로 나눔 (인접 윈도우는 stride 토큰만큼 겹침)
+    - 모든 입력의 모든 윈도우를 길이순으로 정렬해 batch_size 단위로 한 번에 추론
+      → 지연 시간은 윈도우 수가 아니라 배치 수에 비례
+    - 윈도우 확률을 토큰 수 가중 평균해서 문서 단위 라벨 결정
+    Returns:
+        list[dict]: [{"emotion", "reason", "scores", "windows": [{"window", "emotion", "scores"}]}]
+    """
+    window = window or settings.emotion_long_window
+    stride = settings.emotion_long_stride if stride is None else stride
+    batch_size = max(1, batch_size or settings.emotion_bulk_batch_size)
+    if not 0 <= stride < window:
+        raise ValueError(f"stride({stride})는 0 이상 window({window}) 미만이어야 합니다.")
+
+    results: list[dict | None] = [None] * len(texts)
+    valid = []
+    for i, text in enumerate(texts):
+        if text and text.strip():
+            valid.append(i)
+        else:
+            results[i] = {"emotion": "중립", "reason": "입력이 비어있습니다.", "scores": {}, "windows": []}
+
+    tokenizer, model = get_emotion_model()
+    if valid and (model is None or tokenizer is None):
+        for i in valid:
+            results[i] = {"emotion": "중립", "reason": "모델이 로드되지 않았습니다.", "scores": {}, "windows": []}
+        valid = []
+    if not valid:
+        return results
+
+    # ✅ 윈도우 분할 (overflow_to_sample_mapping 으로 원래 문서 추적)
+    encoded = tokenizer(
+        [texts[i] for i in valid],
+        truncation=True,
+        max_length=window,
+        stride=stride,
+        return_overflowing_tokens=True,
+    )
+    doc_of_window = [valid[m] for m in encoded["overflow_to_sample_mapping"]]
+    feature_keys = [k for k in ("input_ids", "token_type_ids", "attention_mask") if k in encoded]
+    n_windows = len(doc_of_window)
+
+    # ✅ 전체 윈도우를 길이순으로 배치 추론
+    probs = np.zeros((n_windows, len(LABELS)), dtype=np.float32)
+    order = sorted(range(n_windows), key=lambda w: len(encoded["input_ids"][w]))
+    for start in range(0, n_windows, batch_size):
+        chunk = order[start:start + batch_size]
+        features = [{k: encoded[k][w] for k in feature_keys} for w in chunk]
+        inputs = tokenizer.pad(features, return_tensors="pt")
+        probs[chunk] = _softmax(_logits_from_inputs(inputs))
+
+    # ✅ 문서 단위 집계 (윈도우 토큰 수 가중 평균)
+    weights = np.array([sum(encoded["attention_mask"][w]) for w in range(n_windows)], dtype=np.float32)
+    per_doc: dict[int, list[int]] = {}
+    for w, doc in enumerate(doc_of_window):
+        per_doc.setdefault(doc, []).append(w)
+
+    reason = f"Hugging Face 모델({MODEL_PATH}, {active_backend()}) 슬라이딩 윈도우 예측 결과"
+    for doc, windows in per_doc.items():
+        doc_probs = np.average(probs[windows], axis=0, weights=weights[windows])
+        results[doc] = {
+            "emotion": LABELS[int(doc_probs.argmax())],
+            "reason": f"{reason} (윈도우 {len(windows)}개)",
+            "scores": {label: round(float(p), 4) for label, p in zip(LABELS, doc_probs)},
+            "windows": [
+                {
+                    "window": j,
+                    "emotion": LABELS[int(probs[w].argmax())],
+                    "scores": {label: round(float(p), 4) for label, p in zip(LABELS, probs[w])},
+                }
+                for j, w in enumerate(windows)
+            ],
+        }
+
+    logger.info(f"🧠 긴 문서 감정 분석 완료: 문서 {len(valid)}개, 윈도우 {n_windows}개, "
+                f"배치 {(n_windows + batch_size - 1) // batch_size}회")
+    return results
+
+
+def _iter_windows(texts: Iterable[str], size: int) -> Iterator[list[str]]:
+    """입력을 원래 순서대로 size 개씩 잘라서 반환"""
+    it = iter(texts)
+    while True:
+        window = list(islice(it, size))
+        if not window:
+            return
+        yield window
+
+
+def analyze_emotion_local_batch(
+    texts: Iterable[str],
+    batch_size: int | None = None,
+    bucket_batches: int | None = None,
+) -> Iterator[dict]:
+    """
+    대량 감정 분석 (길이 버킷 배치 + 원래 순서대로 스트리밍)
+
+    - 입력을 batch_size * bucket_batches 개 단위 윈도우로 읽고,
+      윈도우 안에서 토큰 길이순으로 정렬해 패딩을 최소화한 배치로 추론
+    - 배치가 끝날 때마다 원래 순서상 준비된 결과부터 바로 yield
+    - logits 는 배치 단위로만 존재하고 라벨로 변환 즉시 해제됨
+    Args:
+        texts: 분석할 문장들 (리스트 또는 이터러블)
+    Yields:
+        dict: {"index": 원래 위치, "emotion": 감정라벨, "reason": 분석결과설명}
+    """
+    batch_size = max(1, batch_size or settings.emotion_bulk_batch_size)
+    bucket_batches = max(1, bucket_batches or settings.emotion_bulk_bucket_batches)
+    reason = f"Hugging Face 모델({MODEL_PATH}, {active_backend()}) 예측 결과"
+    tokenizer, model = get_emotion_model()
+
+    offset = 0
+    for window in _iter_windows(texts, batch_size * bucket_batches):
+        results: dict[int, dict] = {}
+        next_index = 0
+
+        valid = []
+        for i, t in enumerate(window):
+            if t and t.strip():
+                valid.append(i)
+            else:
+                results[i] = {"emotion": "중립", "reason": "입력이 비어있습니다."}
+
+        if valid and (model is None or tokenizer is None):
+            for i in valid:
+                results[i] = {"emotion": "중립", "reason": "모델이 로드되지 않았습니다."}
+            valid = []
+
+        # ✅ 토큰 길이 기준 정렬 → 비슷한 길이끼리 한 배치
+        if valid:
+            lengths = tokenizer(
+                [window[i] for i in valid],
+                truncation=True,
+                max_length=MAX_LENGTH,
+            )["input_ids"]
+            order = [i for _, i in sorted(zip((len(x) for x in lengths), valid))]
+        else:
+            order = []
+
+        for start in range(0, len(order) + 1, batch_size):
+            chunk = order[start:start + batch_size]
+            if chunk:
+                try:
+                    labels = _predict_batch([window[i] for i in chunk])
+                    for i, label in zip(chunk, labels):
+                        results[i] = {"emotion": label, "reason": reason}
+                except Exception as e:
+                    logger.error(f"❌ 대량 감정 분석 배치 오류: {e}")
+                    for i in chunk:
+                        results[i] = {"emotion": "중립", "reason": f"분석 중 오류 발생: {e}"}
+
+            # 원래 순서상 앞부분이 모두 준비되었으면 바로 내보냄
+            while next_index in results:
+                yield {"index": offset + next_index, **results.pop(next_index)}
+                next_index += 1
+
+        offset += len(window)
+
+    logger.info(f"🧠 대량 감정 분석 완료: 총 {offset}건")
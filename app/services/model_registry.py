@@ -0,0 +1,151 @@
+# app/services/model_registry.py
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable
+
+logger = logging.getLogger("soulstay.model_registry")
+
+
+def _current_rss_bytes() -> int | None:
+    """현재 프로세스 상주 메모리(RSS) — Linux /proc 기반, 그 외 환경은 None"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _tensor_bytes(obj: Any, _seen: set | None = None) -> int:
+    """torch 모듈(파라미터 + 버퍼)이 차지하는 메모리 합계"""
+    try:
+        import torch
+    except ImportError:
+        return 0
+
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, torch.nn.Module):
+        tensors = list(obj.parameters()) + list(obj.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    if isinstance(obj, (list, tuple)):
+        return sum(_tensor_bytes(o, seen) for o in obj)
+    if isinstance(obj, dict):
+        return sum(_tensor_bytes(o, seen) for o in obj.values())
+    return 0
+
+
+class _Entry:
+    __slots__ = ("name", "loader", "description", "warmup", "lock", "instance", "loaded",
+                 "load_seconds", "warmup_seconds", "rss_delta_bytes")
+
+    def __init__(self, name: str, loader: Callable[[], Any], description: str,
+                 warmup: Callable[[Any], None] | None):
+        self.name = name
+        self.loader = loader
+        self.description = description
+        self.warmup = warmup
+        self.lock = threading.Lock()
+        self.instance = None
+        self.loaded = False
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.rss_delta_bytes = None
+
+
+class ModelRegistry:
+    """
+    프로세스 단위 모델 레지스트리
+
+    - 모델별 로더를 등록해두고 처음 get() 할 때 1회만 로드 (lazy)
+    - 모든 소비자가 같은 인스턴스를 공유 → 워커당 중복 로드 방지
+    - 모델별 로드 시간 / 메모리 사용량 진단 정보 제공
+    """
+
+    def __init__(self):
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        description: str = "",
+        warmup: Callable[[Any], None] | None = None,
+    ) -> None:
+        """모델 로더 등록 (이미 등록된 이름이면 무시), warmup 은 로드된 인스턴스로 합성 추론 실행"""
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _Entry(name, loader, description, warmup)
+
+    def get(self, name: str) -> Any:
+        """등록된 모델 인스턴스 반환 (최초 호출 시 로드)"""
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"등록되지 않은 모델입니다: {name}")
+
+        if entry.loaded:
+            return entry.instance
+
+        with entry.lock:
+            if not entry.loaded:
+                rss_before = _current_rss_bytes()
+                started = time.perf_counter()
+                entry.instance = entry.loader()
+                entry.load_seconds = time.perf_counter() - started
+                rss_after = _current_rss_bytes()
+                if rss_before is not None and rss_after is not None:
+                    entry.rss_delta_bytes = max(0, rss_after - rss_before)
+                entry.loaded = True
+                logger.info(f"📦 모델 로드 완료: {name} ({entry.load_seconds:.2f}s)")
+        return entry.instance
+
+    def warmup(self, name: str) -> dict:
+        """모델 로드 + 등록된 warmup 실행, 단계별 소요 시간 반환"""
+        entry = self._entries[name]
+        started = time.perf_counter()
+        instance = self.get(name)
+        load_seconds = time.perf_counter() - started
+
+        warmup_seconds = 0.0
+        if entry.warmup is not None and instance is not None:
+            started = time.perf_counter()
+            entry.warmup(instance)
+            warmup_seconds = time.perf_counter() - started
+        entry.warmup_seconds = warmup_seconds
+        return {"name": name, "load_seconds": load_seconds, "warmup_seconds": warmup_seconds}
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return bool(entry and entry.loaded)
+
+    def names(self) -> list[str]:
+        return list(self._entries)
+
+    def memory_report(self) -> dict:
+        """모델별 메모리 사용량 (텐서 합계 + 로드 시점 RSS 증가량)"""
+        models = []
+        for entry in list(self._entries.values()):
+            models.append({
+                "name": entry.name,
+                "description": entry.description,
+                "loaded": entry.loaded,
+                "load_seconds": round(entry.load_seconds, 3) if entry.load_seconds else None,
+                "warmup_seconds": round(entry.warmup_seconds, 3) if entry.warmup_seconds else None,
+                "tensor_bytes": _tensor_bytes(entry.instance) if entry.loaded else 0,
+                "rss_delta_bytes": entry.rss_delta_bytes,
+            })
+        return {
+            "pid": os.getpid(),
+            "process_rss_bytes": _current_rss_bytes(),
+            "models": models,
+        }
+
+
+# ✅ 프로세스 전역 레지스트리
+registry = ModelRegistry()
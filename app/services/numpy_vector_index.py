@@ -0,0 +1,523 @@
+# app/services/numpy_vector_index.py
+import os
+import json
+import fcntl
+import logging
+import operator
+import threading
+import numpy as np
+from contextlib import contextmanager
+
+logger = logging.getLogger("soulstay.numpy_vector_index")
+
+# 용량이 부족하면 이 배수로 늘림 (append 마다 파일을 다시 쓰지 않도록)
+_GROWTH_FACTOR = 2
+_MIN_CAPACITY = 1024
+# float16 / int8 저장 시 matmul 은 이 행 수 단위로 float32 변환 후 계산
+_SEARCH_CHUNK_ROWS = 65536
+_DTYPES = ("float32", "float16", "int8")
+_INT8_MAX = 127.0
+# int8 인덱스의 재점수용 원본 벡터 저장 형식
+_RESCORE_DTYPE = np.float16
+_RANGE_OPS = {"$gt": operator.gt, "$gte": operator.ge, "$lt": operator.lt, "$lte": operator.le}
+_SCALAR = (str, int, float, bool)
+
+
+def _as_number(value) -> float:
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+
+class NumpyVectorIndex:
+    """
+    메모리 매핑 NumPy 정확 검색 인덱스
+
+    - vectors.npy: (capacity, dim) 행렬, 모든 워커가 같은 파일을 mmap (복사 없음)
+    - meta.jsonl: 행 번호 → id / 문서 / 메타데이터 (append-only, 같은 행은 마지막 줄이 유효)
+      → 용량 확장으로 벡터 파일을 새로 쓸 때 삭제된 행을 빼고 살아 있는 행만 다시 씀 (meta_generation 증가)
+    - index.json: dim / dtype / count / capacity / version / meta_generation
+      (쓰기마다 version 증가 → 읽는 쪽이 다시 매핑, meta_generation 이 바뀌면 meta.jsonl 을 처음부터 다시 읽음)
+    - 벡터는 L2 정규화해서 저장, 거리 = 2 - 2·cos (정규화 벡터의 Chroma l2 거리와 같은 척도)
+    - 검색: 행렬 곱 1회 + argpartition → 정확한 top-k
+    - where 조건: 필드별 값 코드 배열(처음 쓰는 필드만 1회 구성, 이후 쓰기와 함께 갱신)로 NumPy 마스크 계산
+    - int8: 행마다 최대 절댓값 기준 스케일(scales.npy)로 양자화 + 재점수용 float16 원본(rescore.npy)
+      → 근사 점수로 top_k × rescore_factor 후보를 고른 뒤 후보 행만 float16 원본으로 재점수
+      → 인덱스가 벡터 원본을 가지므로 Chroma 에는 임베딩을 저장하지 않아도 됨 (행당 dim×3+4 바이트)
+      → 전체 스캔은 int8 행렬만 읽음, rescore.npy 는 후보 행만 읽음
+    """
+
+    def __init__(self, path: str, dim: int, dtype: str = "float32", rescore_factor: int = 4):
+        if dtype not in _DTYPES:
+            raise ValueError(f"지원하지 않는 dtype 입니다: {dtype} (지원: {', '.join(_DTYPES)})")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.quantized = self.dtype == np.int8
+        self.rescore_factor = max(1, rescore_factor)
+        self.vectors_path = os.path.join(path, "vectors.npy")
+        self.scales_path = os.path.join(path, "scales.npy")
+        self.rescore_path = os.path.join(path, "rescore.npy")
+        self.meta_path = os.path.join(path, "meta.jsonl")
+        self.header_path = os.path.join(path, "index.json")
+        self.lock_path = os.path.join(path, ".lock")
+
+        self._lock = threading.RLock()
+        self._header: dict | None = None
+        self._header_mtime = None
+        self._matrix = None
+        self._scales = None
+        self._originals = None
+        self._mapped_version = None
+        self._meta_generation = None
+        self._reset_rows()
+
+        with self._file_lock():
+            if not os.path.exists(self.header_path):
+                self._create(_MIN_CAPACITY)
+        self._refresh()
+
+        if self._header["dim"] != dim or self._header["dtype"] != self.dtype.name:
+            raise ValueError(
+                f"인덱스 '{path}' 는 dim={self._header['dim']}, dtype={self._header['dtype']} 로 만들어졌습니다 "
+                f"(요청: dim={dim}, dtype={self.dtype.name})"
+            )
+        if self.quantized and self._header.get("rescore_dtype") != np.dtype(_RESCORE_DTYPE).name:
+            raise ValueError(f"인덱스 '{path}' 에 재점수용 원본 벡터가 없습니다. 인덱스 디렉터리를 지우고 다시 적재하세요.")
+
+    # ✅ 파일 관리
+    @contextmanager
+    def _file_lock(self):
+        """프로세스 간 쓰기 잠금 (flock)"""
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_header(self, header: dict) -> None:
+        tmp_path = f"{self.header_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(header, f)
+        os.replace(tmp_path, self.header_path)
+
+    def _create(self, capacity: int) -> None:
+        matrix = np.lib.format.open_memmap(
+            self.vectors_path, mode="w+", dtype=self.dtype, shape=(capacity, self.dim)
+        )
+        matrix.flush()
+        del matrix
+        header = {
+            "dim": self.dim, "dtype": self.dtype.name, "count": 0, "capacity": capacity, "version": 0,
+            "meta_generation": 0,
+        }
+        if self.quantized:
+            scales = np.lib.format.open_memmap(self.scales_path, mode="w+", dtype=np.float32, shape=(capacity,))
+            scales.flush()
+            del scales
+            originals = np.lib.format.open_memmap(
+                self.rescore_path, mode="w+", dtype=_RESCORE_DTYPE, shape=(capacity, self.dim)
+            )
+            originals.flush()
+            del originals
+            header["rescore_dtype"] = np.dtype(_RESCORE_DTYPE).name
+        open(self.meta_path, "w").close()
+        self._write_header(header)
+
+    def _rewrite(self, new_rows: int) -> None:
+        """
+        용량 부족 시 벡터 파일을 새로 씀: 살아 있는 행만 앞에서부터 복사 (삭제된 행 정리, 필요하면 용량 확장)
+        + meta.jsonl 도 살아 있는 행만 다시 써서 원자적 교체 (기존 매핑은 예전 파일을 계속 읽음)
+        """
+        header = self._header
+        live = np.asarray(sorted(self._row_of.values()), dtype=np.int64)
+        capacity = header["capacity"]
+        if len(live) + new_rows > capacity:
+            capacity = max(len(live) + new_rows, capacity * _GROWTH_FACTOR)
+
+        tmp_path = f"{self.vectors_path}.tmp"
+        self._copy_rows(self._matrix, live, tmp_path, self.dtype, capacity)
+        if self.quantized:
+            rescore_tmp = f"{self.rescore_path}.tmp"
+            self._copy_rows(self._originals, live, rescore_tmp, _RESCORE_DTYPE, capacity)
+            os.replace(rescore_tmp, self.rescore_path)
+            scales_tmp = f"{self.scales_path}.tmp"
+            scales = np.lib.format.open_memmap(scales_tmp, mode="w+", dtype=np.float32, shape=(capacity,))
+            if len(live):
+                scales[:len(live)] = self._scales[live]
+            scales.flush()
+            del scales
+            os.replace(scales_tmp, self.scales_path)
+
+        records = [
+            {"row": row, "id": self._ids[old], "document": self._documents[old], "metadata": self._metadatas[old]}
+            for row, old in enumerate(live.tolist())
+        ]
+        meta_tmp = f"{self.meta_path}.tmp"
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.vectors_path)
+        os.replace(meta_tmp, self.meta_path)
+
+        removed = header["count"] - len(live)
+        header.update(
+            capacity=capacity, count=len(live), meta_generation=header.get("meta_generation", 0) + 1
+        )
+        self._meta_generation = header["meta_generation"]
+        self._reset_rows()
+        for record in records:
+            self._apply_meta(record)
+        with open(self.meta_path, "rb") as f:
+            self._meta_offset = f.seek(0, os.SEEK_END)
+        self._commit()
+        logger.info(f"📈 벡터 인덱스 재작성: {capacity}행 (삭제된 행 {removed}개 정리)")
+
+    def _copy_rows(self, source: np.ndarray, live: np.ndarray, path: str, dtype, capacity: int) -> None:
+        """살아 있는 행만 앞에서부터 새 파일로 복사"""
+        target = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(capacity, self.dim))
+        for start in range(0, len(live), _SEARCH_CHUNK_ROWS):
+            rows = live[start:start + _SEARCH_CHUNK_ROWS]
+            target[start:start + len(rows)] = source[rows]
+        target.flush()
+        del target
+
+    def _refresh(self) -> None:
+        """다른 프로세스의 쓰기 반영 (index.json 이 바뀐 경우에만 다시 매핑)"""
+        with self._lock:
+            mtime = os.stat(self.header_path).st_mtime_ns
+            if self._header is not None and mtime == self._header_mtime:
+                return
+            with open(self.header_path, "r", encoding="utf-8") as f:
+                header = json.load(f)
+            self._header, self._header_mtime = header, mtime
+
+            if header["version"] != self._mapped_version:
+                generation = header.get("meta_generation", 0)
+                if generation != self._meta_generation:
+                    # 다른 프로세스가 meta.jsonl 을 다시 씀 → 처음부터 읽음
+                    self._reset_rows()
+                    self._meta_generation = generation
+                self._map()
+                self._mapped_version = header["version"]
+                self._read_meta()
+
+    def _map(self) -> None:
+        self._matrix = np.load(self.vectors_path, mmap_mode="r")
+        if self.quantized:
+            self._scales = np.load(self.scales_path, mmap_mode="r")
+            self._originals = np.load(self.rescore_path, mmap_mode="r")
+
+    def _read_meta(self) -> None:
+        with open(self.meta_path, "rb") as f:
+            f.seek(self._meta_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 쓰는 중인 마지막 줄은 다음 갱신 때 읽음
+                self._meta_offset += len(line)
+                self._apply_meta(json.loads(line.decode("utf-8")))
+
+    # ✅ 행 상태 (id / 문서 / 메타데이터 + 필터용 배열)
+    def _reset_rows(self) -> None:
+        self._meta_offset = 0
+        self._ids: list[str | None] = []
+        self._documents: list[str | None] = []
+        self._metadatas: list[dict | None] = []
+        self._row_of: dict[str, int] = {}
+        self._live = np.zeros(0, dtype=bool)
+        # 필드 → (값 → 코드, 행별 코드 -1=없음) / 필드 → 행별 숫자 값 (NaN=없음 또는 숫자 아님)
+        self._codes: dict[str, tuple[dict, np.ndarray]] = {}
+        self._numbers: dict[str, np.ndarray] = {}
+
+    def _ensure_rows(self, row: int) -> None:
+        while len(self._ids) <= row:
+            self._ids.append(None)
+            self._documents.append(None)
+            self._metadatas.append(None)
+        if row < len(self._live):
+            return
+        size = max(row + 1, len(self._live) * _GROWTH_FACTOR, _MIN_CAPACITY)
+        extra = size - len(self._live)
+        self._live = np.concatenate([self._live, np.zeros(extra, dtype=bool)])
+        for field, (codes, column) in self._codes.items():
+            self._codes[field] = (codes, np.concatenate([column, np.full(extra, -1, dtype=np.int32)]))
+        for field, column in self._numbers.items():
+            self._numbers[field] = np.concatenate([column, np.full(extra, np.nan)])
+
+    def _apply_meta(self, record: dict) -> None:
+        row = record["row"]
+        self._ensure_rows(row)
+
+        previous = self._ids[row]
+        if previous is not None and self._row_of.get(previous) == row:
+            del self._row_of[previous]
+
+        doc_id, metadata = record.get("id"), record.get("metadata") or {}
+        self._ids[row] = doc_id
+        self._documents[row] = record.get("document")
+        self._metadatas[row] = record.get("metadata")
+        self._live[row] = doc_id is not None
+        if doc_id is not None:
+            self._row_of[doc_id] = row
+        else:
+            metadata = {}
+        for field, (codes, column) in self._codes.items():
+            value = metadata.get(field)
+            column[row] = codes.setdefault(value, len(codes)) if isinstance(value, _SCALAR) else -1
+        for field, column in self._numbers.items():
+            column[row] = _as_number(metadata.get(field))
+
+    def _code_column(self, field: str) -> tuple[dict, np.ndarray]:
+        """필드 값 코드 배열 (처음 요청될 때 1회 구성)"""
+        if field not in self._codes:
+            codes, column = {}, np.full(len(self._live), -1, dtype=np.int32)
+            for row, metadata in enumerate(self._metadatas):
+                value = (metadata or {}).get(field) if self._live[row] else None
+                if isinstance(value, _SCALAR):
+                    column[row] = codes.setdefault(value, len(codes))
+            self._codes[field] = (codes, column)
+        return self._codes[field]
+
+    def _number_column(self, field: str) -> np.ndarray:
+        """필드 숫자 값 배열 (범위 조건용, 처음 요청될 때 1회 구성)"""
+        if field not in self._numbers:
+            column = np.full(len(self._live), np.nan)
+            for row, metadata in enumerate(self._metadatas):
+                if self._live[row]:
+                    column[row] = _as_number((metadata or {}).get(field))
+            self._numbers[field] = column
+        return self._numbers[field]
+
+    def _append_meta(self, records: list[dict]) -> None:
+        with open(self.meta_path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        for record in records:
+            self._apply_meta(record)
+        with open(self.meta_path, "rb") as f:
+            self._meta_offset = f.seek(0, os.SEEK_END)
+
+    def _commit(self) -> None:
+        self._header["version"] += 1
+        self._write_header(self._header)
+        self._header_mtime = os.stat(self.header_path).st_mtime_ns
+        self._map()
+        self._mapped_version = self._header["version"]
+
+    @staticmethod
+    def quantize(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """행별 대칭 int8 양자화 → (codes, scales), 원래 값 ≈ codes × scale"""
+        scales = np.abs(vectors).max(axis=1) / _INT8_MAX
+        scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(vectors / scales[:, None]), -_INT8_MAX, _INT8_MAX).astype(np.int8)
+        return codes, scales
+
+    # ✅ 쓰기
+    def upsert(self, ids: list[str], vectors, documents: list[str], metadatas: list[dict] | None = None) -> None:
+        """벡터 추가 (이미 있는 id 는 같은 행을 덮어씀)"""
+        if not ids:
+            return
+        metadatas = metadatas or [{}] * len(ids)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)
+
+        with self._file_lock():
+            self._refresh()
+            header = self._header
+            new_rows = len({doc_id for doc_id in ids if doc_id not in self._row_of})
+            if header["count"] + new_rows > header["capacity"]:
+                self._rewrite(new_rows)
+            rows = []
+            for doc_id in ids:
+                row = self._row_of.get(doc_id)
+                if row is None:
+                    row = header["count"]
+                    header["count"] += 1
+                    self._row_of[doc_id] = row
+                rows.append(row)
+
+            matrix = np.load(self.vectors_path, mmap_mode="r+")
+            if self.quantized:
+                codes, row_scales = self.quantize(vectors)
+                matrix[np.asarray(rows)] = codes
+                scales = np.load(self.scales_path, mmap_mode="r+")
+                scales[np.asarray(rows)] = row_scales
+                scales.flush()
+                del scales
+                originals = np.load(self.rescore_path, mmap_mode="r+")
+                originals[np.asarray(rows)] = vectors.astype(_RESCORE_DTYPE)
+                originals.flush()
+                del originals
+            else:
+                matrix[np.asarray(rows)] = vectors.astype(self.dtype)
+            matrix.flush()
+            del matrix
+
+            self._append_meta([
+                {"row": row, "id": doc_id, "document": doc, "metadata": meta}
+                for row, doc_id, doc, meta in zip(rows, ids, documents, metadatas)
+            ])
+            self._commit()
+
+    def update_metadata(self, ids: list[str], metadatas: list[dict]) -> None:
+        """벡터는 그대로 두고 메타데이터만 갱신"""
+        with self._file_lock():
+            self._refresh()
+            records = []
+            for doc_id, meta in zip(ids, metadatas):
+                row = self._row_of.get(doc_id)
+                if row is not None:
+                    records.append({"row": row, "id": doc_id, "document": self._documents[row], "metadata": meta})
+            if records:
+                self._append_meta(records)
+                self._commit()
+
+    def delete(self, ids: list[str]) -> int:
+        """id 삭제 (행은 비워두고 검색에서 제외)"""
+        with self._file_lock():
+            self._refresh()
+            records = [{"row": self._row_of[doc_id], "id": None} for doc_id in ids if doc_id in self._row_of]
+            if records:
+                self._append_meta(records)
+                self._commit()
+            return len(records)
+
+    # ✅ 읽기
+    def count(self) -> int:
+        self._refresh()
+        return len(self._row_of)
+
+    def contains(self, doc_id: str) -> bool:
+        self._refresh()
+        return doc_id in self._row_of
+
+    def _scores(self, query: np.ndarray, count: int) -> np.ndarray:
+        matrix = self._matrix[:count]
+        if self.dtype == np.float32:
+            return matrix @ query
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, _SEARCH_CHUNK_ROWS):
+            end = min(start + _SEARCH_CHUNK_ROWS, count)
+            scores[start:end] = matrix[start:end].astype(np.float32) @ query
+        if self.quantized:
+            scores *= self._scales[:count]
+        return scores
+
+    def _row_scores(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        scores = self._matrix[rows].astype(np.float32) @ query
+        if self.quantized:
+            scores *= self._scales[rows]
+        return scores
+
+    def _rescore(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """후보 행을 float16 원본 벡터로 다시 점수 계산 (정규화된 벡터 → 내적 = cos)"""
+        return self._originals[rows].astype(np.float32) @ query
+
+    def _field_mask(self, field: str, condition, count: int) -> np.ndarray:
+        """필드 조건 1개 → 행 마스크 (rag_filters.matches_where 와 같은 의미)"""
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        mask = np.ones(count, dtype=bool)
+        for op, expected in condition.items():
+            if op in _RANGE_OPS:
+                with np.errstate(invalid="ignore"):
+                    mask &= _RANGE_OPS[op](self._number_column(field)[:count], expected)
+                continue
+            codes, column = self._code_column(field)
+            column = column[:count]
+            if op in ("$eq", "$ne"):
+                hit = column == codes.get(expected, -2) if isinstance(expected, _SCALAR) else np.zeros(count, dtype=bool)
+            elif op in ("$in", "$nin"):
+                hit = np.isin(column, [codes[v] for v in expected if isinstance(v, _SCALAR) and v in codes])
+            else:
+                continue
+            mask &= ~hit if op in ("$ne", "$nin") else hit
+        return mask
+
+    def _where_mask(self, where: dict, count: int) -> np.ndarray:
+        mask = np.ones(count, dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self._where_mask(clause, count)
+            elif key == "$or":
+                either = np.zeros(count, dtype=bool)
+                for clause in condition:
+                    either |= self._where_mask(clause, count)
+                mask &= either
+            else:
+                mask &= self._field_mask(key, condition, count)
+        return mask
+
+    def _candidate_rows(self, count: int, where: dict) -> np.ndarray:
+        """메타데이터 조건을 만족하는 행 번호 (점수 계산 전에 후보 축소)"""
+        return np.flatnonzero(self._live[:count] & self._where_mask(where, count))
+
+    def search(self, query_vector, top_k: int = 3, where: dict | None = None, rescore: bool = True) -> list[dict]:
+        """
+        정확한 top-k 검색 (where: Chroma 형식 메타데이터 조건) → [{"id", "text", "metadata", "distance"}]
+
+        rescore: int8 인덱스에서 후보를 float16 원본으로 재점수 (False 면 양자화 점수 그대로 사용)
+        """
+        self._refresh()
+        with self._lock:
+            count = self._header["count"]
+            if count == 0 or top_k <= 0:
+                return []
+
+            query = np.asarray(query_vector, dtype=np.float32).reshape(self.dim)
+            norm = np.linalg.norm(query)
+            if norm > 0:
+                query = query / norm
+
+            if where:
+                rows = self._candidate_rows(count, where)
+                if len(rows) == 0:
+                    return []
+                scores = self._row_scores(rows, query)
+                k = min(top_k, len(rows))
+            else:
+                rows = None
+                scores = self._scores(query, count)
+                scores[~self._live[:count]] = -np.inf
+                k = min(top_k, len(self._row_of))
+
+            if k == 0:
+                return []
+            if self.quantized and rescore:
+                # 근사 점수로 후보를 넉넉히 고른 뒤 float 원본으로 재점수
+                n = min(len(scores), k * self.rescore_factor)
+                top = np.argpartition(-scores, n - 1)[:n]
+                top = top[np.isfinite(scores[top])]  # 삭제된 행 제외
+                rows = top if rows is None else rows[top]
+                scores = self._rescore(rows, query)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            distances = 2.0 - 2.0 * scores[top]
+            if rows is not None:
+                top = rows[top]
+
+            return [
+                {
+                    "id": self._ids[row],
+                    "text": self._documents[row],
+                    "metadata": self._metadatas[row] or {},
+                    "distance": float(distance),
+                }
+                for row, distance in zip(top, distances)
+            ]
+
+    # ✅ Chroma 컬렉션에서 초기 구성
+    def build_from_collection(self, col, batch_size: int = 1000) -> int:
+        """Chroma 컬렉션의 임베딩을 페이지 단위로 읽어 인덱스에 적재"""
+        total = col.count()
+        loaded = 0
+        for offset in range(0, total, batch_size):
+            page = col.get(include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset)
+            if not page["ids"]:
+                break
+            self.upsert(page["ids"], page["embeddings"], page["documents"], page["metadatas"])
+            loaded += len(page["ids"])
+        logger.info(f"📦 Chroma → NumPy 인덱스 적재 완료 ({loaded}개)")
+        return loaded
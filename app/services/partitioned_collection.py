@@ -0,0 +1,288 @@
+# app/services/partitioned_collection.py
+import re
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from app.services.rag_filters import now_timestamp
+
+logger = logging.getLogger("soulstay.partitioned_collection")
+
+PARTITION_MODES = ("none", "property", "property_year")
+
+_SLUG_INVALID = re.compile(r"[^a-z0-9]+")
+_PARTITION_SUFFIX = {"property": re.compile(r"^[a-z0-9-]+$"), "property_year": re.compile(r"^[a-z0-9-]+_\d{4}$")}
+_MAX_SLUG = 36  # Chroma 컬렉션 이름 최대 63자 (기본 이름 + 구분자 + 연도 포함)
+
+
+def property_slug(property_id) -> str:
+    """숙소 id → 컬렉션 이름에 쓸 수 있는 문자열 (영문 소문자 / 숫자 / -, 그 외 문자는 해시로 구분)"""
+    raw = str(property_id).strip().lower()
+    slug = _SLUG_INVALID.sub("-", raw).strip("-")
+    if slug == raw and slug and len(slug) <= _MAX_SLUG:
+        return slug
+    digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=4).hexdigest()
+    return f"{slug[:_MAX_SLUG - 9]}-{digest}" if slug else digest
+
+
+def _year_of(timestamp) -> int:
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc).year
+
+
+def _where_values(where: dict | None, field: str) -> list | None:
+    """where 절(최상위 / $and)에서 field 의 값 목록 추출 (조건이 없으면 None)"""
+    if not where:
+        return None
+    clauses = where["$and"] if "$and" in where else [where]
+    for clause in clauses:
+        condition = clause.get(field)
+        if condition is None:
+            continue
+        if isinstance(condition, dict):
+            if "$eq" in condition:
+                return [condition["$eq"]]
+            if "$in" in condition:
+                return list(condition["$in"])
+            return None
+        return [condition]
+    return None
+
+
+def _where_year_range(where: dict | None) -> tuple[int | None, int | None]:
+    """where 절의 created_at 범위 → (시작 연도, 끝 연도)"""
+    if not where:
+        return None, None
+    low = high = None
+    for clause in where["$and"] if "$and" in where else [where]:
+        condition = clause.get("created_at")
+        if isinstance(condition, dict):
+            if "$gte" in condition or "$gt" in condition:
+                low = _year_of(condition.get("$gte", condition.get("$gt")))
+            if "$lte" in condition or "$lt" in condition:
+                high = _year_of(condition.get("$lte", condition.get("$lt")))
+    return low, high
+
+
+class PartitionedCollection:
+    """
+    숙소(+ 연도)별 Chroma 컬렉션 묶음을 하나의 컬렉션처럼 다루는 어댑터
+
+    - 쓰기: 메타데이터의 property_id / created_at 으로 파티션을 골라 upsert
+      (update 로 파티션 키가 바뀌면 새 파티션으로 옮김, 문서 id 는 숙소별로 달라야 함 → rag_service)
+    - 검색: where 절의 property_id / created_at 범위로 대상 파티션만 골라 스레드 병렬 조회 후 거리순 top-k 병합
+    - count / get / update / delete 는 파티션 전체에 걸쳐 동작 (기존 rag_service 코드 그대로 사용)
+    - 한 숙소를 재적재해도 다른 숙소의 컬렉션은 그대로 검색 가능
+    """
+
+    def __init__(
+        self,
+        base_name: str,
+        by: str,
+        open_collection,
+        list_collection_names,
+        drop_collection,
+        default_property: str = "default",
+        max_workers: int = 8,
+        refresh_seconds: float = 10.0,
+    ):
+        if by not in PARTITION_MODES or by == "none":
+            raise ValueError(f"지원하지 않는 파티션 방식입니다: {by} (지원: property, property_year)")
+        self.name = base_name
+        self.by = by
+        self.default_property = default_property
+        self._open_collection = open_collection
+        self._list_collection_names = list_collection_names
+        self._drop_collection = drop_collection
+        self._refresh_seconds = refresh_seconds
+        self._collections: dict[str, object] = {}
+        self._known: list[str] = []
+        self._listed_at = 0.0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="rag-partition")
+
+    # ✅ 파티션 이름
+    def _property_prefix(self, property_id=None) -> str:
+        return f"{self.name}__{property_slug(property_id or self.default_property)}"
+
+    def _parses(self, name: str) -> bool:
+        """현재 파티션 방식의 이름 형식인지 (다른 방식으로 만든 컬렉션은 무시)"""
+        prefix = f"{self.name}__"
+        return name.startswith(prefix) and bool(_PARTITION_SUFFIX[self.by].match(name[len(prefix):]))
+
+    def _split(self, name: str) -> tuple[str, int | None]:
+        """파티션 이름 → (숙소 부분, 연도)"""
+        if self.by == "property_year":
+            prefix, year = name.rsplit("_", 1)
+            return prefix, int(year)
+        return name, None
+
+    def partition_name(self, property_id=None, year: int | None = None) -> str:
+        name = self._property_prefix(property_id)
+        if self.by == "property_year":
+            name = f"{name}_{year or _year_of(now_timestamp())}"
+        return name
+
+    def route(self, metadata: dict | None) -> str:
+        metadata = metadata or {}
+        year = _year_of(metadata["created_at"]) if metadata.get("created_at") is not None else None
+        return self.partition_name(metadata.get("property_id"), year)
+
+    def _collection(self, name: str):
+        with self._lock:
+            col = self._collections.get(name)
+        if col is None:
+            col = self._open_collection(name)
+            with self._lock:
+                self._collections[name] = col
+        return col
+
+    def partition_names(self) -> list[str]:
+        """존재하는 파티션 이름 (다른 워커 / 스크립트가 만든 파티션도 refresh_seconds 마다 반영)"""
+        now = time.monotonic()
+        if now - self._listed_at >= self._refresh_seconds:
+            names = [n for n in self._list_collection_names() if self._parses(n)]
+            with self._lock:
+                for name in list(self._collections):
+                    if name not in names:
+                        del self._collections[name]
+                self._known = sorted(names)
+                self._listed_at = now
+        with self._lock:
+            return sorted(set(self._known) | set(self._collections))
+
+    def select(self, where: dict | None = None) -> list[str]:
+        """where 절의 property_id / created_at 범위에 해당하는 파티션만 선택"""
+        names = self.partition_names()
+        properties = _where_values(where, "property_id")
+        if properties is not None:
+            wanted = {self._property_prefix(p) for p in properties}
+            names = [n for n in names if self._split(n)[0] in wanted]
+        if self.by == "property_year":
+            low, high = _where_year_range(where)
+            names = [
+                n for n in names
+                if (low is None or self._split(n)[1] >= low) and (high is None or self._split(n)[1] <= high)
+            ]
+        return names
+
+    # ✅ 조회
+    def count(self) -> int:
+        return sum(self._collection(name).count() for name in self.partition_names())
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None) -> dict:
+        """파티션 이름순으로 이어 붙인 결과 (offset / limit 은 전체 기준)"""
+        include = ["documents", "metadatas"] if include is None else list(include)
+        result = {"ids": [], **{key: [] for key in include}}
+        skip = offset or 0
+        for name in self.select(where) if ids is None else self.partition_names():
+            if limit is not None and len(result["ids"]) >= limit:
+                break
+            col = self._collection(name)
+            if skip:
+                size = col.count() if ids is None and where is None else len(
+                    col.get(ids=ids, where=where, include=[])["ids"]
+                )
+                if skip >= size:
+                    skip -= size
+                    continue
+            remaining = None if limit is None else limit - len(result["ids"])
+            page = col.get(ids=ids, where=where, limit=remaining, offset=skip or None, include=include)
+            skip = 0
+            result["ids"].extend(page["ids"])
+            for key in include:
+                if page.get(key) is not None:
+                    result[key].extend(list(page[key]))
+        return result
+
+    def query(self, query_embeddings, n_results: int = 10, where: dict | None = None, **kwargs) -> dict:
+        """대상 파티션을 병렬로 검색한 뒤 쿼리별로 거리순 top-k 병합"""
+        names = self.select(where)
+        merged = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        if not names:
+            for key in merged:
+                merged[key] = [[] for _ in query_embeddings]
+            return merged
+
+        def _query(name):
+            col = self._collection(name)
+            if col.count() == 0:
+                return None
+            return col.query(query_embeddings=query_embeddings, n_results=n_results, where=where, **kwargs)
+
+        results = [r for r in self._pool.map(_query, names) if r is not None]
+        for q in range(len(query_embeddings)):
+            hits = []
+            for r in results:
+                metadatas = (r.get("metadatas") or [None] * len(query_embeddings))[q] or [None] * len(r["ids"][q])
+                hits.extend(zip(r["distances"][q], r["ids"][q], r["documents"][q], metadatas))
+            hits.sort(key=lambda hit: hit[0])
+            hits = hits[:n_results]
+            merged["distances"].append([h[0] for h in hits])
+            merged["ids"].append([h[1] for h in hits])
+            merged["documents"].append([h[2] for h in hits])
+            merged["metadatas"].append([h[3] for h in hits])
+        return merged
+
+    # ✅ 쓰기
+    def upsert(self, ids, documents=None, embeddings=None, metadatas=None) -> None:
+        metadatas = metadatas or [{}] * len(ids)
+        groups: dict[str, list[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            groups.setdefault(self.route(metadata), []).append(i)
+        for name, rows in groups.items():
+            self._collection(name).upsert(
+                ids=[ids[i] for i in rows],
+                documents=[documents[i] for i in rows] if documents is not None else None,
+                embeddings=[embeddings[i] for i in rows] if embeddings is not None else None,
+                metadatas=[metadatas[i] for i in rows],
+            )
+
+    def update(self, ids, metadatas=None, documents=None, embeddings=None) -> None:
+        """id 가 실제로 있는 파티션에서 갱신, 새 메타데이터의 파티션이 다르면 그 파티션으로 이동"""
+        position = {doc_id: i for i, doc_id in enumerate(ids)}
+        for name in self.partition_names():
+            col = self._collection(name)
+            found = col.get(ids=list(ids), include=[])["ids"]
+            if not found:
+                continue
+            stay = [d for d in found if metadatas is None or self.route(metadatas[position[d]]) == name]
+            move = [d for d in found if d not in set(stay)] if len(stay) < len(found) else []
+            if stay:
+                rows = [position[doc_id] for doc_id in stay]
+                col.update(
+                    ids=stay,
+                    metadatas=[metadatas[i] for i in rows] if metadatas is not None else None,
+                    documents=[documents[i] for i in rows] if documents is not None else None,
+                    embeddings=[embeddings[i] for i in rows] if embeddings is not None else None,
+                )
+            if move:
+                self._move(col, move, position, metadatas, documents, embeddings)
+
+    def _move(self, col, ids, position, metadatas, documents, embeddings) -> None:
+        """새 파티션에 먼저 쓰고 원래 파티션에서 삭제 (중간에 실패해도 문서가 사라지지 않음)"""
+        current = col.get(ids=ids, include=["documents", "embeddings", "metadatas"])
+        moved_ids = list(current["ids"])
+        rows = [position[doc_id] for doc_id in moved_ids]
+        self.upsert(
+            ids=moved_ids,
+            documents=[documents[i] for i in rows] if documents is not None else list(current["documents"]),
+            embeddings=[embeddings[i] for i in rows] if embeddings is not None else [list(e) for e in current["embeddings"]],
+            metadatas=[metadatas[i] for i in rows],
+        )
+        col.delete(ids=moved_ids)
+        logger.info(f"🔀 {col.name} → 다른 파티션으로 문서 {len(moved_ids)}개 이동")
+
+    def delete(self, ids=None, where=None) -> None:
+        for name in self.partition_names() if ids is not None else self.select(where):
+            self._collection(name).delete(ids=ids, where=where)
+
+    def drop_partitions(self, names: list[str]) -> None:
+        """파티션 컬렉션 자체를 삭제"""
+        for name in names:
+            self._drop_collection(name)
+            with self._lock:
+                self._collections.pop(name, None)
+        self._listed_at = 0.0
+        logger.info(f"🗑️ 파티션 {len(names)}개 삭제: {names}")
@@ -0,0 +1,151 @@
+# app/services/prediction_cache.py
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any
+
+logger = logging.getLogger("soulstay.prediction_cache")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 정규화 (유니코드 NFC + 공백 정리)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class PredictionCache:
+    """
+    콘텐츠 주소 기반 예측 캐시
+
+    - 키: sha256(모델 id + 리비전 + 정규화된 텍스트)
+    - 1차: 프로세스 내 LRU / 2차(선택): SQLite 파일 (워커·재시작 간 공유)
+    - 모델 리비전이 바뀌면 디스크 캐시를 자동으로 비움
+    """
+
+    def __init__(self, model_id: str, revision: str, max_entries: int = 10000, disk_path: str | None = None):
+        self.model_id = model_id
+        self.revision = revision
+        self.namespace = f"{model_id}@{revision}"
+        self.max_entries = max(1, max_entries)
+
+        self._memory: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        self._disk = None
+        if disk_path:
+            try:
+                self._disk = self._open_disk(disk_path)
+                logger.info(f"💾 예측 캐시 디스크 계층 사용: {disk_path}")
+            except sqlite3.Error as e:
+                logger.error(f"❌ 예측 캐시 디스크 계층 초기화 실패, 메모리만 사용: {e}")
+        self.disk_path = disk_path if self._disk is not None else None
+
+    # ✅ 키 생성
+    def key(self, text: str) -> str:
+        payload = f"{self.namespace}\x00{normalize_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ✅ 조회 / 저장
+    def get(self, text: str) -> Any | None:
+        key = self.key(text)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._hits += 1
+                return self._memory[key]
+
+            if self._disk is not None:
+                try:
+                    row = self._disk.execute(
+                        "SELECT value FROM predictions WHERE key = ?", (key,)
+                    ).fetchone()
+                    value = json.loads(row[0]) if row is not None else None
+                except (sqlite3.Error, ValueError) as e:
+                    # 잠김 / 손상된 캐시는 miss 로 처리 → 호출하는 쪽은 그대로 추론
+                    logger.warning(f"⚠️ 예측 캐시 디스크 조회 실패: {e}")
+                    row = None
+                if row is not None:
+                    self._remember(key, value)
+                    self._hits += 1
+                    self._disk_hits += 1
+                    return value
+
+            self._misses += 1
+            return None
+
+    def set(self, text: str, value: Any) -> None:
+        key = self.key(text)
+        with self._lock:
+            self._remember(key, value)
+            if self._disk is not None:
+                try:
+                    self._disk.execute(
+                        "INSERT OR REPLACE INTO predictions (key, value) VALUES (?, ?)",
+                        (key, json.dumps(value, ensure_ascii=False)),
+                    )
+                    self._disk.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ 예측 캐시 디스크 저장 실패: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._disk is not None:
+                try:
+                    self._disk.execute("DELETE FROM predictions")
+                    self._disk.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ 예측 캐시 디스크 비우기 실패: {e}")
+
+    # ✅ 통계
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "model_id": self.model_id,
+                "revision": self.revision,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_ratio": (self._hits / lookups) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_path": self.disk_path,
+            }
+
+    # ✅ 내부 유틸
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _open_disk(self, path: str) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+        row = conn.execute("SELECT value FROM meta WHERE name = 'namespace'").fetchone()
+        if row is None or row[0] != self.namespace:
+            # 모델 리비전 변경 → 이전 예측 무효화
+            if row is not None:
+                logger.info(f"♻️ 모델 리비전 변경 감지 ({row[0]} → {self.namespace}), 예측 캐시 초기화")
+            conn.execute("DELETE FROM predictions")
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('namespace', ?)",
+                (self.namespace,),
+            )
+        conn.commit()
+        return conn
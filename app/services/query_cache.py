@@ -0,0 +1,135 @@
+# app/services/query_cache.py
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from app.services.prediction_cache import normalize_text
+
+logger = logging.getLogger("soulstay.query_cache")
+
+
+class CollectionVersion:
+    """
+    컬렉션 버전 번호 (SQLite, 워커·스크립트 간 공유)
+
+    - 추가 / 삭제 / 재적재 때 bump → 버전이 바뀌면 이전 검색 결과는 모두 무효
+    - 조회는 기본 키 1건 읽기 (임베딩 / 벡터 검색보다 훨씬 저렴)
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS versions (collection TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, collection: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM versions WHERE collection = ?", (collection,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, collection: str) -> int:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO versions (collection, version) VALUES (?, 1) "
+                "ON CONFLICT(collection) DO UPDATE SET version = version + 1",
+                (collection,),
+            )
+            self._conn.commit()
+            return self._conn.execute(
+                "SELECT version FROM versions WHERE collection = ?", (collection,)
+            ).fetchone()[0]
+
+
+class QueryResultCache:
+    """
+    유사도 검색 결과 캐시 (프로세스 내 LRU)
+
+    - 키: (정규화된 쿼리, top_k, 필터, 검색 모드 등) / 값: 검색된 id·텍스트·점수
+    - 항목마다 저장 시점의 컬렉션 버전을 기록, 버전이 다르면 miss 로 처리
+    - 적중 시 임베딩 호출과 벡터 검색을 모두 건너뜀 → 절약된 시간(miss 때 측정한 소요 시간)을 누적
+    """
+
+    def __init__(self, collection: str, versions: CollectionVersion, max_entries: int = 2048):
+        self.collection = collection
+        self.versions = versions
+        self.max_entries = max(1, max_entries)
+
+        self._entries: OrderedDict[str, tuple[int, list[dict], float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._uncached = 0
+        self._saved_seconds = 0.0
+
+    @staticmethod
+    def key(query: str, top_k: int, filters: dict | None = None, **params) -> str:
+        payload = {"query": normalize_text(query), "top_k": top_k, "filters": filters or {}, **params}
+        return json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+
+    def get_or_compute(self, key: str, compute, cacheable=None) -> list[dict]:
+        """
+        캐시된 결과 반환, 없거나 버전이 바뀌었으면 compute() 실행 후 저장
+
+        cacheable(version): compute() 결과가 이 컬렉션 버전을 반영하는지 확인
+        (False 면 저장하지 않음 — 예: 재적재 중인 BM25 색인이 이전 버전으로 답한 경우)
+        """
+        version = self.versions.get(self.collection)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                self._saved_seconds += entry[2]
+                return [dict(match) for match in entry[1]]
+            if entry is not None:
+                self._stale += 1
+            self._misses += 1
+
+        started = time.perf_counter()
+        matches = compute()
+        elapsed = time.perf_counter() - started
+        if cacheable is not None and not cacheable(version):
+            with self._lock:
+                self._uncached += 1
+            return matches
+
+        with self._lock:
+            self._entries[key] = (version, [dict(match) for match in matches], elapsed)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return matches
+
+    def invalidate(self) -> int:
+        """컬렉션 버전을 올려 모든 워커의 캐시 결과를 무효화"""
+        version = self.versions.bump(self.collection)
+        with self._lock:
+            self._entries.clear()
+        return version
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "collection": self.collection,
+                "version": self.versions.get(self.collection),
+                "hits": self._hits,
+                "misses": self._misses,
+                "stale_misses": self._stale,
+                "uncached": self._uncached,
+                "hit_ratio": (self._hits / lookups) if lookups else 0.0,
+                "saved_seconds": round(self._saved_seconds, 4),
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
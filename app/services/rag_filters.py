@@ -0,0 +1,134 @@
+# app/services/rag_filters.py
+import time
+from datetime import datetime, timezone
+
+# 검색 필터로 쓸 수 있는 메타데이터 키
+FILTER_FIELDS = ("emotion", "user_id", "source", "property_id")
+
+# 로컬 감정 모델 라벨 → 저장/검색에 쓰는 영문 라벨
+_EMOTION_LABELS = {"긍정": "positive", "부정": "negative", "중립": "neutral"}
+
+
+def normalize_emotion(value: str | None) -> str | None:
+    """감정 라벨 통일 (한국어 라벨 / 대소문자 차이 제거)"""
+    if not value:
+        return None
+    value = value.strip()
+    return _EMOTION_LABELS.get(value, value.lower())
+
+
+def to_timestamp(value) -> int | None:
+    """datetime / ISO 문자열 / 숫자 → epoch 초 (Chroma 범위 조건은 숫자만 지원)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def now_timestamp() -> int:
+    return int(time.time())
+
+
+def resolve_relative_filters(filters: dict | None, bucket_seconds: int = 0) -> dict | None:
+    """
+    since_days(현재 시각 기준) → 절대 시각 created_after 로 변환
+
+    bucket_seconds 단위로 내림 → 같은 구간 안의 요청은 같은 필터(= 같은 캐시 키)가 됨
+    (구간 길이만큼 더 오래된 문서까지 포함될 수 있음)
+    """
+    if not filters or not filters.get("since_days"):
+        return filters
+    resolved = {k: v for k, v in filters.items() if k != "since_days"}
+    since = now_timestamp() - int(filters["since_days"]) * 86400
+    if bucket_seconds > 0:
+        since -= since % bucket_seconds
+    created_after = to_timestamp(filters.get("created_after"))
+    resolved["created_after"] = max(created_after or since, since)
+    return resolved
+
+
+def build_where(filters: dict | None) -> dict | None:
+    """
+    검색 필터 → Chroma where 절
+
+    지원 키:
+        emotion / user_id / source / property_id: 값 1개 또는 리스트($in)
+        created_after / created_before: datetime, ISO 문자열, epoch 초
+        since_days: 최근 N일
+    """
+    if not filters:
+        return None
+
+    clauses = []
+    for field in FILTER_FIELDS:
+        value = filters.get(field)
+        if value is None or value == []:
+            continue
+        if field == "emotion":
+            value = [normalize_emotion(v) for v in value] if isinstance(value, (list, tuple, set)) else normalize_emotion(value)
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            clauses.append({field: values[0]} if len(values) == 1 else {field: {"$in": values}})
+        else:
+            clauses.append({field: value})
+
+    filters = resolve_relative_filters(filters)
+    created_after = to_timestamp(filters.get("created_after"))
+    if created_after is not None:
+        clauses.append({"created_at": {"$gte": created_after}})
+
+    created_before = to_timestamp(filters.get("created_before"))
+    if created_before is not None:
+        clauses.append({"created_at": {"$lte": created_before}})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _match_condition(value, condition) -> bool:
+    if not isinstance(condition, dict):
+        return value == condition
+    for op, expected in condition.items():
+        if op == "$eq" and value != expected:
+            return False
+        if op == "$ne" and value == expected:
+            return False
+        if op == "$in" and value not in expected:
+            return False
+        if op == "$nin" and value in expected:
+            return False
+        if op in ("$gt", "$gte", "$lt", "$lte"):
+            if not isinstance(value, (int, float)):
+                return False
+            if op == "$gt" and not value > expected:
+                return False
+            if op == "$gte" and not value >= expected:
+                return False
+            if op == "$lt" and not value < expected:
+                return False
+            if op == "$lte" and not value <= expected:
+                return False
+    return True
+
+
+def matches_where(metadata: dict | None, where: dict | None) -> bool:
+    """Chroma where 절을 메타데이터 dict 에 적용 (Chroma 밖의 인덱스용)"""
+    if not where:
+        return True
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, c) for c in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, c) for c in condition):
+                return False
+        elif not _match_condition(metadata.get(key), condition):
+            return False
+    return True
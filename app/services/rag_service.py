@@ -1,35 +1,424 @@
+import os
 import csv
 import logging
-from app.vectorstore import collection, embedding_function
+from functools import lru_cache
+from app.config import settings
+from app.vectorstore import (
+    PLACEHOLDER_EMBEDDING,
+    chroma_client,
+    collection,
+    collection_name,
+    embedding_backend,
+    embedding_function,
+    get_float_collection,
+    vectors_in_index,
+)
+from app.services.feedback_dedup import (
+    DuplicateStats,
+    SimHashIndex,
+    content_hash,
+    feedback_id,
+    find_exact_duplicate,
+    simhash,
+)
+from app.services.chunker import batched
+from app.services.lexical_index import BM25Index, reciprocal_rank_fusion
+from app.services.rag_filters import build_where, normalize_emotion, now_timestamp, resolve_relative_filters
+from app.services.rag_stats import RagStats
+from app.services.query_cache import CollectionVersion, QueryResultCache
+from app.services.partitioned_collection import PartitionedCollection
 
 logger = logging.getLogger("soulstay.rag_service")
 
-# ✅ CSV 기반 초기 데이터 로드
-def load_feedback_csv(csv_path: str):
-    """feedback_samples.csv 파일을 읽어서 ChromaDB에 임베딩 추가"""
+# ✅ 중복 판정 (정확: content_hash 메타데이터 조회 / 근사: SimHash 인덱스)
+duplicate_stats = DuplicateStats()
+near_duplicate_index = SimHashIndex(settings.rag_near_duplicate_max_distance)
+
+# ✅ BM25 어휘 색인 (첫 검색 때 컬렉션에서 적재, 이후 수집과 함께 갱신)
+SEARCH_MODES = ("vector", "lexical", "hybrid")
+lexical_index = BM25Index(refresh_seconds=settings.rag_lexical_refresh_seconds)
+
+# ✅ 통계 카운터 (조회 시 컬렉션 전체를 읽지 않음)
+rag_stats = RagStats(settings.rag_stats_path)
+
+# ✅ 컬렉션 버전 (워커 간 공유) + 검색 결과 캐시 (같은 쿼리는 컬렉션이 바뀔 때까지 임베딩 / 벡터 검색 생략)
+collection_versions = CollectionVersion(settings.rag_query_cache_version_path)
+query_cache = (
+    QueryResultCache(collection_name, collection_versions, settings.rag_query_cache_max_entries)
+    if settings.rag_query_cache_enabled
+    else None
+)
+
+
+def _collection_changed() -> None:
+    """추가 / 삭제 / 재적재 후 호출 → 버전 증가 (캐시된 검색 결과 무효화, BM25 색인은 자기 쓰기만큼 버전 갱신)"""
+    if query_cache is not None:
+        version = query_cache.invalidate()
+    else:
+        version = collection_versions.bump(collection_name)
+    lexical_index.advance(version)
+
+
+@lru_cache(maxsize=1)
+def get_vector_index():
+    """
+    VECTOR_BACKEND=numpy 일 때 메모리 매핑 인덱스 (비어 있으면 Chroma 컬렉션에서 1회 적재)
+
+    int8 모드(vectors_in_index)에서는 인덱스가 벡터 원본 저장소 → 비어 있으면 기존 float 컬렉션에서 옮겨 담음
+    """
+    if settings.vector_backend != "numpy":
+        return None
+    from app.services.numpy_vector_index import NumpyVectorIndex
+
+    index = NumpyVectorIndex(
+        os.path.join(settings.numpy_index_dir, collection_name),
+        embedding_backend.dimensions,
+        settings.numpy_index_dtype,
+        settings.numpy_index_rescore_factor,
+    )
+    if index.count() == 0:
+        if vectors_in_index:
+            _move_vectors_to_index(index)
+        elif collection.count() > 0:
+            index.build_from_collection(collection, _upsert_batch_size())
+    return index
+
+
+def _move_vectors_to_index(index) -> None:
+    """
+    float 임베딩 컬렉션 → int8 인덱스 (1회)
+    문서 / 메타데이터는 자리표시 임베딩과 함께 문서 컬렉션에 복사 (기존 float 컬렉션은 그대로 둠, 확인 후 직접 삭제)
+    """
+    source = get_float_collection()
+    if source is None or source.count() == 0:
+        return
+    batch_size = _upsert_batch_size()
+    moved = 0
+    for offset in range(0, source.count(), batch_size):
+        page = source.get(include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset)
+        if not page["ids"]:
+            break
+        index.upsert(page["ids"], page["embeddings"], page["documents"], page["metadatas"])
+        collection.upsert(
+            ids=page["ids"],
+            documents=page["documents"],
+            embeddings=_stored_embeddings(page["embeddings"]),
+            metadatas=page["metadatas"],
+        )
+        moved += len(page["ids"])
+    _collection_changed()
+    logger.info(f"📦 float 컬렉션 → int8 인덱스 이전 완료 ({moved}개, 기존 컬렉션은 삭제해도 됩니다)")
+
+
+def _stored_embeddings(embeddings: list) -> list:
+    """Chroma 에 기록할 임베딩 (벡터를 인덱스에만 저장하는 모드면 1차원 자리표시)"""
+    return [PLACEHOLDER_EMBEDDING] * len(embeddings) if vectors_in_index else embeddings
+
+
+def _feedback_metadata(text: str, **extra) -> dict:
+    """
+    문서와 함께 저장하는 메타데이터
+
+    - content_hash / simhash: 중복 판정용
+    - emotion / user_id / source / property_id / created_at(epoch 초): 검색 필터용
+    - 파티션 사용 시 property_id 가 없으면 기본 숙소로 기록 (파티션 선택과 필터가 일치하도록)
+    - None 값은 Chroma 가 받지 않으므로 제외
+    """
+    metadata = {
+        "content_hash": content_hash(text),
+        "simhash": f"{simhash(text):016x}",
+        "created_at": now_timestamp(),
+    }
+    if "emotion" in extra:
+        extra["emotion"] = normalize_emotion(extra["emotion"])
+    if settings.rag_partition_by != "none":
+        extra["property_id"] = extra.get("property_id") or settings.rag_default_property
+    if extra.get("property_id") is not None:
+        extra["property_id"] = str(extra["property_id"])
+    metadata.update({k: v for k, v in extra.items() if v is not None})
+    return metadata
+
+
+def _document_id(text: str, metadata: dict, scope_source: bool = False) -> str:
+    """
+    문서 id — 파티션 사용 시 숙소별로 구분 (같은 텍스트라도 숙소마다 별개 문서)
+
+    scope_source=True: 출처(source)까지 id 에 포함 → CSV 마다 별개 문서 (CSV 동기화용)
+    """
+    scope = [metadata.get("property_id")] if settings.rag_partition_by != "none" else []
+    if scope_source:
+        scope.append(metadata.get("source"))
+    return feedback_id(text, *scope)
+
+
+# 중복 판정 범위: 파티션 사용 시 같은 숙소 안에서만 (정확 중복 where 조건 / SimHash scope)
+_DUPLICATE_SCOPE_KEY = "property_id" if settings.rag_partition_by != "none" else None
+
+
+def _duplicate_scope(metadata: dict) -> dict | None:
+    return {_DUPLICATE_SCOPE_KEY: metadata[_DUPLICATE_SCOPE_KEY]} if _DUPLICATE_SCOPE_KEY else None
+
+
+def _upsert_batch_size() -> int:
     try:
-        # 기존 데이터 완전 삭제 (새로 로드하기 위해)
-        try:
-            existing_ids = collection.get()['ids']
-            if existing_ids:
-                collection.delete(ids=existing_ids)
-                logger.info(f"🗑️ 기존 {len(existing_ids)}개 데이터 삭제")
-        except:
-            pass
-
-        with open(csv_path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            texts = [row["text"].strip() for row in reader if row.get("text")]
-
-        if not texts:
+        return max(1, min(settings.rag_upsert_batch_size, chroma_client.get_max_batch_size()))
+    except Exception:
+        return max(1, settings.rag_upsert_batch_size)
+
+
+# ✅ 대량 upsert (콘텐츠 주소 id → 재실행해도 새 행만 임베딩)
+def upsert_feedback_batch(texts: list[str], metadatas: list[dict] | None = None, progress=None,
+                          collected_ids: list | None = None, scope_source: bool = False) -> dict:
+    """
+    피드백 여러 개를 한 번에 upsert
+
+    - id = 텍스트 해시 (파티션 사용 시 + 숙소) → 같은 텍스트는 항상 같은 문서 (동시 실행해도 충돌 없음)
+    - 이미 있는 문서: 메타데이터가 같으면 skipped, 다르면 메타데이터만 갱신(updated, 재임베딩 없음)
+    - 새 문서만 임베딩 후 큰 배치로 collection.upsert
+    - collected_ids: 주어지면 처리한 문서 id 를 추가
+    - scope_source: id 에 source 메타데이터 포함 (출처별로 따로 관리할 때)
+
+    Returns:
+        {"inserted": n, "updated": n, "skipped": n}
+    """
+    counts = {"inserted": 0, "updated": 0, "skipped": 0}
+    metadatas = metadatas or [{}] * len(texts)
+    index = get_vector_index()  # int8 모드 첫 실행이면 기존 벡터를 먼저 옮긴 뒤 존재 여부 확인
+
+    # 입력 안의 중복 / 빈 텍스트 정리 (같은 id 는 마지막 메타데이터 사용)
+    pending: dict[str, tuple[str, dict]] = {}
+    for text, extra in zip(texts, metadatas):
+        text = (text or "").strip()
+        if not text:
+            counts["skipped"] += 1
+            continue
+        metadata = _feedback_metadata(text, **(extra or {}))
+        doc_id = _document_id(text, metadata, scope_source)
+        if doc_id in pending:
+            counts["skipped"] += 1
+        pending[doc_id] = (text, metadata)
+    if collected_ids is not None:
+        collected_ids.extend(pending)
+
+    batch_size = _upsert_batch_size()
+    ids = list(pending)
+    new_ids: list[str] = []
+    update_ids, update_metadatas, replaced_metadatas = [], [], []
+
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        existing = collection.get(ids=chunk, include=["metadatas"])
+        existing_meta = dict(zip(existing["ids"], existing["metadatas"] or []))
+        for doc_id in chunk:
+            if doc_id not in existing_meta:
+                new_ids.append(doc_id)
+                continue
+            metadata = pending[doc_id][1]
+            current = existing_meta[doc_id] or {}
+            # 처음 들어온 시각은 유지 (재실행할 때마다 갱신되지 않게)
+            if "created_at" in current:
+                metadata["created_at"] = current["created_at"]
+            if current == metadata:
+                counts["skipped"] += 1
+            else:
+                update_ids.append(doc_id)
+                update_metadatas.append(metadata)
+                replaced_metadatas.append(current)
+
+    for start in range(0, len(update_ids), batch_size):
+        collection.update(
+            ids=update_ids[start:start + batch_size],
+            metadatas=update_metadatas[start:start + batch_size],
+        )
+    if index is not None and update_ids:
+        index.update_metadata(update_ids, update_metadatas)
+    if lexical_index.loaded and update_ids:
+        lexical_index.update_metadata(update_ids, update_metadatas)
+    rag_stats.apply(added=update_metadatas, removed=replaced_metadatas)
+    counts["updated"] = len(update_ids)
+
+    if new_ids:
+        new_texts = [pending[doc_id][0] for doc_id in new_ids]
+        new_metadatas = [pending[doc_id][1] for doc_id in new_ids]
+        embeddings = embedding_function(new_texts, progress=progress)
+        for start in range(0, len(new_ids), batch_size):
+            end = start + batch_size
+            collection.upsert(
+                ids=new_ids[start:end],
+                documents=new_texts[start:end],
+                embeddings=_stored_embeddings(embeddings[start:end]),
+                metadatas=new_metadatas[start:end],
+            )
+            if index is not None:
+                index.upsert(new_ids[start:end], embeddings[start:end], new_texts[start:end], new_metadatas[start:end])
+            if lexical_index.loaded:
+                lexical_index.add(new_ids[start:end], new_texts[start:end], new_metadatas[start:end])
+            rag_stats.apply(added=new_metadatas[start:end])
+        if near_duplicate_index.loaded:
+            for doc_id, metadata in zip(new_ids, new_metadatas):
+                near_duplicate_index.add(
+                    int(metadata["simhash"], 16),
+                    metadata.get(_DUPLICATE_SCOPE_KEY) if _DUPLICATE_SCOPE_KEY else None,
+                    doc_id,
+                )
+    counts["inserted"] = len(new_ids)
+    if new_ids or update_ids:
+        _collection_changed()
+
+    logger.info(
+        f"📥 피드백 upsert 완료: 추가 {counts['inserted']} / 갱신 {counts['updated']} / 건너뜀 {counts['skipped']}"
+    )
+    return counts
+
+
+# ✅ 청크 스트림 수집 (배치 단위로 임베딩 → upsert, 전체를 메모리에 올리지 않음)
+def ingest_chunks(chunks, batch_size: int | None = None, label: str = "청크",
+                  collected_ids: list | None = None, **extra) -> dict:
+    """
+    chunker 가 만든 {"text", "metadata"} 스트림을 batch_size 개씩 upsert
+
+    collected_ids: 주어지면 처리한 청크 id 를 추가 (증분 수집 매니페스트용)
+    extra: 모든 청크에 공통으로 붙일 메타데이터 (예: user_id=0)
+    """
+    totals = {"inserted": 0, "updated": 0, "skipped": 0}
+    processed = 0
+    for batch in batched(chunks, batch_size or settings.rag_ingest_batch_size):
+        counts = upsert_feedback_batch(
+            [chunk["text"] for chunk in batch],
+            [{**chunk["metadata"], **extra} for chunk in batch],
+            collected_ids=collected_ids,
+        )
+        for key in totals:
+            totals[key] += counts[key]
+        processed += len(batch)
+        logger.info(f"📈 {label}: {processed}개 청크 처리")
+    return totals
+
+
+# ✅ 문서 삭제 (id 기준)
+def delete_feedback(ids: list[str]) -> int:
+    """id 목록의 문서를 벡터DB(+ NumPy 인덱스)에서 삭제"""
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return 0
+    index = get_vector_index()
+    batch_size = _upsert_batch_size()
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        # 통계 차감을 위해 실제로 있던 문서의 메타데이터를 먼저 조회
+        existing = collection.get(ids=chunk, include=["metadatas"])
+        collection.delete(ids=chunk)
+        rag_stats.apply(removed=existing["metadatas"] or [])
+    if index is not None:
+        index.delete(ids)
+    if lexical_index.loaded:
+        lexical_index.remove(ids)
+    if near_duplicate_index.loaded:
+        # 삭제된 문서가 근사 중복으로 잡히지 않도록 해당 해시만 제거 (인덱스 전체 재구성 없음)
+        near_duplicate_index.remove(ids)
+    _collection_changed()
+    logger.info(f"🗑️ 문서 {len(ids)}개 삭제")
+    return len(ids)
+
+
+# ✅ 숙소 단위 삭제 (파티션 사용 시 해당 숙소 컬렉션만 비우고 제거, 다른 숙소 검색은 영향 없음)
+def drop_property(property_id: str) -> int:
+    """property_id 의 문서를 모두 삭제 (NumPy / BM25 인덱스, 통계, 검색 캐시도 함께 갱신)"""
+    where = {"property_id": str(property_id)}
+    ids = collection.get(where=where, include=[])["ids"]
+    deleted = delete_feedback(ids)
+    if isinstance(collection, PartitionedCollection):
+        collection.drop_partitions(collection.select(where))
+    return deleted
+
+
+# ✅ CSV 기반 데이터 동기화 (행 해시 비교 → 바뀐 행만 임베딩, 사라진 행 삭제)
+def _read_feedback_csv(csv_path: str) -> tuple[list[str], list[dict]]:
+    source = os.path.basename(csv_path)
+    texts, metadatas = [], []
+    with open(csv_path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row.get("text") and row["text"].strip():
+                texts.append(row["text"].strip())
+                metadatas.append({
+                    "emotion": row.get("emotion") or None,
+                    "source": source,
+                    "property_id": row.get("property_id") or None,
+                })
+    return texts, metadatas
+
+
+def _source_metadatas(source: str) -> dict[str, dict]:
+    """source 메타데이터가 같은 문서 id → 메타데이터 (페이지 단위 조회, 임베딩은 읽지 않음)"""
+    batch_size = _upsert_batch_size()
+    found: dict[str, dict] = {}
+    offset = 0
+    while True:
+        page = collection.get(where={"source": source}, include=["metadatas"], limit=batch_size, offset=offset)
+        found.update(zip(page["ids"], page["metadatas"] or []))
+        if len(page["ids"]) < batch_size:
+            return found
+        offset += batch_size
+
+
+def sync_feedback_csv(csv_path: str, rebuild: bool = False, progress=None) -> dict:
+    """
+    CSV 를 벡터DB 와 동기화
+
+    - 행 id = (출처 CSV, 텍스트) 해시 → 다른 CSV 와 같은 텍스트가 있어도 문서를 공유하지 않음
+      (한쪽 CSV 에서 행을 지워도 다른 CSV 의 문서는 그대로, source 가 번갈아 바뀌지 않음)
+    - 행 내용(텍스트 + 감정)을 저장된 메타데이터와 비교
+      → 새 행만 임베딩, 감정만 바뀐 행은 메타데이터만 갱신, CSV 에서 사라진 행은 삭제
+    - rebuild=True: 이 CSV 에서 온 문서를 모두 지우고 다시 적재 (기존 전체 재구축 방식)
+      → deleted = 지운 기존 문서 수, added = 다시 넣은 문서 수, unchanged = 0
+
+    Returns:
+        {"added": n, "updated": n, "deleted": n, "unchanged": n}
+    """
+    source = os.path.basename(csv_path)
+    get_vector_index()  # int8 모드 첫 실행이면 기존 벡터를 먼저 옮김 (기존 행 비교 전)
+    texts, metadatas = _read_feedback_csv(csv_path)
+    if not texts:
+        # 빈 CSV 로 기존 문서를 모두 지우지 않도록 아무것도 하지 않음
+        return {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    existing = _source_metadatas(source)
+    if rebuild and existing:
+        delete_feedback(list(existing))
+    upserted_ids: list[str] = []
+    counts = upsert_feedback_batch(texts, metadatas, progress=progress, collected_ids=upserted_ids, scope_source=True)
+    current_ids = set(upserted_ids)
+
+    removed = [doc_id for doc_id in existing if doc_id not in current_ids]
+    if removed and not rebuild:
+        delete_feedback(removed)
+
+    if rebuild:
+        # 기존 문서를 모두 지우고 다시 넣었으므로 변경 없는 행은 없음
+        summary = {"added": counts["inserted"], "updated": 0, "deleted": len(existing), "unchanged": 0}
+    else:
+        summary = {
+            "added": counts["inserted"],
+            "updated": counts["updated"],
+            "deleted": len(removed),
+            "unchanged": len(current_ids) - counts["inserted"] - counts["updated"],
+        }
+    logger.info(
+        f"🔄 {source} 동기화{' (재구축)' if rebuild else ''}: 추가 {summary['added']} / 갱신 {summary['updated']} / "
+        f"삭제 {summary['deleted']} / 변경 없음 {summary['unchanged']}"
+    )
+    return summary
+
+
+def load_feedback_csv(csv_path: str, progress=None, rebuild: bool = False):
+    """feedback_samples.csv 파일을 ChromaDB와 동기화 (바뀐 행만 임베딩, progress: 임베딩 진행률 콜백)"""
+    try:
+        summary = sync_feedback_csv(csv_path, rebuild=rebuild, progress=progress)
+        if not any(summary.values()):
             logger.warning("⚠️ CSV 파일이 비어있거나 'text' 컬럼이 없습니다.")
             return
 
-        embeddings = embedding_function(texts)
-        ids = [f"fb_{i}" for i in range(len(texts))]
-        collection.add(documents=texts, embeddings=embeddings, ids=ids)
-
-        logger.info(f"✅ {len(texts)}개의 피드백을 RAG 벡터DB에 추가 완료")
+        logger.info(f"✅ 피드백 CSV 를 RAG 벡터DB에 반영 완료 ({summary})")
+        return summary
 
     except FileNotFoundError:
         logger.error(f"❌ CSV 파일을 찾을 수 없습니다: {csv_path}")
@@ -38,30 +427,53 @@ def load_feedback_csv(csv_path: str):
 
 
 # ✅ 새 피드백 추가 (중복 체크 포함)
-def add_feedback_to_rag(user_id: int, feedback_text: str):
-    """새로운 사용자 피드백을 RAG 벡터DB에 추가"""
+def add_feedback_to_rag(user_id: int, feedback_text: str, emotion: str | None = None, source: str = "user",
+                        property_id: str | None = None):
+    """새로운 사용자 피드백을 RAG 벡터DB에 추가 (emotion / source / property_id 는 검색 필터용 메타데이터)"""
     try:
         feedback_text = feedback_text.strip()
         if not feedback_text:
             logger.warning("⚠️ 빈 피드백은 추가하지 않습니다.")
             return
+        index = get_vector_index()
 
-        # 중복 피드백 확인
-        existing = collection.query(query_texts=[feedback_text], n_results=1)
-        if existing and existing.get("documents") and existing["documents"][0]:
-            existing_text = existing["documents"][0][0]
-            if existing_text == feedback_text:
-                logger.info("⚠️ 동일한 피드백이 이미 존재합니다. 추가하지 않습니다.")
+        metadata = _feedback_metadata(
+            feedback_text, user_id=user_id, emotion=emotion, source=source, property_id=property_id
+        )
+
+        # 정확 중복: 해시 메타데이터 조회만으로 판정 (임베딩 계산 전)
+        if find_exact_duplicate(collection, metadata["content_hash"], _duplicate_scope(metadata)):
+            duplicate_stats.record("exact")
+            logger.info("⚠️ 동일한 피드백이 이미 존재합니다. 추가하지 않습니다.")
+            return
+
+        # 근사 중복: SimHash 해밍 거리 (선택)
+        fingerprint = int(metadata["simhash"], 16)
+        scope = metadata.get(_DUPLICATE_SCOPE_KEY) if _DUPLICATE_SCOPE_KEY else None
+        if settings.rag_near_duplicate_enabled:
+            near_duplicate_index.load_from_collection(collection, _DUPLICATE_SCOPE_KEY)
+            if near_duplicate_index.find(fingerprint, scope) is not None:
+                duplicate_stats.record("near")
+                logger.info("⚠️ 거의 같은 피드백이 이미 존재합니다. 추가하지 않습니다.")
                 return
 
         embedding = embedding_function([feedback_text])[0]
-        doc_id = f"fb_user_{user_id}_{collection.count() + 1}"
+        doc_id = _document_id(feedback_text, metadata)
 
-        collection.add(
+        collection.upsert(
             documents=[feedback_text],
-            embeddings=[embedding],
+            embeddings=_stored_embeddings([embedding]),
+            metadatas=[metadata],
             ids=[doc_id],
         )
+        if index is not None:
+            index.upsert([doc_id], [embedding], [feedback_text], [metadata])
+        if lexical_index.loaded:
+            lexical_index.add([doc_id], [feedback_text], [metadata])
+        if near_duplicate_index.loaded:
+            near_duplicate_index.add(fingerprint, scope, doc_id)
+        rag_stats.apply(added=[metadata])
+        _collection_changed()
 
         logger.info(f"🆕 새로운 피드백 추가 완료 (user_id={user_id})")
 
@@ -70,26 +482,93 @@ def add_feedback_to_rag(user_id: int, feedback_text: str):
 
 
 # ✅ 유사 피드백 검색 (RAG Retrieval)
-def search_similar_feedback(query: str, top_k: int = 3, min_score: float = 0.1):
-    """입력 텍스트와 유사한 피드백 검색"""
+def _vector_search(query: str, n_results: int, where: dict | None) -> list[dict]:
+    """임베딩 검색 → [{"id", "text", "distance"}] (거리 오름차순)"""
+    query_embedding = embedding_function([query])[0]
+
+    index = get_vector_index()
+    if index is not None:
+        return index.search(query_embedding, n_results, where=where)
+
+    results = collection.query(query_embeddings=[query_embedding], n_results=n_results, where=where)
+    if not results or "documents" not in results:
+        return []
+    return [
+        {"id": i, "text": t, "distance": float(d)}
+        for i, t, d in zip(results["ids"][0], results["documents"][0], results["distances"][0])
+    ]
+
+
+def _lexical_search(query: str, n_results: int, where: dict | None) -> list[dict]:
+    """BM25 검색 (프로세스 내 색인, 네트워크 호출 없음)"""
+    get_vector_index()  # int8 모드 첫 실행이면 문서 컬렉션을 먼저 채움
+    lexical_index.ensure_fresh(collection, collection_versions.get(collection_name))
+    return lexical_index.search(query, n_results, where=where)
+
+
+def _search(query: str, top_k: int, min_score: float, where: dict | None, mode: str) -> list[dict]:
+    """검색 모드별 실행 → [{"id", "text", "score"}]"""
+    if mode == "lexical":
+        hits = _lexical_search(query, top_k, where)
+        return [{"id": hit["id"], "text": hit["text"], "score": hit["score"]} for hit in hits]
+    if mode == "hybrid":
+        candidates = max(top_k, settings.rag_hybrid_candidates)
+        vector_hits = [hit for hit in _vector_search(query, candidates, where) if hit["distance"] > min_score]
+        lexical_hits = _lexical_search(query, candidates, where)
+        return reciprocal_rank_fusion([vector_hits, lexical_hits], settings.rag_rrf_k, top_k)
+    return [
+        {"id": hit["id"], "text": hit["text"], "score": hit["distance"]}
+        for hit in _vector_search(query, top_k, where)
+        if hit["distance"] > min_score
+    ]
+
+
+def _search_is_current(mode: str):
+    """BM25 를 쓰는 모드는 색인이 캐시 버전까지 재적재된 뒤에만 결과를 캐시 (재적재 중 결과는 그대로 반환만)"""
+    if mode == "vector":
+        return None
+    return lambda version: lexical_index.version == version
+
+
+def search_similar_feedback(
+    query: str,
+    top_k: int = 3,
+    min_score: float = 0.1,
+    filters: dict | None = None,
+    mode: str = "vector",
+):
+    """
+    입력 텍스트와 유사한 피드백 검색
+
+    mode:
+        vector  — 임베딩 검색 (VECTOR_BACKEND 에 따라 Chroma 또는 NumPy), score = 거리
+        lexical — BM25 문자 n-gram 검색 (임베딩 / 네트워크 호출 없음), score = BM25 점수
+        hybrid  — 두 결과를 RRF 로 결합, score = RRF 점수
+    filters: emotion / user_id / source / created_after / created_before / since_days
+             → where 절로 변환해 점수 계산 전에 후보를 줄임
+
+    같은 (쿼리, top_k, filters, mode) 는 컬렉션 버전이 바뀔 때까지 캐시된 결과 반환
+    (since_days 는 rag_query_cache_time_bucket_seconds 단위의 절대 시각으로 바꿔 키에 사용)
+    """
     try:
         if not query.strip():
             logger.warning("⚠️ 빈 쿼리로 검색 요청됨.")
             return []
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"지원하지 않는 검색 모드입니다: {mode} (지원: {', '.join(SEARCH_MODES)})")
 
-        query_embedding = embedding_function([query])[0]
-        results = collection.query(query_embeddings=[query_embedding], n_results=top_k)
+        if query_cache is None:
+            matches = _search(query, top_k, min_score, build_where(filters), mode)
+        else:
+            # since_days 는 현재 시각 기준 → 절대 시각으로 바꾼 필터로 키와 where 절을 함께 만듦
+            filters = resolve_relative_filters(filters, settings.rag_query_cache_time_bucket_seconds)
+            where = build_where(filters)
+            key = QueryResultCache.key(query, top_k, filters, mode=mode, min_score=min_score)
+            matches = query_cache.get_or_compute(
+                key, lambda: _search(query, top_k, min_score, where, mode), cacheable=_search_is_current(mode)
+            )
 
-        if not results or "documents" not in results:
-            return []
-
-        matches = [
-            {"text": t, "score": float(s)}
-            for t, s in zip(results["documents"][0], results["distances"][0])
-            if float(s) > min_score
-        ]
-
-        logger.info(f"🔍 유사 피드백 {len(matches)}개 검색 완료")
+        logger.info(f"🔍 유사 피드백 {len(matches)}개 검색 완료 ({mode})")
         return matches
 
     except Exception as e:
@@ -97,12 +576,41 @@ def search_similar_feedback(query: str, top_k: int = 3, min_score: float = 0.1):
         return []
 
 
+# ✅ RAG 통계 (카운터 조회 / 재집계)
+def get_rag_stats() -> dict:
+    """출처 / 감정 / 사용자별 문서 수와 인덱스 디스크 사용량 (카운터 테이블만 읽음)"""
+    return rag_stats.snapshot()
+
+
+def get_query_cache_stats() -> dict:
+    """검색 결과 캐시 적중률 / 절약된 시간"""
+    if query_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **query_cache.stats()}
+
+
+def reconcile_rag_stats() -> dict | None:
+    """실제 컬렉션 메타데이터로 카운터를 다시 집계 (스케줄러에서 주기적으로 실행)"""
+    try:
+        disk_paths = [settings.chroma_db_path]
+        if settings.vector_backend == "numpy":
+            disk_paths.append(settings.numpy_index_dir)
+        return rag_stats.reconcile(collection, disk_paths, _upsert_batch_size())
+    except Exception as e:
+        logger.exception(f"❌ RAG 통계 재집계 실패: {e}")
+        return None
+
+
 # ✅ RAG 상태 확인용 함수
 def get_rag_status():
     """현재 RAG 데이터 상태 반환"""
     try:
         count = collection.count()
-        return {"total_documents": count}
+        return {
+            "total_documents": count,
+            "skipped_duplicates": duplicate_stats.snapshot(),
+            "query_cache": get_query_cache_stats(),
+        }
     except Exception as e:
         logger.exception(f"RAG 상태 확인 실패: {e}")
         return {"error": str(e)}
@@ -113,13 +621,26 @@ class RAGService:
     """RAG 관련 기능을 묶은 서비스 클래스"""
 
     @staticmethod
-    def load_feedback_csv(csv_path: str):
-        return load_feedback_csv(csv_path)
+    def load_feedback_csv(csv_path: str, progress=None, rebuild: bool = False):
+        return load_feedback_csv(csv_path, progress, rebuild)
+
+    @staticmethod
+    def add_feedback_to_rag(user_id: int, feedback_text: str, emotion: str | None = None, source: str = "user",
+                            property_id: str | None = None):
+        return add_feedback_to_rag(user_id, feedback_text, emotion, source, property_id)
+
+    @staticmethod
+    def upsert_feedback_batch(texts: list[str], metadatas: list[dict] | None = None, progress=None):
+        return upsert_feedback_batch(texts, metadatas, progress)
+
+    @staticmethod
+    def search_similar_feedback(query: str, top_k: int = 3, filters: dict | None = None, mode: str = "vector"):
+        return search_similar_feedback(query, top_k, filters=filters, mode=mode)
 
     @staticmethod
-    def add_feedback_to_rag(user_id: int, feedback_text: str):
-        return add_feedback_to_rag(user_id, feedback_text)
+    def get_rag_stats():
+        return get_rag_stats()
 
     @staticmethod
-    def search_similar_feedback(query: str, top_k: int = 3):
-        return search_similar_feedback(query, top_k)
\ No newline at end of file
+    def get_query_cache_stats():
+        return get_query_cache_stats()
\ No newline at end of file
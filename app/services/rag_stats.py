@@ -0,0 +1,127 @@
+# app/services/rag_stats.py
+import os
+import time
+import sqlite3
+import logging
+import threading
+from collections import Counter
+
+logger = logging.getLogger("soulstay.rag_stats")
+
+# 집계 차원: 메타데이터 키 → 통계 이름
+_DIMENSIONS = {"source": "by_source", "emotion": "by_emotion", "user_id": "by_user"}
+_UNKNOWN = "unknown"
+
+
+def _dir_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _count_metadatas(metadatas) -> Counter:
+    """메타데이터 목록 → (차원, 값) 별 개수 ("total" 포함)"""
+    counts = Counter()
+    for metadata in metadatas:
+        metadata = metadata or {}
+        counts[("total", "")] += 1
+        for key in _DIMENSIONS:
+            value = metadata.get(key)
+            counts[(key, _UNKNOWN if value is None else str(value))] += 1
+    return counts
+
+
+class RagStats:
+    """
+    RAG 컬렉션 통계 카운터 (SQLite, 워커 간 공유)
+
+    - 수집 / 삭제 시점에 (차원, 값) 별 개수를 증감 → 조회는 컬렉션 크기와 무관
+    - 디스크 사용량은 reconcile 때 측정해 저장
+    - reconcile: 실제 컬렉션 메타데이터로 다시 집계해 카운터를 교체 (백그라운드 작업용)
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters ("
+            " dimension TEXT NOT NULL, key TEXT NOT NULL, count INTEGER NOT NULL,"
+            " PRIMARY KEY (dimension, key))"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def apply(self, added=(), removed=()) -> None:
+        """추가 / 삭제된 문서 메타데이터로 카운터 증감"""
+        delta = _count_metadatas(added)
+        delta.subtract(_count_metadatas(removed))
+        rows = [(dim, key, n) for (dim, key), n in delta.items() if n]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO counters (dimension, key, count) VALUES (?, ?, ?) "
+                "ON CONFLICT(dimension, key) DO UPDATE SET count = count + excluded.count",
+                rows,
+            )
+            self._conn.execute("DELETE FROM counters WHERE count <= 0")
+            self._conn.commit()
+
+    def snapshot(self) -> dict:
+        """현재 통계 (카운터 테이블만 읽음)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT dimension, key, count FROM counters").fetchall()
+            meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+
+        stats = {"total_documents": 0, **{name: {} for name in _DIMENSIONS.values()}}
+        for dimension, key, count in rows:
+            if dimension == "total":
+                stats["total_documents"] = count
+            elif dimension in _DIMENSIONS:
+                stats[_DIMENSIONS[dimension]][key] = count
+        stats["disk_bytes"] = int(meta["disk_bytes"]) if "disk_bytes" in meta else None
+        stats["reconciled_at"] = int(meta["reconciled_at"]) if "reconciled_at" in meta else None
+        return stats
+
+    def reconcile(self, col, disk_paths: list[str] = (), batch_size: int = 1000) -> dict:
+        """컬렉션 전체를 다시 집계해 카운터 교체, 보정 전후 총 문서 수 차이 반환"""
+        counts = Counter()
+        total = col.count()
+        for offset in range(0, total, batch_size):
+            page = col.get(include=["metadatas"], limit=batch_size, offset=offset)
+            if not page["ids"]:
+                break
+            counts.update(_count_metadatas(page["metadatas"]))
+
+        disk_bytes = sum(_dir_size(p) for p in disk_paths if p and os.path.exists(p))
+        with self._lock:
+            before = self._conn.execute(
+                "SELECT count FROM counters WHERE dimension = 'total'"
+            ).fetchone()
+            self._conn.execute("DELETE FROM counters")
+            self._conn.executemany(
+                "INSERT INTO counters (dimension, key, count) VALUES (?, ?, ?)",
+                [(dim, key, n) for (dim, key), n in counts.items() if n],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [("disk_bytes", str(disk_bytes)), ("reconciled_at", str(int(time.time())))],
+            )
+            self._conn.commit()
+
+        drift = counts[("total", "")] - (before[0] if before else 0)
+        if drift:
+            logger.warning(f"⚠️ RAG 통계 보정: 문서 수 차이 {drift:+d}")
+        logger.info(f"📊 RAG 통계 재집계 완료 (문서 {counts[('total', '')]}개, 디스크 {disk_bytes / 1e6:.1f}MB)")
+        return {"total_documents": counts[("total", "")], "drift": drift, "disk_bytes": disk_bytes}
@@ -0,0 +1,133 @@
+# app/services/rescore_service.py
+import os
+import json
+import time
+import logging
+from typing import Callable
+from sqlalchemy import select, update
+
+from app.database import SessionLocal
+from app.models.emotion_log import EmotionLog
+from app.services import local_emotion_model as lem
+
+logger = logging.getLogger("soulstay.rescore")
+
+DEFAULT_CHECKPOINT_PATH = os.path.join("data", "checkpoints", "rescore_emotion_logs.json")
+
+
+def _model_id() -> str:
+    """체크포인트 구분용 모델 식별자 (모델이 바뀌면 처음부터 다시)"""
+    return f"{lem.MODEL_PATH}@{lem.model_revision()}:{lem.active_backend()}"
+
+
+def load_checkpoint(path: str, model_id: str) -> int:
+    """마지막으로 처리한 id 반환 (없거나 다른 모델이면 0)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return 0
+
+    if data.get("model_id") != model_id:
+        logger.info(f"♻️ 체크포인트 모델 불일치 ({data.get('model_id')} → {model_id}), 처음부터 시작")
+        return 0
+    return int(data.get("last_id", 0))
+
+
+def save_checkpoint(path: str, model_id: str, last_id: int, processed: int) -> None:
+    """체크포인트 원자적 저장 (임시 파일 → rename)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "model_id": model_id,
+            "last_id": last_id,
+            "processed": processed,
+            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _status(processed: int, changed: int, last_id: int, started: float) -> dict:
+    elapsed = time.perf_counter() - started
+    return {
+        "processed": processed,
+        "changed": changed,
+        "last_id": last_id,
+        "elapsed_seconds": round(elapsed, 2),
+        "rows_per_second": round(processed / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def rescore_emotion_logs(
+    batch_size: int = 256,
+    checkpoint_path: str = DEFAULT_CHECKPOINT_PATH,
+    resume: bool = True,
+    limit: int | None = None,
+    progress: Callable[[dict], None] | None = None,
+) -> dict:
+    """
+    emotion_logs 전체를 현재 감정 모델로 재라벨링
+
+    - 서버 사이드 커서(yield_per)로 batch_size 행씩 스트리밍 → 테이블 크기와 무관하게 메모리 일정
+    - 배치 추론 후 PK 기준 bulk UPDATE, 배치마다 커밋 + 체크포인트(마지막 id) 저장
+    - 중단 후 재실행 시 체크포인트 이후부터 이어서 처리
+    Returns:
+        dict: {"processed", "changed", "last_id", "elapsed_seconds", "rows_per_second"}
+    """
+    model_id = _model_id()
+    last_id = load_checkpoint(checkpoint_path, model_id) if resume else 0
+    reason = f"재분석: Hugging Face 모델({lem.MODEL_PATH}, {lem.active_backend()}) 예측 결과"
+
+    read_db = SessionLocal()
+    write_db = SessionLocal()
+    processed = 0
+    changed = 0
+    started = time.perf_counter()
+
+    logger.info(f"🔁 감정 로그 재분석 시작 (id > {last_id}, batch={batch_size}, model={model_id})")
+    try:
+        stmt = (
+            select(EmotionLog.id, EmotionLog.text, EmotionLog.emotion)
+            .where(EmotionLog.id > last_id)
+            .order_by(EmotionLog.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if limit:
+            stmt = stmt.limit(limit)
+
+        for rows in read_db.execute(stmt).partitions():
+            texts = [row.text if row.text and row.text.strip() else "" for row in rows]
+            non_empty = [i for i, t in enumerate(texts) if t]
+            labels = ["중립"] * len(rows)
+            if non_empty:
+                for i, label in zip(non_empty, lem._predict_batch([texts[i] for i in non_empty])):
+                    labels[i] = label
+
+            write_db.execute(
+                update(EmotionLog),
+                [{"id": row.id, "emotion": label, "reason": reason} for row, label in zip(rows, labels)],
+            )
+            write_db.commit()
+
+            last_id = rows[-1].id
+            processed += len(rows)
+            changed += sum(1 for row, label in zip(rows, labels) if row.emotion != label)
+            save_checkpoint(checkpoint_path, model_id, last_id, processed)
+
+            status = _status(processed, changed, last_id, started)
+            logger.info(f"🔁 재분석 진행: {processed}행 (last_id={last_id}, {status['rows_per_second']} rows/s)")
+            if progress:
+                progress(status)
+
+    except Exception as e:
+        write_db.rollback()
+        logger.exception(f"❌ 감정 로그 재분석 중단 (last_id={last_id}): {e}")
+        raise
+    finally:
+        read_db.close()
+        write_db.close()
+
+    summary = _status(processed, changed, last_id, started)
+    logger.info(f"✅ 감정 로그 재분석 완료: {summary}")
+    return summary
@@ -1,16 +1,31 @@
 # app/services/response_service_kobart.py
+import logging
 import torch
 from transformers import PreTrainedTokenizerFast, BartForConditionalGeneration
+from app.services.model_registry import registry
+
+logger = logging.getLogger("soulstay.kobart")
+
+
+def _kobart_loader(model_name: str, device: str):
+    def load():
+        logger.info("🔄 KoBART 모델 로드 중...")
+        tokenizer = PreTrainedTokenizerFast.from_pretrained(model_name)
+        model = BartForConditionalGeneration.from_pretrained(model_name).to(device)
+        model.eval()
+        logger.info(f"✅ KoBART 로드 완료 ({device})")
+        return tokenizer, model
+    return load
+
 
 class KoBARTResponseGenerator:
-    """한국어 문맥형 답변 생성기 (KoBART 기반)"""
+    """한국어 문맥형 답변 생성기 (KoBART 기반, 인스턴스 간 모델 공유)"""
 
     def __init__(self, model_name="gogamza/kobart-base-v2"):
-        print("🔄 KoBART 모델 로드 중...")
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.tokenizer = PreTrainedTokenizerFast.from_pretrained(model_name)
-        self.model = BartForConditionalGeneration.from_pretrained(model_name).to(self.device)
-        print(f"✅ KoBART 로드 완료 ({self.device})")
+        key = f"kobart:{model_name}"
+        registry.register(key, _kobart_loader(model_name, self.device), model_name)
+        self.tokenizer, self.model = registry.get(key)
 
     def compose(self, text, emotion, cases=None):
         """감정 + 유사사례 기반 응답 생성"""
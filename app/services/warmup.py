@@ -0,0 +1,70 @@
+# app/services/warmup.py
+import time
+import logging
+import threading
+
+from app.services.model_registry import registry
+from app.services import local_emotion_model  # noqa: F401 — 감정 모델 레지스트리 등록
+
+logger = logging.getLogger("soulstay.warmup")
+
+
+class WarmupState:
+    """워밍업 진행 상태 (readiness 판단용, degraded: 일부 실패했지만 지연 로드 / 스레드 추론으로 서비스 가능)"""
+
+    def __init__(self):
+        self._ready = threading.Event()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.models: list[dict] = []
+        self.error: str | None = None
+        self.degraded = False
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def mark_ready(self, degraded: bool = False):
+        self.finished_at = time.time()
+        self.degraded = degraded or self.error is not None
+        self._ready.set()
+
+    def record_error(self, error: str):
+        self.error = f"{self.error}; {error}" if self.error else error
+
+    def to_dict(self) -> dict:
+        return {
+            "ready": self.ready,
+            "degraded": self.degraded,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": round(self.finished_at - self.started_at, 3)
+            if self.started_at and self.finished_at else None,
+            "models": self.models,
+            "error": self.error,
+        }
+
+
+warmup_state = WarmupState()
+
+
+def run_warmup() -> list[dict]:
+    """
+    등록된 모든 모델 로드 + 시퀀스 길이 버킷별 합성 배치 실행
+    (토크나이저 / 메모리 할당기 / 커널 초기화 비용을 첫 요청 전에 지불)
+    """
+    warmup_state.started_at = time.time()
+    results = []
+    for name in registry.names():
+        try:
+            result = registry.warmup(name)
+            results.append(result)
+            logger.info(
+                f"🔥 워밍업 완료: {name} (로드 {result['load_seconds']:.2f}s, "
+                f"합성 배치 {result['warmup_seconds']:.2f}s)"
+            )
+        except Exception as e:
+            warmup_state.record_error(f"{name}: {e}")
+            logger.exception(f"❌ 워밍업 실패: {name} — {e}")
+    warmup_state.models = results
+    return results
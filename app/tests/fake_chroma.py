@@ -0,0 +1,66 @@
+# tests/fake_chroma.py
+"""테스트용 인메모리 Chroma 컬렉션 (get / upsert / update / delete / query / count 만 지원)"""
+import numpy as np
+from app.services.rag_filters import matches_where
+
+_FIELDS = {"documents": 0, "embeddings": 1, "metadatas": 2}
+
+
+class FakeCollection:
+    def __init__(self, name: str = "fake"):
+        self.name = name
+        self.rows: dict[str, tuple] = {}
+
+    def count(self) -> int:
+        return len(self.rows)
+
+    def upsert(self, ids, documents=None, embeddings=None, metadatas=None):
+        for i, doc_id in enumerate(ids):
+            self.rows[doc_id] = (
+                documents[i] if documents is not None else None,
+                list(embeddings[i]) if embeddings is not None else None,
+                dict(metadatas[i]) if metadatas is not None else {},
+            )
+
+    def update(self, ids, metadatas=None, documents=None, embeddings=None):
+        for i, doc_id in enumerate(ids):
+            document, embedding, metadata = self.rows[doc_id]
+            self.rows[doc_id] = (
+                documents[i] if documents is not None else document,
+                list(embeddings[i]) if embeddings is not None else embedding,
+                dict(metadatas[i]) if metadatas is not None else metadata,
+            )
+
+    def delete(self, ids=None, where=None):
+        for doc_id in list(self.rows):
+            if (ids is None or doc_id in ids) and matches_where(self.rows[doc_id][2], where):
+                del self.rows[doc_id]
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None):
+        include = ["documents", "metadatas"] if include is None else include
+        found = [
+            doc_id for doc_id in self.rows
+            if (ids is None or doc_id in ids) and matches_where(self.rows[doc_id][2], where)
+        ]
+        found = found[offset or 0:]
+        if limit is not None:
+            found = found[:limit]
+        result = {"ids": found}
+        for key in include:
+            result[key] = [self.rows[doc_id][_FIELDS[key]] for doc_id in found]
+        return result
+
+    def query(self, query_embeddings, n_results=10, where=None, **kwargs):
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query in query_embeddings:
+            query = np.asarray(query, dtype=np.float32)
+            hits = sorted(
+                (float(np.sum((np.asarray(row[1]) - query) ** 2)), doc_id)
+                for doc_id, row in self.rows.items()
+                if matches_where(row[2], where)
+            )[:n_results]
+            result["distances"].append([d for d, _ in hits])
+            result["ids"].append([doc_id for _, doc_id in hits])
+            result["documents"].append([self.rows[doc_id][0] for _, doc_id in hits])
+            result["metadatas"].append([self.rows[doc_id][2] for _, doc_id in hits])
+        return result
@@ -0,0 +1,79 @@
+# tests/test_chunker.py
+import pytest
+from app.services import chunker
+from app.services.chunker import batched, chunk_prose, chunk_table
+
+
+class ByteEncoding:
+    """UTF-8 바이트 1개 = 토큰 1개 (tiktoken 어휘 파일 없이 테스트, 한글 1자 = 3토큰)"""
+
+    def encode(self, text):
+        return list(text.encode("utf-8"))
+
+    def decode_bytes(self, tokens):
+        return bytes(tokens)
+
+    def decode(self, tokens):
+        return bytes(tokens).decode("utf-8", errors="replace")
+
+
+@pytest.fixture(autouse=True)
+def byte_encoding(monkeypatch):
+    monkeypatch.setattr(chunker, "_encoding", ByteEncoding())
+
+
+def test_split_long_advances_offsets_on_char_boundaries():
+    sentence = "가나다라마바사"  # 21 바이트
+    pieces = list(chunker._split_long(10, sentence, max_tokens=8))
+    assert "".join(p for _, p, _ in pieces) == sentence
+    assert all("�" not in p for _, p, _ in pieces)
+    offsets = [o for o, _, _ in pieces]
+    assert offsets == sorted(set(offsets)) and offsets[0] == 10
+    for offset, piece, _ in pieces:
+        assert sentence[offset - 10:offset - 10 + len(piece)] == piece
+
+
+def test_split_long_keeps_short_sentence():
+    assert list(chunker._split_long(3, "abc", max_tokens=8)) == [(3, "abc", 3)]
+
+
+def test_prose_chunks_respect_target_and_overlap():
+    page = " ".join(f"s{i:02d}." for i in range(20))  # 문장당 4토큰
+    chunks = list(chunk_prose([page], "doc.pdf", target_tokens=12, overlap_tokens=4))
+    assert [c["metadata"]["chunk_index"] for c in chunks] == list(range(len(chunks)))
+    assert all(c["metadata"]["tokens"] <= 12 for c in chunks)
+    # 다음 청크는 직전 청크의 마지막 문장으로 시작
+    for prev, cur in zip(chunks, chunks[1:]):
+        assert cur["text"].split(" ")[0] == prev["text"].split(" ")[-1]
+    assert chunks[-1]["text"].endswith("s19.")
+
+
+def test_prose_char_start_points_into_page():
+    pages = ["첫 문장입니다.   둘째 문장입니다.", "\n  셋째 페이지 문장."]
+    chunks = list(chunk_prose(pages, "doc.pdf", target_tokens=30, overlap_tokens=0))
+    for chunk in chunks:
+        meta = chunk["metadata"]
+        first = chunk["text"].split(" ")[0]
+        assert pages[meta["page"] - 1][meta["char_start"]:].startswith(first)
+    assert chunks[-1]["metadata"]["page"] == 2
+
+
+def test_long_sentence_pieces_get_distinct_char_start():
+    page = "가" * 30
+    chunks = list(chunk_prose([page], "doc.pdf", target_tokens=30, overlap_tokens=0))
+    assert [c["metadata"]["char_start"] for c in chunks] == [0, 10, 20]
+    assert "".join(c["text"] for c in chunks) == page
+
+
+def test_table_chunks_repeat_header_and_cover_rows():
+    rows = [[i, f"row{i}"] for i in range(10)]
+    chunks = list(chunk_table(["id", "name"], rows, "t.csv", target_tokens=30))
+    assert all(c["text"].startswith("id,name\n") for c in chunks)
+    spans = [(c["metadata"]["row_start"], c["metadata"]["row_end"]) for c in chunks]
+    assert spans[0][0] == 0 and spans[-1][1] == 10
+    assert all(a[1] == b[0] for a, b in zip(spans, spans[1:]))
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched([], 3)) == []
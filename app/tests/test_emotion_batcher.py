@@ -0,0 +1,72 @@
+# tests/test_emotion_batcher.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.services.emotion_batcher import MicroBatcher
+
+
+def test_results_return_to_each_caller_in_order():
+    batches = []
+
+    def batch_fn(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=50)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda i: batcher.predict(i, timeout=5), range(16)))
+    assert results == [i * 10 for i in range(16)]
+    assert all(len(batch) <= 8 for batch in batches)
+    stats = batcher.get_stats()
+    assert stats["total_requests"] == 16
+    assert stats["total_batches"] == len(batches) < 16  # 동시 요청이 묶임
+    assert stats["max_observed_batch_size"] <= 8
+
+
+def test_flushes_when_batch_is_full():
+    release = threading.Event()
+    sizes = []
+
+    def batch_fn(items):
+        sizes.append(len(items))
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=10_000)
+    futures = [batcher.submit(i) for i in range(4)]
+    release.set()
+    assert [f.result(timeout=5) for f in futures] == [0, 1, 2, 3]
+    assert sizes == [4]  # 대기 시간(10초)을 기다리지 않고 크기 한도에서 flush
+
+
+def test_single_request_flushes_after_max_wait():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=32, max_wait_ms=5)
+    assert batcher.predict("x", timeout=5) == "x"
+    assert batcher.get_stats()["avg_batch_size"] == 1
+
+
+def test_batch_errors_propagate_to_all_callers():
+    def batch_fn(items):
+        raise ValueError("모델 오류")
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=20)
+    futures = [batcher.submit(i) for i in range(3)]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+    # 실패 후에도 워커는 계속 동작
+    batcher.batch_fn = lambda items: items
+    assert batcher.predict("ok", timeout=5) == "ok"
+
+
+def test_result_count_mismatch_is_an_error():
+    batcher = MicroBatcher(lambda items: items[:-1], max_batch_size=2, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        batcher.predict("x", timeout=5)
+
+
+def test_reset_stats():
+    batcher = MicroBatcher(lambda items: items, max_wait_ms=1)
+    batcher.predict(1, timeout=5)
+    batcher.reset_stats()
+    assert batcher.get_stats()["total_requests"] == 0
@@ -0,0 +1,90 @@
+# tests/test_feedback_dedup.py
+from fake_chroma import FakeCollection
+from app.services.feedback_dedup import (
+    DuplicateStats,
+    SimHashIndex,
+    content_hash,
+    feedback_id,
+    find_exact_duplicate,
+    hamming_distance,
+    simhash,
+)
+
+
+def test_content_hash_ignores_whitespace_differences():
+    assert content_hash("객실이  좋아요 ") == content_hash("객실이 좋아요")
+    assert content_hash("객실이 좋아요") != content_hash("객실이 싫어요")
+
+
+def test_feedback_id_scope():
+    text = "객실이 좋아요"
+    assert feedback_id(text) == feedback_id(f" {text} ")
+    assert feedback_id(text).startswith("fb_") and len(feedback_id(text)) == 35
+    assert feedback_id(text, None, "") == feedback_id(text)  # 빈 scope 는 무시 → 기존 id 유지
+    assert feedback_id(text, "a") != feedback_id(text, "b")
+    assert feedback_id(text, "a", "x.csv") != feedback_id(text, "a", "y.csv")
+
+
+def test_simhash_distance_reflects_similarity():
+    base = simhash("객실이 너무 더러웠어요")
+    assert hamming_distance(base, simhash("객실이 너무 더러웠어요!!")) == 0  # 문장부호 무시
+    assert hamming_distance(base, simhash("객실이 너무 더러웠어요 정말")) < \
+        hamming_distance(base, simhash("직원분들이 친절했어요"))
+
+
+def test_simhash_index_finds_within_distance_and_scope():
+    index = SimHashIndex(max_distance=3)
+    value = simhash("조식 메뉴가 다양했어요")
+    index.add(value, scope="a")
+    assert index.find(value ^ 0b101, scope="a") == value  # 2비트 차이
+    assert index.find(value ^ 0b1111, scope="a") is None  # 4비트 차이
+    assert index.find(value, scope="b") is None  # 다른 숙소
+    index.clear()
+    assert index.find(value, scope="a") is None and not index.loaded
+
+
+def test_simhash_index_remove_by_id():
+    index = SimHashIndex(max_distance=3)
+    value = simhash("조식 메뉴가 다양했어요")
+    index.add(value, "a", "d1")
+    index.add(value, "a", "d2")  # 같은 해시를 두 문서가 사용
+    index.remove(["d1", "missing"])
+    assert index.find(value, "a") == value
+    index.remove(["d2"])
+    assert index.find(value, "a") is None
+
+    # 같은 id 로 다시 추가하면 예전 해시를 대체
+    index.add(value, "a", "d3")
+    other = simhash("직원분들이 친절했어요")
+    index.add(other, "a", "d3")
+    assert index.find(value, "a") is None and index.find(other, "a") == other
+
+
+def test_simhash_index_load_from_collection():
+    col = FakeCollection()
+    value = simhash("수영장이 깨끗했어요")
+    col.upsert(ids=["d1", "d2"], metadatas=[{"simhash": f"{value:016x}", "property_id": "a"}, {}])
+    index = SimHashIndex()
+    index.load_from_collection(col, "property_id")
+    assert index.loaded
+    assert index.find(value, "a") == value
+    assert index.find(value) is None
+    index.remove(["d1"])
+    assert index.find(value, "a") is None
+
+
+def test_find_exact_duplicate_with_scope():
+    col = FakeCollection()
+    hash_value = content_hash("객실이 좋아요")
+    col.upsert(ids=["d1"], metadatas=[{"content_hash": hash_value, "property_id": "a"}])
+    assert find_exact_duplicate(col, hash_value) == "d1"
+    assert find_exact_duplicate(col, hash_value, {"property_id": "a"}) == "d1"
+    assert find_exact_duplicate(col, hash_value, {"property_id": "b"}) is None
+    assert find_exact_duplicate(col, content_hash("다른 문장")) is None
+
+
+def test_duplicate_stats():
+    stats = DuplicateStats()
+    stats.record("exact")
+    stats.record("near", 2)
+    assert stats.snapshot() == {"exact": 1, "near": 2, "total": 3}
@@ -0,0 +1,82 @@
+# tests/test_ingest_manifest.py
+import os
+from app.services.ingest_manifest import IngestManifest, file_hash
+
+
+def write(path, content: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+def test_classify_new_changed_and_touched_files(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "manifest.json"))
+    a = write(tmp_path / "docs" / "a.pdf", "첫 번째")
+    b = write(tmp_path / "docs" / "b.pdf", "두 번째")
+
+    changed, unchanged = manifest.classify([a, b])
+    assert set(changed) == {a, b} and unchanged == []
+    assert changed[a]["sha256"] == file_hash(a)
+    for path in (a, b):
+        manifest.record(path, changed[path], [f"{os.path.basename(path)}-1"])
+
+    # 내용은 같고 mtime 만 바뀜 → 변경 없음 (stat 갱신)
+    stat = os.stat(a)
+    os.utime(a, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    write(tmp_path / "docs" / "b.pdf", "두 번째 수정")
+    changed, unchanged = manifest.classify([a, b])
+    assert list(changed) == [b] and unchanged == [a]
+    assert manifest.entries[os.path.abspath(a)]["mtime_ns"] == os.stat(a).st_mtime_ns
+
+
+def test_record_returns_previous_chunk_ids(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "manifest.json"))
+    a = write(tmp_path / "a.csv", "text\n1\n")
+    changed, _ = manifest.classify([a])
+    assert manifest.record(a, changed[a], ["c1", "c2"]) == []
+    write(tmp_path / "a.csv", "text\n2\n")
+    changed, _ = manifest.classify([a])
+    assert manifest.record(a, changed[a], ["c2", "c3"]) == ["c1", "c2"]
+    assert manifest.referenced_ids() == {"c2", "c3"}
+
+
+def test_missing_is_scoped_to_directory(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "manifest.json"))
+    pdf = write(tmp_path / "pdfs" / "a.pdf", "pdf")
+    renamed = write(tmp_path / "pdfs" / "b.pdf", "pdf2")
+    csv_path = write(tmp_path / "hotel" / "a.csv", "csv")
+    for path in (pdf, renamed, csv_path):
+        changed, _ = manifest.classify([path])
+        manifest.record(path, changed[path], [path])
+
+    # PDF 폴더만 비교 → 다른 폴더의 CSV 는 삭제 대상이 아님
+    assert manifest.missing([pdf], str(tmp_path / "pdfs")) == [os.path.abspath(renamed)]
+    assert manifest.missing([], str(tmp_path / "hotel")) == [os.path.abspath(csv_path)]
+    assert manifest.missing([pdf, renamed, csv_path]) == []
+    # 이름이 비슷한 다른 폴더(pdfs2)는 prefix 로 섞이지 않음
+    other = write(tmp_path / "pdfs2" / "c.pdf", "other")
+    changed, _ = manifest.classify([other])
+    manifest.record(other, changed[other], [])
+    assert os.path.abspath(other) not in manifest.missing([pdf, renamed], str(tmp_path / "pdfs"))
+
+    assert manifest.forget(renamed) == [renamed]
+    assert manifest.forget(renamed) == []
+
+
+def test_save_and_reload(tmp_path):
+    path = str(tmp_path / "cache" / "manifest.json")
+    manifest = IngestManifest(path)
+    a = write(tmp_path / "a.pdf", "pdf")
+    changed, _ = manifest.classify([a])
+    manifest.record(a, changed[a], ["c1"])
+    manifest.save()
+
+    reloaded = IngestManifest(path)
+    assert reloaded.classify([a]) == ({}, [a])
+    assert reloaded.referenced_ids() == {"c1"}
+
+
+def test_unreadable_manifest_starts_empty(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{broken", encoding="utf-8")
+    assert IngestManifest(str(path)).entries == {}
@@ -0,0 +1,104 @@
+# tests/test_lexical_index.py
+import time
+from fake_chroma import FakeCollection
+from app.services.lexical_index import BM25Index, analyze, reciprocal_rank_fusion
+
+DOCS = {
+    "a": ("1203호 미니바가 비어 있었어요", {"emotion": "negative"}),
+    "b": ("룸서비스가 너무 늦었어요", {"emotion": "negative"}),
+    "c": ("미니바 가격이 비싸지만 맛있었어요", {"emotion": "positive"}),
+    "d": ("직원분들이 친절했어요", {"emotion": "positive"}),
+}
+
+
+def make_index(**kwargs):
+    index = BM25Index(**kwargs)
+    index.add(list(DOCS), [t for t, _ in DOCS.values()], [m for _, m in DOCS.values()])
+    return index
+
+
+def make_collection(docs=DOCS):
+    col = FakeCollection()
+    col.upsert(ids=list(docs), documents=[t for t, _ in docs.values()], metadatas=[m for _, m in docs.values()])
+    return col
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "시간 초과"
+        time.sleep(0.01)
+
+
+def test_analyze_splits_numbers_and_hangul_ngrams():
+    terms = analyze("1203호 미니바가")
+    assert "1203" in terms and "호" in terms
+    assert {"미니", "니바", "미니바"} <= set(terms)
+    assert analyze("WiFi") == ["wifi"]
+
+
+def test_search_ranks_term_matches():
+    index = make_index()
+    assert [h["id"] for h in index.search("미니바", 3)] == ["a", "c"]
+    assert index.search("1203", 3)[0]["id"] == "a"
+    assert index.search("수영장", 3) == []
+    assert [h["id"] for h in index.search("미니바", 3, where={"emotion": "positive"})] == ["c"]
+
+
+def test_add_replaces_and_remove_deletes():
+    index = make_index()
+    index.add(["a"], ["수영장이 좋았어요"], [{"emotion": "positive"}])
+    assert [h["id"] for h in index.search("미니바", 3)] == ["c"]
+    assert index.search("수영장", 1)[0]["id"] == "a"
+    index.remove(["c", "missing"])
+    assert index.search("미니바", 3) == []
+    assert len(index) == 3
+    index.update_metadata(["b"], [{"emotion": "neutral"}])
+    assert index.search("룸서비스", 1, where={"emotion": "neutral"})[0]["id"] == "b"
+
+
+def test_ensure_fresh_loads_synchronously_once():
+    index, col = BM25Index(refresh_seconds=0), make_collection()
+    index.ensure_fresh(col, version=3)
+    assert index.loaded and index.version == 3 and len(index) == 4
+    col.delete(ids=["a"])
+    index.ensure_fresh(col, version=3)  # 버전이 같으면 컬렉션을 다시 읽지 않음
+    assert len(index) == 4
+
+
+def test_advance_only_after_own_single_write():
+    index = BM25Index()
+    index.load_from_collection(make_collection(), version=5)
+    index.advance(6)
+    assert index.version == 6
+    index.advance(8)  # 다른 워커 쓰기가 끼어 있음 → 재적재 대상으로 남김
+    assert index.version == 6
+
+
+def test_version_change_reloads_in_background_and_keeps_serving():
+    index, col = BM25Index(refresh_seconds=0), make_collection()
+    index.ensure_fresh(col, version=1)
+    col.upsert(ids=["e"], documents=["수영장이 깨끗했어요"], metadatas=[{"emotion": "positive"}])
+    col.delete(ids=["a"])
+
+    index.ensure_fresh(col, version=2)
+    assert index.search("미니바", 3)  # 재적재 전후 모두 검색 가능
+    wait_for(lambda: index.version == 2)
+    assert index.search("수영장", 1)[0]["id"] == "e"
+    assert [h["id"] for h in index.search("미니바", 3)] == ["c"]
+
+
+def test_reload_is_throttled_by_refresh_seconds():
+    index, col = BM25Index(refresh_seconds=3600), make_collection()
+    index.ensure_fresh(col, version=1)
+    index.ensure_fresh(col, version=2)
+    assert index.version == 1 and not index._reloading
+
+
+def test_reciprocal_rank_fusion():
+    vector = [{"id": "a", "text": "A"}, {"id": "b", "text": "B"}, {"id": "c", "text": "C"}]
+    lexical = [{"id": "c", "text": "C"}, {"id": "a", "text": "A"}]
+    fused = reciprocal_rank_fusion([vector, lexical], k=60, top_k=2)
+    assert [h["id"] for h in fused] == ["a", "c"]
+    assert fused[0]["score"] == 1 / 61 + 1 / 62
+    assert reciprocal_rank_fusion([[], []]) == []
@@ -0,0 +1,171 @@
+# tests/test_numpy_vector_index.py
+import json
+import numpy as np
+import pytest
+from app.services import numpy_vector_index
+from app.services.numpy_vector_index import NumpyVectorIndex
+from app.services.rag_filters import matches_where
+
+DIM = 16
+
+
+def unit_vectors(n, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def metadata_for(i):
+    return {
+        "emotion": ("positive", "negative", "neutral")[i % 3],
+        "user_id": i % 5,
+        "source": "csv" if i % 2 else "user",
+        "created_at": 1_700_000_000 + i * 3600,
+    }
+
+
+def build(tmp_path, dtype="float32", n=200, **kwargs):
+    index = NumpyVectorIndex(str(tmp_path / dtype), DIM, dtype, **kwargs)
+    vectors = unit_vectors(n)
+    ids = [f"d{i}" for i in range(n)]
+    index.upsert(ids, vectors, [f"text {i}" for i in ids], [metadata_for(i) for i in range(n)])
+    return index, ids, vectors
+
+
+def exact_top(vectors, ids, query, k, allowed=None):
+    scores = vectors @ (query / np.linalg.norm(query))
+    order = [ids[i] for i in np.argsort(-scores)]
+    return [doc_id for doc_id in order if allowed is None or doc_id in allowed][:k]
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_search_matches_exact_ranking(tmp_path, dtype):
+    index, ids, vectors = build(tmp_path, dtype)
+    query = vectors[7] + 0.05 * unit_vectors(1, seed=1)[0]
+    hits = index.search(query, 5)
+    assert [h["id"] for h in hits] == exact_top(vectors, ids, query, 5)
+    assert hits[0]["text"] == "text d7"
+    assert all(a["distance"] <= b["distance"] for a, b in zip(hits, hits[1:]))
+
+
+def test_int8_rescore_recovers_float_ranking(tmp_path, monkeypatch):
+    index, ids, vectors = build(tmp_path, "int8", n=500, rescore_factor=4)
+    requested = []
+    rescore = index._rescore
+
+    def counting_rescore(rows, query):
+        requested.append(len(rows))
+        return rescore(rows, query)
+
+    monkeypatch.setattr(index, "_rescore", counting_rescore)
+    query = vectors[42] + 0.05 * unit_vectors(1, seed=2)[0]
+    hits = index.search(query, 5)
+    assert [h["id"] for h in hits] == exact_top(vectors, ids, query, 5)
+    assert requested == [20]  # top_k × rescore_factor 후보만 float16 원본으로 재점수
+    exact_distance = 2 - 2 * float(vectors[42] @ (query / np.linalg.norm(query)))
+    assert hits[0]["distance"] == pytest.approx(exact_distance, abs=1e-3)
+
+    # 재점수 없이도 상위 결과는 근사적으로 유지
+    assert index.search(query, 1, rescore=False)[0]["id"] == "d42"
+    assert requested == [20]
+
+
+def test_int8_index_without_rescore_vectors_is_rejected(tmp_path):
+    build(tmp_path, "int8", n=10)
+    header_path = tmp_path / "int8" / "index.json"
+    header = json.loads(header_path.read_text())
+    del header["rescore_dtype"]  # 재점수 원본 도입 전에 만든 인덱스
+    header_path.write_text(json.dumps(header))
+    with pytest.raises(ValueError):
+        NumpyVectorIndex(str(tmp_path / "int8"), DIM, "int8")
+
+
+def test_quantize_roundtrip_error_is_small():
+    vectors = unit_vectors(50)
+    codes, scales = NumpyVectorIndex.quantize(vectors)
+    assert codes.dtype == np.int8 and scales.shape == (50,)
+    assert np.abs(codes * scales[:, None] - vectors).max() < 0.01
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_delete_excludes_rows(tmp_path, dtype):
+    index, ids, vectors = build(tmp_path, dtype)
+    assert index.delete(["d7", "missing"]) == 1
+    assert index.count() == len(ids) - 1
+    assert not index.contains("d7")
+    hits = index.search(vectors[7], 3)
+    assert "d7" not in [h["id"] for h in hits]
+    assert "d7" not in [h["id"] for h in index.search(vectors[7], 3, where={"emotion": "positive"})]
+
+
+WHERES = [
+    {"emotion": "negative"},
+    {"emotion": {"$in": ["negative", "neutral"]}},
+    {"emotion": {"$ne": "positive"}},
+    {"user_id": {"$nin": [0, 1]}},
+    {"$and": [{"source": "csv"}, {"created_at": {"$gte": 1_700_000_000 + 50 * 3600}}]},
+    {"$or": [{"user_id": 3}, {"created_at": {"$lt": 1_700_000_000 + 10 * 3600}}]},
+    {"created_at": {"$gt": 1_700_000_000 + 20 * 3600, "$lte": 1_700_000_000 + 60 * 3600}},
+    {"emotion": "unknown"},
+    {"missing_field": "x"},
+]
+
+
+@pytest.mark.parametrize("where", WHERES)
+def test_filter_mask_matches_reference(tmp_path, where):
+    index, ids, vectors = build(tmp_path)
+    index.delete(["d3", "d4"])
+    index.update_metadata(["d10"], [{**metadata_for(10), "emotion": "negative", "user_id": 3}])
+    expected = [
+        i for i, doc_id in enumerate(ids)
+        if index.contains(doc_id) and matches_where(index._metadatas[i], where)
+    ]
+    assert index._candidate_rows(len(ids), where).tolist() == expected
+
+    query = vectors[0]
+    allowed = {ids[i] for i in expected}
+    hits = index.search(query, 5, where=where)
+    assert [h["id"] for h in hits] == exact_top(vectors, ids, query, 5, allowed)
+
+
+def test_filter_columns_follow_later_writes(tmp_path):
+    index, ids, vectors = build(tmp_path, n=30)
+    assert len(index.search(vectors[0], 100, where={"emotion": "negative"})) == 10  # 컬럼 구성
+    index.update_metadata(["d0"], [{**metadata_for(0), "emotion": "negative"}])
+    index.upsert(["new"], [vectors[1]], ["new"], [{"emotion": "negative"}])
+    index.delete(["d1"])
+    found = {h["id"] for h in index.search(vectors[0], 100, where={"emotion": "negative"})}
+    assert len(found) == 11 and {"d0", "new"} <= found and "d1" not in found
+
+
+def test_rewrite_compacts_deleted_rows_and_meta(tmp_path, monkeypatch):
+    monkeypatch.setattr(numpy_vector_index, "_MIN_CAPACITY", 8)
+    index = NumpyVectorIndex(str(tmp_path / "idx"), DIM)
+    vectors = unit_vectors(20)
+    ids = [f"d{i}" for i in range(20)]
+    index.upsert(ids[:8], vectors[:8], ids[:8], [metadata_for(i) for i in range(8)])
+    index.update_metadata(ids[:8], [{**metadata_for(i), "emotion": "neutral"} for i in range(8)])
+    index.delete(ids[:4])
+    reader = NumpyVectorIndex(str(tmp_path / "idx"), DIM)  # 다른 워커
+    assert reader.count() == 4
+
+    index.upsert(ids[8:20], vectors[8:20], ids[8:20], [metadata_for(i) for i in range(8, 20)])
+    header = json.loads((tmp_path / "idx" / "index.json").read_text())
+    assert header["meta_generation"] == 1
+    assert header["count"] == 16
+    lines = (tmp_path / "idx" / "meta.jsonl").read_text().splitlines()
+    assert len(lines) == 16  # 살아 있는 행 4개(다시 씀) + 새 행 12개
+    for index_view in (index, reader):
+        assert index_view.count() == 16
+        assert not index_view.contains("d0")
+        assert index_view.search(vectors[5], 1)[0]["id"] == "d5"
+        assert index_view.search(vectors[15], 1, where={"emotion": metadata_for(15)["emotion"]})[0]["id"] == "d15"
+        neutral = set(ids[4:8]) | {ids[i] for i in range(8, 20) if metadata_for(i)["emotion"] == "neutral"}
+        assert {h["id"] for h in index_view.search(vectors[5], 20, where={"emotion": "neutral"})} == neutral
+
+
+def test_reopen_rejects_different_dim_or_dtype(tmp_path):
+    build(tmp_path, "float16", n=5)
+    with pytest.raises(ValueError):
+        NumpyVectorIndex(str(tmp_path / "float16"), DIM, "float32")
+    with pytest.raises(ValueError):
+        NumpyVectorIndex(str(tmp_path / "float16"), DIM + 1, "float16")
@@ -0,0 +1,138 @@
+# tests/test_partitioned_collection.py
+import pytest
+from fake_chroma import FakeCollection
+from app.services.feedback_dedup import content_hash, feedback_id, find_exact_duplicate
+from app.services.partitioned_collection import PartitionedCollection, property_slug
+
+TS_2023 = 1700000000  # 2023-11
+TS_2025 = 1740000000  # 2025-02
+
+
+def make_partitioned(by="property", existing=()):
+    collections = {name: FakeCollection(name) for name in existing}
+
+    def open_collection(name):
+        return collections.setdefault(name, FakeCollection(name))
+
+    pc = PartitionedCollection(
+        "feedback_embeddings", by,
+        open_collection=open_collection,
+        list_collection_names=lambda: list(collections),
+        drop_collection=lambda name: collections.pop(name),
+        refresh_seconds=0,
+    )
+    return pc, collections
+
+
+def metadata(property_id, created_at=TS_2025, **extra):
+    return {"property_id": property_id, "created_at": created_at, **extra}
+
+
+def test_property_slug_is_collection_safe():
+    assert property_slug("hotel-a") == "hotel-a"
+    slug = property_slug("서울 호텔")
+    assert slug and all(c.isalnum() or c == "-" for c in slug)
+    assert property_slug("서울 호텔") != property_slug("부산 호텔")
+
+
+def test_routes_by_property_and_year():
+    pc, collections = make_partitioned("property_year")
+    pc.upsert(
+        ids=["a1", "a2", "b1"],
+        documents=["x", "y", "z"],
+        embeddings=[[1, 0], [0, 1], [1, 1]],
+        metadatas=[metadata("a", TS_2023), metadata("a", TS_2025), metadata("b", TS_2025)],
+    )
+    assert sorted(collections) == [
+        "feedback_embeddings__a_2023", "feedback_embeddings__a_2025", "feedback_embeddings__b_2025",
+    ]
+    assert pc.count() == 3
+    assert pc.select({"property_id": "a"}) == ["feedback_embeddings__a_2023", "feedback_embeddings__a_2025"]
+    where = {"$and": [{"property_id": {"$in": ["a", "b"]}}, {"created_at": {"$gte": TS_2025}}]}
+    assert pc.select(where) == ["feedback_embeddings__a_2025", "feedback_embeddings__b_2025"]
+
+
+def test_fan_out_query_merges_top_k_by_distance():
+    pc, _ = make_partitioned()
+    pc.upsert(
+        ids=["a1", "a2", "b1"],
+        documents=["a1", "a2", "b1"],
+        embeddings=[[0.0, 0.0], [5.0, 5.0], [1.0, 0.0]],
+        metadatas=[metadata("a"), metadata("a"), metadata("b")],
+    )
+    merged = pc.query(query_embeddings=[[0.0, 0.0]], n_results=2)
+    assert merged["ids"] == [["a1", "b1"]]
+    only_b = pc.query(query_embeddings=[[0.0, 0.0]], n_results=2, where={"property_id": "b"})
+    assert only_b["ids"] == [["b1"]]
+
+
+def test_get_offset_and_limit_span_partitions():
+    pc, _ = make_partitioned()
+    pc.upsert(
+        ids=[f"a{i}" for i in range(3)] + [f"b{i}" for i in range(3)],
+        metadatas=[metadata("a")] * 3 + [metadata("b")] * 3,
+    )
+    assert pc.get(limit=3, offset=2, include=[])["ids"] == ["a2", "b0", "b1"]
+    assert pc.get(where={"property_id": "b"}, limit=2, offset=1, include=[])["ids"] == ["b1", "b2"]
+
+
+def test_same_text_in_two_properties_stays_searchable_in_both():
+    """회귀: 같은 텍스트를 다른 숙소가 넣어도 기존 숙소 문서가 옮겨지거나 사라지지 않음"""
+    pc, _ = make_partitioned()
+    text = "객실이 깨끗했어요"
+    id_a, id_b = feedback_id(text, "a"), feedback_id(text, "b")
+    assert id_a != id_b != feedback_id(text)
+
+    pc.upsert(ids=[id_a], documents=[text], embeddings=[[1.0, 0.0]],
+              metadatas=[metadata("a", content_hash=content_hash(text))])
+    # 숙소 b 수집: 기존 문서 조회(update 대상 판단)에 a 의 문서가 잡히지 않아야 함
+    assert pc.get(ids=[id_b], include=[])["ids"] == []
+    assert find_exact_duplicate(pc, content_hash(text), {"property_id": "b"}) is None
+    assert find_exact_duplicate(pc, content_hash(text), {"property_id": "a"}) == id_a
+
+    pc.upsert(ids=[id_b], documents=[text], embeddings=[[1.0, 0.0]],
+              metadatas=[metadata("b", content_hash=content_hash(text))])
+    for property_id, doc_id in (("a", id_a), ("b", id_b)):
+        hits = pc.query(query_embeddings=[[1.0, 0.0]], n_results=3, where={"property_id": property_id})
+        assert hits["ids"] == [[doc_id]]
+
+
+def test_update_moves_document_when_routing_key_changes():
+    pc, collections = make_partitioned()
+    pc.upsert(ids=["d1"], documents=["t"], embeddings=[[1.0, 2.0]], metadatas=[metadata("a")])
+    pc.update(ids=["d1"], metadatas=[metadata("b", emotion="positive")])
+
+    assert collections["feedback_embeddings__a"].count() == 0
+    moved = collections["feedback_embeddings__b"].get(ids=["d1"], include=["documents", "embeddings", "metadatas"])
+    assert moved["documents"] == ["t"]
+    assert moved["embeddings"] == [[1.0, 2.0]]
+    assert moved["metadatas"][0]["emotion"] == "positive"
+    assert pc.query(query_embeddings=[[1.0, 2.0]], n_results=1, where={"property_id": "b"})["ids"] == [["d1"]]
+
+
+def test_update_in_place_when_partition_unchanged():
+    pc, collections = make_partitioned()
+    pc.upsert(ids=["d1"], documents=["t"], embeddings=[[1.0]], metadatas=[metadata("a")])
+    pc.update(ids=["d1"], metadatas=[metadata("a", emotion="negative")])
+    assert collections["feedback_embeddings__a"].get(ids=["d1"])["metadatas"][0]["emotion"] == "negative"
+
+
+@pytest.mark.parametrize("by, foreign", [
+    ("property_year", "feedback_embeddings__hotel-a"),
+    ("property", "feedback_embeddings__hotel-a_2024"),
+])
+def test_ignores_partitions_from_other_mode(by, foreign):
+    pc, _ = make_partitioned(by, existing=[foreign, "other_collection"])
+    pc.upsert(ids=["d1"], metadatas=[metadata("hotel-a")])
+    names = pc.partition_names()
+    assert foreign not in names and "other_collection" not in names
+    assert pc.select({"property_id": "hotel-a"}) == names
+    assert pc.count() == 1
+
+
+def test_drop_partitions_leaves_other_properties():
+    pc, collections = make_partitioned()
+    pc.upsert(ids=["a1", "b1"], metadatas=[metadata("a"), metadata("b")])
+    pc.drop_partitions(pc.select({"property_id": "a"}))
+    assert list(collections) == ["feedback_embeddings__b"]
+    assert pc.count() == 1
@@ -0,0 +1,70 @@
+# tests/test_prediction_cache.py
+import sqlite3
+from app.services.prediction_cache import PredictionCache, normalize_text
+
+
+def make_cache(tmp_path, revision="r1", **kwargs):
+    return PredictionCache("model", revision, disk_path=str(tmp_path / "predictions.sqlite"), **kwargs)
+
+
+class BrokenConnection:
+    """잠기거나 손상된 캐시 DB 흉내"""
+
+    def execute(self, *args):
+        raise sqlite3.OperationalError("database is locked")
+
+    def commit(self):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_normalize_text():
+    assert normalize_text("  객실이\n 좋아요 ") == "객실이 좋아요"
+    assert normalize_text("가") == "가"  # NFD → NFC
+
+
+def test_memory_hit_and_key_normalization(tmp_path):
+    cache = PredictionCache("model", "r1")
+    assert cache.get("객실이 좋아요") is None
+    cache.set("객실이 좋아요", {"emotion": "긍정"})
+    assert cache.get("  객실이   좋아요") == {"emotion": "긍정"}
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert PredictionCache("model", "r2").key("a") != cache.key("a")
+
+
+def test_lru_eviction():
+    cache = PredictionCache("model", "r1", max_entries=2)
+    for text in ("a", "b", "a", "c"):
+        cache.set(text, text)
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" and cache.get("c") == "c"
+
+
+def test_disk_tier_shared_and_reset_on_revision_change(tmp_path):
+    make_cache(tmp_path).set("객실이 좋아요", {"emotion": "긍정"})
+
+    other = make_cache(tmp_path)  # 다른 워커 / 재시작
+    assert other.get("객실이 좋아요") == {"emotion": "긍정"}
+    assert other.stats()["disk_hits"] == 1
+
+    assert make_cache(tmp_path, revision="r2").get("객실이 좋아요") is None
+
+
+def test_disk_errors_are_treated_as_misses(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set("a", 1)
+    cache._disk = BrokenConnection()
+
+    assert cache.get("a") == 1  # 메모리 계층은 그대로 사용
+    assert cache.get("b") is None
+    cache.set("b", 2)
+    cache.clear()
+    assert cache.get("b") is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_corrupt_disk_value_is_a_miss(tmp_path):
+    make_cache(tmp_path).set("a", 1)
+    conn = sqlite3.connect(str(tmp_path / "predictions.sqlite"))
+    conn.execute("UPDATE predictions SET value = 'not json'")
+    conn.commit()
+    assert make_cache(tmp_path).get("a") is None
@@ -0,0 +1,126 @@
+# tests/test_query_cache.py
+import time
+import threading
+from fake_chroma import FakeCollection
+from app.services import rag_filters
+from app.services.lexical_index import BM25Index
+from app.services.query_cache import CollectionVersion, QueryResultCache
+from app.services.rag_filters import build_where, resolve_relative_filters
+
+NOW = 1_700_000_123
+
+
+def make_cache(tmp_path, max_entries=8):
+    return QueryResultCache("feedback", CollectionVersion(str(tmp_path / "versions.sqlite")), max_entries)
+
+
+def test_key_normalizes_query_and_orders_params():
+    a = QueryResultCache.key("  객실이   좋아요 ", 3, {"emotion": "positive", "source": "csv"}, mode="vector")
+    b = QueryResultCache.key("객실이 좋아요", 3, {"source": "csv", "emotion": "positive"}, mode="vector")
+    assert a == b
+    assert a != QueryResultCache.key("객실이 좋아요", 5, {"source": "csv", "emotion": "positive"}, mode="vector")
+    assert a != QueryResultCache.key("객실이 좋아요", 3, {"source": "csv", "emotion": "positive"}, mode="hybrid")
+
+
+def test_hit_until_version_bump(tmp_path):
+    cache = make_cache(tmp_path)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return [{"id": "d1", "text": "t", "score": 0.2}]
+
+    key = QueryResultCache.key("q", 3)
+    assert cache.get_or_compute(key, compute) == cache.get_or_compute(key, compute)
+    assert len(calls) == 1
+
+    cache.get_or_compute(key, compute)[0]["score"] = 99  # 반환값 수정이 캐시에 스며들지 않음
+    assert cache.get_or_compute(key, compute)[0]["score"] == 0.2
+
+    assert cache.invalidate() == 1
+    cache.get_or_compute(key, compute)
+    assert len(calls) == 2
+    stats = cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 2 and stats["version"] == 1
+
+
+def test_version_shared_between_workers(tmp_path):
+    """다른 워커(= 다른 캐시 인스턴스)가 버전을 올리면 이 워커의 항목도 무효"""
+    worker_a, worker_b = make_cache(tmp_path), make_cache(tmp_path)
+    key = QueryResultCache.key("q", 3)
+    worker_a.get_or_compute(key, lambda: [{"id": "old"}])
+    worker_b.invalidate()
+    assert worker_a.get_or_compute(key, lambda: [{"id": "new"}]) == [{"id": "new"}]
+    assert worker_a.stats()["stale_misses"] == 1
+
+
+def test_lru_eviction(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    for query in ("a", "b", "a", "c"):
+        cache.get_or_compute(query, lambda q=query: [{"id": q}])
+    assert cache.stats()["entries"] == 2
+    assert cache.get_or_compute("b", lambda: [{"id": "recomputed"}]) == [{"id": "recomputed"}]
+    assert cache.get_or_compute("a", lambda: [{"id": "recomputed"}]) == [{"id": "recomputed"}]
+
+
+def test_since_days_resolved_to_bucketed_cutoff(monkeypatch):
+    monkeypatch.setattr(rag_filters, "now_timestamp", lambda: NOW)
+    resolved = resolve_relative_filters({"since_days": 7, "emotion": "negative"}, bucket_seconds=300)
+    assert "since_days" not in resolved and resolved["emotion"] == "negative"
+    assert resolved["created_after"] % 300 == 0
+    assert NOW - 7 * 86400 - 300 < resolved["created_after"] <= NOW - 7 * 86400
+
+    # 같은 구간 안에서는 같은 캐시 키, 구간이 넘어가면 다른 키
+    key = QueryResultCache.key("q", 3, resolved)
+    monkeypatch.setattr(rag_filters, "now_timestamp", lambda: NOW + 60)
+    assert QueryResultCache.key("q", 3, resolve_relative_filters({"since_days": 7, "emotion": "negative"}, 300)) == key
+    monkeypatch.setattr(rag_filters, "now_timestamp", lambda: NOW + 600)
+    assert QueryResultCache.key("q", 3, resolve_relative_filters({"since_days": 7, "emotion": "negative"}, 300)) != key
+
+
+def test_since_days_keeps_stricter_created_after(monkeypatch):
+    monkeypatch.setattr(rag_filters, "now_timestamp", lambda: NOW)
+    assert resolve_relative_filters({"since_days": 30, "created_after": NOW - 86400})["created_after"] == NOW - 86400
+    assert build_where({"since_days": 1}) == {"created_at": {"$gte": NOW - 86400}}
+    assert resolve_relative_filters({"emotion": "positive"}) == {"emotion": "positive"}
+
+
+def test_lexical_results_not_cached_while_bm25_reload_pending(tmp_path):
+    """다른 워커가 버전을 올린 뒤 BM25 재적재가 끝나기 전의 결과는 새 버전으로 캐시하지 않음"""
+    release = threading.Event()
+
+    class SlowCollection(FakeCollection):
+        def get(self, *args, **kwargs):
+            if index.loaded:
+                release.wait(5)
+            return super().get(*args, **kwargs)
+
+    col = SlowCollection()
+    col.upsert(ids=["old"], documents=["미니바가 비어 있었어요"], metadatas=[{}])
+    cache, index = make_cache(tmp_path), BM25Index(refresh_seconds=0)
+
+    def search():
+        index.ensure_fresh(col, cache.versions.get(cache.collection))
+        return [{"id": hit["id"]} for hit in index.search("미니바", 3)]
+
+    def lexical(key):
+        matches = cache.get_or_compute(key, search, cacheable=lambda version: index.version == version)
+        return [match["id"] for match in matches]
+
+    key = QueryResultCache.key("미니바", 3, mode="lexical")
+    assert lexical(key) == ["old"]
+
+    # 다른 워커의 쓰기: 문서 교체 + 버전 증가 → 재적재는 아직 진행 중
+    col.delete(ids=["old"])
+    col.upsert(ids=["new"], documents=["미니바 가격이 비싸요"], metadatas=[{}])
+    make_cache(tmp_path).invalidate()
+    assert lexical(key) == ["old"]  # 재적재 전에는 예전 색인으로 답하되
+    assert cache.stats()["uncached"] == 1  # 새 버전 항목으로 저장하지 않음
+
+    release.set()
+    deadline = time.monotonic() + 2
+    while index.version != 1:
+        assert time.monotonic() < deadline, "시간 초과"
+        time.sleep(0.01)
+    assert lexical(key) == ["new"]
+    assert lexical(key) == ["new"] and cache.stats()["hits"] == 1
@@ -0,0 +1,67 @@
+# tests/test_rag_filters.py
+from datetime import datetime, timezone
+import pytest
+from app.services import rag_filters
+from app.services.rag_filters import build_where, matches_where, normalize_emotion, to_timestamp
+
+NOW = 1_700_000_000
+
+
+@pytest.fixture(autouse=True)
+def fixed_now(monkeypatch):
+    monkeypatch.setattr(rag_filters, "now_timestamp", lambda: NOW)
+
+
+def test_normalize_emotion():
+    assert normalize_emotion("부정") == "negative"
+    assert normalize_emotion(" Positive ") == "positive"
+    assert normalize_emotion("") is None
+    assert normalize_emotion(None) is None
+
+
+def test_to_timestamp_accepts_datetime_iso_and_epoch():
+    expected = int(datetime(2024, 1, 2, tzinfo=timezone.utc).timestamp())
+    assert to_timestamp("2024-01-02T00:00:00") == expected  # tz 없으면 UTC
+    assert to_timestamp(datetime(2024, 1, 2, tzinfo=timezone.utc)) == expected
+    assert to_timestamp(expected + 0.7) == expected
+    assert to_timestamp(None) is None
+
+
+def test_build_where_single_and_combined():
+    assert build_where(None) is None
+    assert build_where({}) is None
+    assert build_where({"emotion": "긍정"}) == {"emotion": "positive"}
+    assert build_where({"emotion": ["부정"]}) == {"emotion": "negative"}
+    assert build_where({"emotion": ["부정", "중립"], "user_id": 3}) == {
+        "$and": [{"emotion": {"$in": ["negative", "neutral"]}}, {"user_id": 3}]
+    }
+    assert build_where({"property_id": "hotel-a", "source": []}) == {"property_id": "hotel-a"}
+
+
+def test_build_where_time_range():
+    where = build_where({"since_days": 7, "created_before": NOW})
+    assert where == {"$and": [{"created_at": {"$gte": NOW - 7 * 86400}}, {"created_at": {"$lte": NOW}}]}
+    # since_days 와 created_after 중 더 늦은 시각 사용
+    assert build_where({"since_days": 7, "created_after": NOW - 86400}) == {"created_at": {"$gte": NOW - 86400}}
+
+
+def test_matches_where_operators():
+    metadata = {"emotion": "negative", "user_id": 3, "created_at": NOW}
+    assert matches_where(metadata, None)
+    assert matches_where(metadata, {"emotion": "negative"})
+    assert not matches_where(metadata, {"emotion": {"$ne": "negative"}})
+    assert matches_where(metadata, {"user_id": {"$in": [1, 3]}})
+    assert not matches_where(metadata, {"user_id": {"$nin": [1, 3]}})
+    assert matches_where(metadata, {"created_at": {"$gte": NOW, "$lt": NOW + 1}})
+    assert not matches_where(metadata, {"created_at": {"$gt": NOW}})
+    assert not matches_where({}, {"created_at": {"$gte": 0}})  # 값이 없으면 범위 조건 불일치
+    assert matches_where(metadata, {"$or": [{"emotion": "positive"}, {"user_id": 3}]})
+    assert not matches_where(metadata, {"$and": [{"emotion": "negative"}, {"user_id": 4}]})
+
+
+def test_build_where_output_matches_metadata():
+    filters = {"emotion": ["부정", "중립"], "since_days": 1, "source": "csv"}
+    where = build_where(filters)
+    assert matches_where({"emotion": "negative", "source": "csv", "created_at": NOW - 3600}, where)
+    assert not matches_where({"emotion": "negative", "source": "csv", "created_at": NOW - 2 * 86400}, where)
+    assert not matches_where({"emotion": "positive", "source": "csv", "created_at": NOW}, where)
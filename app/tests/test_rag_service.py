@@ -0,0 +1,152 @@
+# tests/test_rag_service.py
+import os
+import sys
+import types
+import pytest
+from fake_chroma import FakeCollection
+
+pytest.importorskip("pydantic_settings")
+
+# app.config 필수 값 (.env 가 없는 환경용)
+for name in (
+    "OPENAI_API_KEY", "SECRET_KEY", "ALGORITHM", "DATABASE_URL", "CHROMA_DB_PATH",
+    "AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_S3_BUCKET_NAME", "AWS_REGION",
+):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+
+
+def fake_embedding(texts, progress=None):
+    return [[float(len(text)), 1.0, 0.0, 0.0] for text in texts]
+
+
+@pytest.fixture(scope="module")
+def rag_service():
+    """Chroma / OpenAI 에 연결하는 app.vectorstore 대신 인메모리 컬렉션으로 rag_service 로드"""
+    vectorstore = types.ModuleType("app.vectorstore")
+    vectorstore.collection = FakeCollection("feedback_embeddings")
+    vectorstore.collection_name = "feedback_embeddings"
+    vectorstore.chroma_client = types.SimpleNamespace(get_max_batch_size=lambda: 2)
+    vectorstore.embedding_backend = types.SimpleNamespace(dimensions=4)
+    vectorstore.embedding_function = fake_embedding
+    vectorstore.vectors_in_index = False
+    vectorstore.PLACEHOLDER_EMBEDDING = [0.0]
+    vectorstore.get_float_collection = lambda: None
+
+    saved = {name: sys.modules.get(name) for name in ("app.vectorstore", "app.services.rag_service")}
+    sys.modules["app.vectorstore"] = vectorstore
+    sys.modules.pop("app.services.rag_service", None)
+    from app.services import rag_service
+
+    yield rag_service
+    for name, module in saved.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+
+
+@pytest.fixture
+def rs(rag_service, tmp_path, monkeypatch):
+    from app.services.query_cache import CollectionVersion
+    from app.services.rag_stats import RagStats
+
+    monkeypatch.setattr(rag_service, "collection", FakeCollection("feedback_embeddings"))
+    monkeypatch.setattr(rag_service, "rag_stats", RagStats(str(tmp_path / "stats.sqlite")))
+    monkeypatch.setattr(rag_service, "collection_versions", CollectionVersion(str(tmp_path / "versions.sqlite")))
+    monkeypatch.setattr(rag_service, "query_cache", None)
+    monkeypatch.setattr(rag_service.settings, "rag_partition_by", "none")
+    monkeypatch.setattr(rag_service.settings, "vector_backend", "chroma")
+    rag_service.get_vector_index.cache_clear()
+    rag_service.lexical_index.clear()
+    rag_service.near_duplicate_index.clear()
+    return rag_service
+
+
+def write_csv(path, rows):
+    path.write_text("text,emotion\n" + "".join(f"{text},{emotion}\n" for text, emotion in rows), encoding="utf-8")
+    return str(path)
+
+
+def rows_by_source(rs):
+    return sorted((meta["source"], doc) for doc, _, meta in rs.collection.rows.values())
+
+
+def test_upsert_feedback_batch_is_idempotent(rs, monkeypatch):
+    texts = ["객실이 좋아요", "시끄러웠어요", " 객실이 좋아요 ", ""]
+    metadatas = [{"emotion": "긍정"}, {"emotion": "부정"}, {"emotion": "긍정"}, {}]
+    assert rs.upsert_feedback_batch(texts, metadatas) == {"inserted": 2, "updated": 0, "skipped": 2}
+    created_at = {doc_id: row[2]["created_at"] for doc_id, row in rs.collection.rows.items()}
+
+    # 재실행: 같은 메타데이터는 건너뜀, 감정만 바뀐 행은 메타데이터만 갱신 (재임베딩 없음)
+    embedded = []
+    monkeypatch.setattr(
+        rs, "embedding_function", lambda texts, progress=None: embedded.extend(texts) or fake_embedding(texts)
+    )
+    counts = rs.upsert_feedback_batch(["객실이 좋아요", "시끄러웠어요"], [{"emotion": "긍정"}, {"emotion": "중립"}])
+    assert counts == {"inserted": 0, "updated": 1, "skipped": 1}
+    assert embedded == []
+    assert {doc_id: row[2]["created_at"] for doc_id, row in rs.collection.rows.items()} == created_at
+    assert rs.rag_stats.snapshot()["by_emotion"] == {"positive": 1, "neutral": 1}
+
+
+def test_upsert_feedback_batch_scope_source(rs):
+    rs.upsert_feedback_batch(["객실이 좋아요"], [{"source": "a.csv"}], scope_source=True)
+    rs.upsert_feedback_batch(["객실이 좋아요"], [{"source": "b.csv"}], scope_source=True)
+    assert rows_by_source(rs) == [("a.csv", "객실이 좋아요"), ("b.csv", "객실이 좋아요")]
+
+
+def test_sync_feedback_csv_diffs_rows(rs, tmp_path):
+    path = write_csv(tmp_path / "a.csv", [("객실이 좋아요", "긍정"), ("시끄러웠어요", "부정")])
+    assert rs.sync_feedback_csv(path) == {"added": 2, "updated": 0, "deleted": 0, "unchanged": 0}
+
+    write_csv(tmp_path / "a.csv", [("객실이 좋아요", "긍정"), ("조식이 맛있어요", "긍정")])
+    assert rs.sync_feedback_csv(path) == {"added": 1, "updated": 0, "deleted": 1, "unchanged": 1}
+    assert rows_by_source(rs) == [("a.csv", "객실이 좋아요"), ("a.csv", "조식이 맛있어요")]
+
+
+def test_sync_feedback_csv_keeps_other_sources(rs, tmp_path):
+    a = write_csv(tmp_path / "a.csv", [("객실이 좋아요", "긍정")])
+    b = write_csv(tmp_path / "b.csv", [("객실이 좋아요", "긍정")])
+    rs.sync_feedback_csv(a)
+    rs.sync_feedback_csv(b)
+    write_csv(tmp_path / "b.csv", [("다른 문장", "중립")])
+    rs.sync_feedback_csv(b)
+    assert rows_by_source(rs) == [("a.csv", "객실이 좋아요"), ("b.csv", "다른 문장")]
+
+
+def test_sync_feedback_csv_rebuild_counts_every_row(rs, tmp_path):
+    path = write_csv(tmp_path / "a.csv", [("객실이 좋아요", "긍정"), ("시끄러웠어요", "부정")])
+    rs.sync_feedback_csv(path)
+    write_csv(tmp_path / "a.csv", [("객실이 좋아요", "긍정"), ("조식이 맛있어요", "긍정")])
+    assert rs.sync_feedback_csv(path, rebuild=True) == {"added": 2, "updated": 0, "deleted": 2, "unchanged": 0}
+    assert rs.collection.count() == 2
+    assert rs.rag_stats.snapshot()["total_documents"] == 2
+
+
+def test_sync_feedback_csv_ignores_empty_file(rs, tmp_path):
+    path = write_csv(tmp_path / "a.csv", [("객실이 좋아요", "긍정")])
+    rs.sync_feedback_csv(path)
+    write_csv(tmp_path / "a.csv", [])
+    assert rs.sync_feedback_csv(path) == {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    assert rs.collection.count() == 1
+
+
+def test_delete_feedback_updates_near_duplicate_index_in_place(rs, monkeypatch):
+    monkeypatch.setattr(rs.settings, "rag_near_duplicate_enabled", True)
+    rs.add_feedback_to_rag(1, "조식 메뉴가 정말 다양했어요", "긍정")
+    rs.add_feedback_to_rag(1, "직원분들이 친절했어요", "긍정")
+    rs.near_duplicate_index.load_from_collection(rs.collection)
+    [doc_id] = [i for i, row in rs.collection.rows.items() if row[0] == "조식 메뉴가 정말 다양했어요"]
+
+    scans = []
+    get = rs.collection.get
+    monkeypatch.setattr(rs.collection, "get", lambda *a, **k: scans.append(k) or get(*a, **k))
+    rs.delete_feedback([doc_id])
+    assert rs.near_duplicate_index.loaded  # 전체 재구성 없이 삭제된 해시만 제거
+
+    scans.clear()
+    rs.add_feedback_to_rag(1, "조식 메뉴가 정말 다양했어요!", "긍정")  # 지운 문서와 근사 중복이지만 추가됨
+    assert not any("where" not in call and "ids" not in call for call in scans)  # 컬렉션 전체 조회 없음
+    assert rs.collection.count() == 2
@@ -0,0 +1,54 @@
+# tests/test_rag_stats.py
+from fake_chroma import FakeCollection
+from app.services.rag_stats import RagStats
+
+
+def make_stats(tmp_path):
+    return RagStats(str(tmp_path / "stats.sqlite"))
+
+
+def test_apply_counts_by_dimension(tmp_path):
+    stats = make_stats(tmp_path)
+    stats.apply(added=[
+        {"source": "a.csv", "emotion": "negative", "user_id": 1},
+        {"source": "a.csv", "emotion": "positive", "user_id": 1},
+        {"source": "user"},
+    ])
+    snapshot = stats.snapshot()
+    assert snapshot["total_documents"] == 3
+    assert snapshot["by_source"] == {"a.csv": 2, "user": 1}
+    assert snapshot["by_emotion"] == {"negative": 1, "positive": 1, "unknown": 1}
+    assert snapshot["by_user"] == {"1": 2, "unknown": 1}
+    assert snapshot["disk_bytes"] is None and snapshot["reconciled_at"] is None
+
+
+def test_apply_removed_and_metadata_change(tmp_path):
+    stats = make_stats(tmp_path)
+    old = {"source": "a.csv", "emotion": "negative"}
+    stats.apply(added=[old, {"source": "a.csv", "emotion": "neutral"}])
+    stats.apply(added=[{**old, "emotion": "positive"}], removed=[old])  # 감정만 갱신
+    stats.apply(removed=[{"source": "a.csv", "emotion": "neutral"}])
+    snapshot = stats.snapshot()
+    assert snapshot["total_documents"] == 1
+    assert snapshot["by_emotion"] == {"positive": 1}  # 0 이 된 키는 사라짐
+
+
+def test_counters_shared_between_instances(tmp_path):
+    make_stats(tmp_path).apply(added=[{"source": "user"}])
+    assert make_stats(tmp_path).snapshot()["total_documents"] == 1
+
+
+def test_reconcile_replaces_counters_and_reports_drift(tmp_path):
+    stats = make_stats(tmp_path)
+    stats.apply(added=[{"source": "stale"}] * 5)
+    col = FakeCollection()
+    col.upsert(ids=[f"d{i}" for i in range(3)], metadatas=[{"source": "csv", "emotion": "neutral"}] * 3)
+    disk = tmp_path / "chroma"
+    disk.mkdir()
+    (disk / "data.bin").write_bytes(b"x" * 100)
+
+    result = stats.reconcile(col, [str(disk), str(tmp_path / "missing")], batch_size=2)
+    assert result == {"total_documents": 3, "drift": -2, "disk_bytes": 100}
+    snapshot = stats.snapshot()
+    assert snapshot["by_source"] == {"csv": 3}
+    assert snapshot["disk_bytes"] == 100 and snapshot["reconciled_at"] is not None
@@ -1,7 +1,13 @@
 # app/vectorstore.py
 from chromadb import PersistentClient
+from chromadb.api.types import EmbeddingFunction
 from openai import OpenAI
+from functools import lru_cache
 from app.config import settings
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_client import ProgressCallback
+from app.services.embedding_backends import create_embedding_backend
+from app.services.partitioned_collection import PartitionedCollection
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,25 +15,49 @@ logger = logging.getLogger(__name__)
 # ✅ OpenAI 클라이언트
 openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
-def embedding_function(texts: list[str]) -> list[list[float]]:
+# ✅ 임베딩 백엔드 (Settings.embedding_backend: openai / local / hashing)
+embedding_backend = create_embedding_backend(settings, openai_client)
+logger.info(f"🧮 임베딩 백엔드: {embedding_backend.describe()}")
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache | None:
+    """임베딩 캐시 (비활성 또는 초기화 실패 시 None)"""
+    if not settings.embedding_cache_enabled:
+        return None
+    try:
+        cache = EmbeddingCache(settings.embedding_cache_path)
+        logger.info(f"💾 임베딩 캐시 사용: {settings.embedding_cache_path}")
+        return cache
+    except Exception as e:
+        logger.error(f"❌ 임베딩 캐시 초기화 실패, 캐시 없이 진행: {e}")
+        return None
+
+
+def embedding_function(texts: list[str], progress: ProgressCallback | None = None) -> list[list[float]]:
     """
-    OpenAI text-embedding-3-small 모델로 임베딩 벡터 생성
+    설정된 임베딩 백엔드로 벡터 생성 (캐시 가능한 백엔드는 디스크 캐시 우선)
     
     Args:
-        texts: 임베딩할 텍스트 리스트
+        texts: 임베딩할 텍스트 리스트 (요청 한도를 넘으면 자동으로 나눠서 동시 전송)
+        progress: 진행률 콜백 (완료 수, 전체 수) — 캐시 미스만 집계
         
     Returns:
-        임베딩 벡터 리스트
+        임베딩 벡터 리스트 (입력 순서 유지)
         
     Raises:
-        Exception: OpenAI API 호출 실패 시
+        Exception: 임베딩 계산(API 호출 / 로컬 모델) 실패 시
     """
+    if not texts:
+        return []
     try:
-        response = openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=texts
+        cache = get_embedding_cache() if embedding_backend.cacheable else None
+        if cache is None:
+            return embedding_backend.embed(texts, progress)
+        return cache.embed(
+            texts, embedding_backend.model, embedding_backend.dimensions,
+            lambda missing: embedding_backend.embed(missing, progress),
         )
-        return [item.embedding for item in response.data]
     except Exception as e:
         logger.error(f"임베딩 생성 실패: {e}")
         raise
@@ -41,18 +71,114 @@ except Exception as e:
     raise
 
 # ✅ 컬렉션 가져오기 또는 생성
-collection_name = "feedback_embeddings"
+vector_collection_name = "feedback_embeddings"
+
+# VECTOR_BACKEND=numpy + int8: 벡터 원본은 NumPy 인덱스(int8 + float16 재점수용)에만 저장
+# → Chroma 에는 문서 / 메타데이터와 1차원 자리표시 임베딩만 기록 (차원이 달라 별도 컬렉션 사용)
+vectors_in_index = settings.vector_backend == "numpy" and settings.numpy_index_dtype == "int8"
+PLACEHOLDER_EMBEDDING = [0.0]
+collection_name = f"{vector_collection_name}_docs" if vectors_in_index else vector_collection_name
+
+# 메타데이터가 없는 기존 컬렉션은 백엔드 도입 전 기본값(OpenAI)으로 만든 것으로 간주
+_LEGACY_METADATA = {
+    "embedding_backend": "openai",
+    "embedding_model": "text-embedding-3-small",
+    "embedding_dim": 1536,
+}
+
+
+class EmbeddingBackendMismatch(RuntimeError):
+    """컬렉션을 만든 임베딩 백엔드와 현재 설정된 백엔드가 다름"""
+
+
+class _BackendEmbeddingFunction(EmbeddingFunction):
+    """Chroma query_texts / add(documents=...) 도 같은 백엔드로 임베딩하도록 연결"""
+
+    def __call__(self, input):
+        return embedding_function(list(input))
+
+
+def collection_metadata() -> dict:
+    """현재 임베딩 백엔드를 나타내는 컬렉션 메타데이터"""
+    return {
+        "embedding_backend": embedding_backend.name,
+        "embedding_model": embedding_backend.model,
+        "embedding_dim": embedding_backend.dimensions,
+    }
+
 
-def get_collection():
-    """컬렉션 가져오기 (없으면 생성)"""
+def check_collection_backend(col) -> None:
+    """컬렉션 메타데이터와 현재 백엔드 비교 (다르면 EmbeddingBackendMismatch)"""
+    expected = collection_metadata()
+    metadata = dict(col.metadata or {})
+
+    if "embedding_backend" not in metadata:
+        recorded = expected if col.count() == 0 else _LEGACY_METADATA
+        if recorded == expected:
+            # hnsw:* 키는 수정할 수 없으므로 제외하고 기록
+            stamped = {k: v for k, v in metadata.items() if not k.startswith("hnsw:")}
+            col.modify(metadata={**stamped, **expected})
+            logger.info(f"🏷️ 컬렉션 임베딩 메타데이터 기록: {col.name} {expected}")
+            return
+        metadata.update(recorded)
+
+    recorded = {key: metadata.get(key) for key in expected}
+    if recorded != expected:
+        raise EmbeddingBackendMismatch(
+            f"컬렉션 '{col.name}' 은 {recorded} 로 만들어졌지만 현재 설정은 {expected} 입니다. "
+            f"EMBEDDING_BACKEND 설정을 맞추거나 컬렉션을 다시 만드세요."
+        )
+
+
+def get_collection(name: str = collection_name):
+    """컬렉션 가져오기 (없으면 현재 백엔드 메타데이터로 생성, 백엔드가 다르면 거부)"""
     try:
-        collection = chroma_client.get_collection(name=collection_name)
-        logger.info(f"기존 컬렉션 로드: {collection_name}")
+        col = chroma_client.get_collection(name=name, embedding_function=_BackendEmbeddingFunction())
+        logger.info(f"기존 컬렉션 로드: {name}")
     except Exception:
-        collection = chroma_client.create_collection(name=collection_name)
-        logger.info(f"새 컬렉션 생성: {collection_name}")
-    
-    return collection
+        col = chroma_client.create_collection(
+            name=name,
+            metadata=collection_metadata(),
+            embedding_function=_BackendEmbeddingFunction(),
+        )
+        logger.info(f"새 컬렉션 생성: {name}")
+
+    check_collection_backend(col)
+    return col
+
+def _list_collection_names() -> list[str]:
+    # chroma 0.5 는 Collection 객체, 0.6 부터는 이름 목록 반환
+    return [getattr(c, "name", c) for c in chroma_client.list_collections()]
+
+
+def get_partitioned_collection(name: str = collection_name) -> PartitionedCollection:
+    """숙소(+ 연도)별 파티션 컬렉션 묶음 (RAG_PARTITION_BY=property / property_year)"""
+    return PartitionedCollection(
+        name,
+        settings.rag_partition_by,
+        open_collection=get_collection,
+        list_collection_names=_list_collection_names,
+        drop_collection=lambda partition: chroma_client.delete_collection(name=partition),
+        default_property=settings.rag_default_property,
+        max_workers=settings.rag_partition_search_workers,
+    )
+
+
+def get_float_collection():
+    """
+    float 임베딩 컬렉션 (vectors_in_index 모드로 바꾸기 전 데이터, 없으면 None)
+    → NumPy 인덱스가 비어 있을 때 1회 옮겨 담는 용도
+    """
+    if settings.rag_partition_by != "none":
+        return get_partitioned_collection(vector_collection_name)
+    if vector_collection_name not in _list_collection_names():
+        return None
+    return get_collection(vector_collection_name)
+
 
-# 전역 컬렉션 객체
-collection = get_collection()
\ No newline at end of file
+# 전역 컬렉션 객체 (파티션 사용 시 같은 인터페이스의 파티션 묶음)
+collection = (
+    get_collection(collection_name)
+    if settings.rag_partition_by == "none"
+    else get_partitioned_collection(collection_name)
+)
@@ -1,8 +1,12 @@
 # main.py
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from apscheduler.schedulers.background import BackgroundScheduler
 import logging
+from app.config import settings
+from app.services.inference_pool import inference_pool
+from app.services.warmup import run_warmup, warmup_state
 
 logger = logging.getLogger("soulstay.main")
 
@@ -14,10 +18,38 @@ def run_daily_pipeline():
     logger.info("🌙 일일 요약 파이프라인 시작...")
     # 여기에 실제 요약 로직 추가
 
+def reconcile_rag_stats():
+    """RAG 통계 카운터를 실제 컬렉션과 다시 맞춤"""
+    from app.services.rag_service import reconcile_rag_stats as reconcile
+    reconcile()
+
+async def warmup_and_start_pool():
+    """
+    모델 워밍업 → 추론 워커 fork → ready 표시 (서버는 그동안 /health/ready 에 503 응답)
+
+    실패해도 ready 로 표시하되 degraded + error 를 기록 (모델은 첫 요청 때 지연 로드, 추론은 스레드로 처리)
+    """
+    try:
+        if settings.warmup_enabled:
+            await asyncio.to_thread(run_warmup)
+        # 모델 로드 후 추론 워커 fork (inference_pool_size > 0 일 때)
+        await asyncio.to_thread(inference_pool.start)
+    except Exception as e:
+        logger.exception(f"❌ 워밍업 / 추론 풀 시작 실패 — degraded 상태로 트래픽 수신: {e}")
+        warmup_state.record_error(f"startup: {e}")
+        await asyncio.to_thread(inference_pool.shutdown)  # 일부만 뜬 풀은 내리고 스레드 추론 사용
+    warmup_state.mark_ready()
+    if warmup_state.degraded:
+        logger.warning(f"⚠️ 워밍업 일부 실패 — degraded 상태로 트래픽 수신 ({warmup_state.error})")
+    else:
+        logger.info("✅ 워밍업 완료 — 트래픽 수신 준비됨")
+
 # ✅ Lifespan 이벤트 핸들러 (startup/shutdown 통합)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    warmup_task = asyncio.create_task(warmup_and_start_pool())
+
     scheduler.add_job(
         run_daily_pipeline,
         trigger="cron",
@@ -25,12 +57,21 @@ async def lifespan(app: FastAPI):
         minute=0,
         id="daily_summary"
     )
+    scheduler.add_job(
+        reconcile_rag_stats,
+        trigger="interval",
+        minutes=settings.rag_stats_reconcile_minutes,
+        id="rag_stats_reconcile"
+    )
     scheduler.start()
     logger.info("🕒 Scheduler started")
     
     yield  # 서버 실행 중
     
     # Shutdown
+    if not warmup_task.done():
+        warmup_task.cancel()
+    inference_pool.shutdown()
     scheduler.shutdown()
     logger.info("🛑 Scheduler stopped")
 
@@ -42,12 +83,13 @@ app = FastAPI(
 )
 
 # 라우터 등록
-from app.routes import health, auth, chat, emotion, user
+from app.routes import health, auth, chat, emotion, user, rag
 app.include_router(health.router)
 app.include_router(auth.router)
 app.include_router(chat.router)
 app.include_router(emotion.router)
 app.include_router(user.router)
+app.include_router(rag.router)
 
 if __name__ == "__main__":
     import uvicorn
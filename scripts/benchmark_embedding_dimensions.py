@@ -0,0 +1,165 @@
+# scripts/benchmark_embedding_dimensions.py
+import os, sys, csv, time, argparse, tempfile, logging
+import numpy as np
+
+# ✅ SoulStay 루트 경로 인식
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from openai import OpenAI
+from app.config import settings
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_client import EmbeddingClient, logging_progress
+from app.services.numpy_vector_index import NumpyVectorIndex
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+)
+logger = logging.getLogger("soulstay.bench_dimensions")
+
+# 저장 방식: (이름, NumPy 인덱스 dtype — None 이면 Chroma 만 사용, float 재점수 여부)
+# 운영과 같은 구성으로 Chroma 도 함께 적재: float 인덱스는 Chroma 에 float 임베딩을 두고,
+# int8 인덱스는 벡터 원본(float16)을 인덱스에 두고 Chroma 에는 1차원 자리표시 임베딩만 저장
+STORAGES = [
+    ("chroma", None, False),
+    ("float32", "float32", False),
+    ("int8", "int8", False),
+    ("int8+rescore", "int8", True),
+]
+# app.vectorstore.PLACEHOLDER_EMBEDDING 과 같은 값 (vectorstore 는 운영 DB 에 연결하므로 import 하지 않음)
+PLACEHOLDER_EMBEDDING = [0.0]
+
+
+def load_texts(paths: list[str]) -> list[str]:
+    texts = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                text = (row.get("text") or "").strip()
+                if text:
+                    texts[text] = None
+    return list(texts)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def embed(texts: list[str], dims: int, cache: EmbeddingCache, client: OpenAI) -> np.ndarray:
+    """API dimensions 파라미터로 임베딩 (디스크 캐시 사용 → 재실행 시 API 호출 없음)"""
+    model = settings.embedding_openai_model
+    embedder = EmbeddingClient(client, model=model, dimensions=dims, max_concurrency=settings.embedding_max_concurrency)
+    vectors = cache.embed(texts, model, dims, lambda missing: embedder.embed(missing, logging_progress(f"임베딩 {dims}d")))
+    return normalize(np.asarray(vectors, dtype=np.float32))
+
+
+def disk_usage(path: str) -> int:
+    """실제로 할당된 디스크 크기 (du 와 같은 기준, 미리 잡아 둔 희소 파일 영역은 제외)"""
+    return sum(
+        os.stat(os.path.join(root, name)).st_blocks * 512
+        for root, _, files in os.walk(path)
+        for name in files
+    )
+
+
+def build_chroma(path: str, ids: list[str], embeddings: list):
+    from chromadb import PersistentClient
+
+    client = PersistentClient(path=path)
+    col = client.create_collection(name="bench", metadata={"hnsw:space": "l2"})
+    batch = client.get_max_batch_size()
+    for start in range(0, len(ids), batch):
+        end = start + batch
+        col.add(ids=ids[start:end], documents=ids[start:end], embeddings=embeddings[start:end])
+    return col
+
+
+def bench(corpus_ids, corpus, queries, truth, dtype, rescore, top_k, rescore_factor):
+    """→ (recall, p50, p95, 인덱스 디렉터리 바이트, Chroma 디렉터리 바이트)"""
+    with tempfile.TemporaryDirectory(prefix="bench_dims_") as workdir:
+        index_dir, chroma_dir = os.path.join(workdir, "index"), os.path.join(workdir, "chroma")
+        if dtype is None:
+            col = build_chroma(chroma_dir, corpus_ids, corpus.tolist())
+
+            def search(query):
+                return col.query(query_embeddings=[query.tolist()], n_results=top_k, include=[])["ids"][0]
+        else:
+            index = NumpyVectorIndex(index_dir, corpus.shape[1], dtype, rescore_factor)
+            index.upsert(corpus_ids, corpus, corpus_ids)
+            stored = [PLACEHOLDER_EMBEDDING] * len(corpus_ids) if index.quantized else corpus.tolist()
+            build_chroma(chroma_dir, corpus_ids, stored)
+
+            def search(query):
+                return [h["id"] for h in index.search(query, top_k, rescore=rescore)]
+
+        search(queries[0])  # 워밍업
+        timings, recalls = [], []
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            hits = search(query)
+            timings.append(time.perf_counter() - started)
+            recalls.append(len(expected & set(hits)) / len(expected))
+
+        ms = np.asarray(timings) * 1000
+        index_bytes = disk_usage(index_dir) if os.path.isdir(index_dir) else 0
+        return (
+            float(np.mean(recalls)), float(np.percentile(ms, 50)), float(np.percentile(ms, 95)),
+            index_bytes, disk_usage(chroma_dir),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 차원 / 양자화별 recall@k · 검색 지연 · 저장소 디스크 크기 벤치마크")
+    parser.add_argument("--csv", nargs="+", default=["data/feedback_samples.csv"], help="피드백 CSV (text 컬럼)")
+    parser.add_argument("--dims", default="1536,512,256", help="비교할 차원 (쉼표 구분, 첫 값보다 크지 않게)")
+    parser.add_argument("--queries", type=int, default=200, help="코퍼스에서 떼어낼 쿼리 수")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rescore-factor", type=int, default=settings.numpy_index_rescore_factor,
+                        help="int8 재점수 후보 배수 (top_k × N)")
+    parser.add_argument("--truncate", action="store_true",
+                        help="가장 큰 차원 벡터를 잘라 정규화 (API 추가 호출 없음, text-embedding-3 의 dimensions 결과와 동등)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    dims = [int(d) for d in args.dims.split(",")]
+    texts = load_texts(args.csv)
+    if len(texts) <= args.queries:
+        print(f"⚠️ 텍스트가 {len(texts)}개뿐입니다. --queries 를 줄이세요.")
+        return
+
+    # 쿼리는 코퍼스에서 떼어내 자기 자신이 정답이 되지 않도록 함
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(texts))
+    query_rows, corpus_rows = order[:args.queries], order[args.queries:]
+    corpus_ids = [f"t{i}" for i in corpus_rows]
+
+    cache = EmbeddingCache(settings.embedding_cache_path)
+    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    full = embed(texts, dims[0], cache, client)
+
+    # 기준: 가장 큰 차원 float32 정확 검색 결과
+    scores = full[query_rows] @ full[corpus_rows].T
+    top = np.argsort(-scores, axis=1)[:, :args.top_k]
+    truth = [{corpus_ids[j] for j in row} for row in top]
+
+    print(f"📚 코퍼스 {len(corpus_rows)}개 / 쿼리 {len(query_rows)}개 / 기준 {dims[0]}d float32 정확 검색\n")
+    print(
+        f"{'dims':>6} {'저장':>14} {f'recall@{args.top_k}':>10} {'p50(ms)':>9} {'p95(ms)':>9} "
+        f"{'인덱스(MB)':>10} {'Chroma(MB)':>10} {'합계(MB)':>10}"
+    )
+    for dim in dims:
+        vectors = normalize(full[:, :dim]) if args.truncate or dim == dims[0] else embed(texts, dim, cache, client)
+        for name, dtype, rescore in STORAGES:
+            recall, p50, p95, index_bytes, chroma_bytes = bench(
+                corpus_ids, vectors[corpus_rows], vectors[query_rows], truth,
+                dtype, rescore, args.top_k, args.rescore_factor,
+            )
+            print(
+                f"{dim:>6} {name:>14} {recall:>10.3f} {p50:>9.2f} {p95:>9.2f} "
+                f"{index_bytes / 1e6:>10.2f} {chroma_bytes / 1e6:>10.2f} {(index_bytes + chroma_bytes) / 1e6:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# scripts/benchmark_inference_pool.py
+import os, sys, time, asyncio, argparse, logging
+
+# ✅ SoulStay 루트 경로 인식
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.services.inference_pool import InferencePool
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+)
+logger = logging.getLogger("soulstay.bench_pool")
+
+SAMPLE_TEXTS = [
+    "객실이 너무 더러웠어요.",
+    "직원분들이 정말 친절했어요. 다음에 또 오고 싶습니다.",
+    "조식 메뉴가 다양하지 않아서 아쉬웠어요.",
+    "위치는 좋았지만 방음이 잘 안 돼서 밤새 시끄러웠습니다.",
+    "체크인 대기 시간이 길었지만 전반적으로 만족스러웠어요.",
+    "룸서비스가 빠르고 음식도 따뜻했어요.",
+]
+
+
+async def run_once(pool: InferencePool, total: int, batch_size: int, concurrency: int) -> float:
+    """total 개 문장을 batch_size 단위, 최대 concurrency 개 동시 요청으로 처리 → 초당 처리량"""
+    texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] for i in range(total)]
+    batches = [texts[i:i + batch_size] for i in range(0, total, batch_size)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def submit(batch):
+        async with semaphore:
+            return await pool.analyze_batch(batch)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(submit(b) for b in batches))
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추론 프로세스 풀 크기별 처리량 벤치마크")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[0, 1, 2, 4])
+    parser.add_argument("--total", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=None,
+                        help="워커당 torch 스레드 수 (기본: 코어 수 / 풀 크기)")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    print(f"\n🖥️ CPU 코어: {cores}, 문장 수: {args.total}, 배치: {args.batch_size}")
+    print(f"{'pool':>5} {'threads/worker':>15} {'texts/sec':>10}")
+
+    for size in args.sizes:
+        threads = args.threads or max(1, cores // max(1, size))
+        pool = InferencePool(size=size, threads_per_worker=threads)
+        pool.start()
+        try:
+            concurrency = max(1, size) * 2
+            # 워밍업 1회 후 측정
+            asyncio.run(run_once(pool, args.batch_size * max(1, size), args.batch_size, concurrency))
+            throughput = asyncio.run(run_once(pool, args.total, args.batch_size, concurrency))
+        finally:
+            pool.shutdown()
+        label = "off" if size == 0 else str(size)
+        print(f"{label:>5} {threads if size else '-':>15} {throughput:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
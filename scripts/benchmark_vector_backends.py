@@ -0,0 +1,125 @@
+# scripts/benchmark_vector_backends.py
+import os, sys, time, shutil, argparse, tempfile, logging
+import numpy as np
+
+# ✅ SoulStay 루트 경로 인식
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.services.numpy_vector_index import NumpyVectorIndex
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+)
+logger = logging.getLogger("soulstay.bench_vectors")
+
+
+def random_unit_vectors(rng, n: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def generate_chunks(seed: int, total: int, dim: int, chunk: int):
+    """total 개 벡터를 chunk 단위로 생성 (1M × 1536 도 메모리에 한 번에 올리지 않음)"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, total, chunk):
+        n = min(chunk, total - start)
+        yield [f"v{start + i}" for i in range(n)], random_unit_vectors(rng, n, dim)
+
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def latency_stats(seconds: list[float]) -> tuple[float, float]:
+    ms = np.asarray(seconds) * 1000
+    return float(np.percentile(ms, 50)), float(np.percentile(ms, 95))
+
+
+def bench_numpy(workdir, size, dim, dtype, queries, top_k, chunk, seed):
+    index = NumpyVectorIndex(os.path.join(workdir, "numpy"), dim, dtype)
+    started = time.perf_counter()
+    for ids, vectors in generate_chunks(seed, size, dim, chunk):
+        index.upsert(ids, vectors, ids)
+    build = time.perf_counter() - started
+
+    index.search(queries[0], top_k)  # 페이지 캐시 워밍업
+    timings, results = [], []
+    for q in queries:
+        started = time.perf_counter()
+        hits = index.search(q, top_k)
+        timings.append(time.perf_counter() - started)
+        results.append({h["id"] for h in hits})
+    return build, timings, results, dir_size(os.path.join(workdir, "numpy"))
+
+
+def bench_chroma(workdir, size, dim, queries, top_k, chunk, seed):
+    from chromadb import PersistentClient
+
+    path = os.path.join(workdir, "chroma")
+    client = PersistentClient(path=path)
+    col = client.create_collection(name="bench", metadata={"hnsw:space": "l2"})
+    batch = min(chunk, client.get_max_batch_size())
+
+    started = time.perf_counter()
+    for ids, vectors in generate_chunks(seed, size, dim, chunk):
+        for i in range(0, len(ids), batch):
+            col.add(ids=ids[i:i + batch], embeddings=vectors[i:i + batch].tolist(), documents=ids[i:i + batch])
+    build = time.perf_counter() - started
+
+    col.query(query_embeddings=[queries[0].tolist()], n_results=top_k)
+    timings, results = [], []
+    for q in queries:
+        started = time.perf_counter()
+        hits = col.query(query_embeddings=[q.tolist()], n_results=top_k, include=[])
+        timings.append(time.perf_counter() - started)
+        results.append(set(hits["ids"][0]))
+    return build, timings, results, dir_size(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NumPy 정확 검색 vs Chroma(HNSW) 벡터 검색 벤치마크")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--chunk", type=int, default=10_000)
+    parser.add_argument("--skip-chroma-above", type=int, default=None,
+                        help="이 크기보다 크면 Chroma 적재 생략 (1M 적재는 수십 분 걸릴 수 있음)")
+    parser.add_argument("--workdir", default=None, help="인덱스 파일 위치 (기본: 임시 디렉토리)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1234)
+    queries = random_unit_vectors(rng, args.queries, args.dim)
+
+    print(f"\n📐 dim={args.dim}, numpy dtype={args.dtype}, queries={args.queries}, top_k={args.top_k}")
+    print(f"{'size':>9} {'backend':>8} {'build s':>9} {'p50 ms':>8} {'p95 ms':>8} {'disk MB':>9} {'recall':>7}")
+
+    for size in args.sizes:
+        workdir = tempfile.mkdtemp(prefix=f"vecbench_{size}_", dir=args.workdir)
+        try:
+            build, timings, exact, disk = bench_numpy(
+                workdir, size, args.dim, args.dtype, queries, args.top_k, args.chunk, seed=size
+            )
+            p50, p95 = latency_stats(timings)
+            print(f"{size:>9} {'numpy':>8} {build:>9.1f} {p50:>8.2f} {p95:>8.2f} {disk / 1e6:>9.1f} {'1.000':>7}")
+
+            if args.skip_chroma_above is not None and size > args.skip_chroma_above:
+                print(f"{size:>9} {'chroma':>8} {'(생략)':>9}")
+                continue
+
+            build, timings, approx, disk = bench_chroma(
+                workdir, size, args.dim, queries, args.top_k, args.chunk, seed=size
+            )
+            p50, p95 = latency_stats(timings)
+            # numpy 결과(정확한 top-k)를 기준으로 한 Chroma recall@k
+            recall = np.mean([len(a & e) / len(e) for a, e in zip(approx, exact) if e])
+            print(f"{size:>9} {'chroma':>8} {build:>9.1f} {p50:>8.2f} {p95:>8.2f} {disk / 1e6:>9.1f} {recall:>7.3f}")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# scripts/check_onnx_parity.py
+import os, sys, csv, time, argparse, logging
+import numpy as np
+
+# ✅ SoulStay 루트 경로 인식
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.config import settings
+from app.services import local_emotion_model as lem
+from app.services.emotion_onnx import create_onnx_session
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+)
+logger = logging.getLogger("soulstay.onnx_parity")
+
+
+def read_texts(csv_path: str) -> list[str]:
+    with open(csv_path, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        return [row["text"].strip() for row in reader if row.get("text") and row["text"].strip()]
+
+
+def run_logits(fn, texts: list[str], batch_size: int) -> tuple[np.ndarray, float]:
+    """배치 단위로 logits 계산 + 총 소요 시간"""
+    started = time.perf_counter()
+    outputs = [fn(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+    return np.concatenate(outputs, axis=0), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ONNX 백엔드 ↔ torch 감정 분석 결과 비교")
+    parser.add_argument("--csv", default="data/feedback_samples.csv")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--backends", nargs="+", default=["onnx-fp32", "onnx-int8"])
+    args = parser.parse_args()
+
+    tokenizer, model = lem.get_emotion_model()
+    if model is None:
+        logger.error("❌ 감정 분석 모델이 로드되지 않았습니다.")
+        return
+
+    texts = read_texts(args.csv)
+    if not texts:
+        logger.warning(f"⚠️ 비교할 문장이 없습니다: {args.csv}")
+        return
+
+    ref, ref_time = run_logits(lem._torch_logits, texts, args.batch_size)
+    ref_labels = ref.argmax(axis=1)
+    print(f"\n📂 {args.csv} — {len(texts)}개 문장")
+    print(f"{'backend':<10} {'agreement':>10} {'max_drift':>10} {'time(s)':>9} {'speedup':>8}")
+    print(f"{'torch':<10} {1.0:>10.4f} {0.0:>10.5f} {ref_time:>9.3f} {1.0:>7.2f}x")
+
+    for backend in args.backends:
+        session = create_onnx_session(
+            backend, model, tokenizer, lem.MODEL_PATH, settings.emotion_onnx_dir, lem.model_revision()
+        )
+        out, elapsed = run_logits(
+            lambda batch: session.logits(lem._tokenize(batch)), texts, args.batch_size
+        )
+        agreement = float((out.argmax(axis=1) == ref_labels).mean())
+        drift = float(np.abs(out - ref).max())
+        print(f"{backend:<10} {agreement:>10.4f} {drift:>10.5f} {elapsed:>9.3f} {ref_time / elapsed:>7.2f}x")
+
+        # 라벨이 달라진 문장 일부 출력
+        mismatches = np.nonzero(out.argmax(axis=1) != ref_labels)[0][:5]
+        for i in mismatches:
+            print(f"   ↳ 불일치: '{texts[i][:40]}' torch={lem.LABELS[ref_labels[i]]} "
+                  f"{backend}={lem.LABELS[out[i].argmax()]}")
+
+
+if __name__ == "__main__":
+    main()
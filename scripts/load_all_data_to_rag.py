@@ -1,12 +1,14 @@
 # scripts/load_all_data_to_rag.py
-import os, sys, glob, logging, pandas as pd, chardet
-from PyPDF2 import PdfReader
-from docx import Document  # ✅ DOCX 읽기용
+import os, sys, csv, glob, logging, chardet
 
 # ✅ SoulStay 루트 경로 인식 (가장 중요)
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from app.services.rag_service import add_feedback_to_rag, get_rag_status
+from app.config import settings
+from app.services.rag_service import ingest_chunks, delete_feedback, get_rag_status
+from app.services.chunker import chunk_prose, chunk_table
+from app.services.document_extraction import extract_documents
+from app.services.ingest_manifest import IngestManifest
 
 # ✅ 로깅 설정
 logging.basicConfig(
@@ -15,87 +17,118 @@ logging.basicConfig(
 )
 logger = logging.getLogger("soulstay.load_all")
 
-# ✅ PDF 텍스트 추출
-def extract_pdf_text(path: str) -> str:
-    try:
-        reader = PdfReader(path)
-        text = "\n".join([page.extract_text() or "" for page in reader.pages])
-        return text.strip()
-    except Exception as e:
-        logger.error(f"❌ PDF 읽기 실패 ({path}): {e}")
-        return ""
-
-# ✅ DOCX 텍스트 추출
-def extract_docx_text(path: str) -> str:
-    try:
-        doc = Document(path)
-        text = "\n".join([p.text for p in doc.paragraphs])
-        text = text.strip()
-        if not text:
-            logger.warning(f"⚠️ DOCX 내용이 비어있음: {path}")
-        return text
-    except Exception as e:
-        logger.error(f"❌ DOCX 읽기 실패 ({path}): {e}")
-        return ""
-
-# ✅ PDF + DOCX 로드
+def _add_totals(totals: dict, counts: dict):
+    for key, value in counts.items():
+        totals[key] = totals.get(key, 0) + value
+
+# ✅ PDF + DOCX 로드 (변경된 파일만 병렬 추출 → 청크 → upsert)
 def load_docs():
     data_dir = os.path.join("data", "pdfs")
     os.makedirs(data_dir, exist_ok=True)
     files = glob.glob(os.path.join(data_dir, "*.pdf")) + glob.glob(os.path.join(data_dir, "*.docx"))
+
+    manifest = IngestManifest(settings.ingest_manifest_path)
+    stale_ids = set()
+    for path in manifest.missing(files, data_dir):
+        stale_ids.update(manifest.forget(path))
+        logger.info(f"🗑️ 삭제된 파일 정리: {os.path.basename(path)}")
+
     if not files:
         logger.warning("⚠️ data/pdfs 폴더에 PDF/DOCX 파일이 없습니다.")
-        return 0
 
-    logger.info(f"📂 {len(files)}개의 PDF/DOCX 파일을 찾았습니다.")
-    count = 0
-    for path in files:
-        ext = os.path.splitext(path)[1].lower()
-        text = extract_pdf_text(path) if ext == ".pdf" else extract_docx_text(path)
-        if not text:
+    changed, unchanged = manifest.classify(files)
+    logger.info(f"📂 PDF/DOCX {len(files)}개 — 변경 {len(changed)}개, 변경 없음 {len(unchanged)}개")
+
+    totals = {}
+    for path, pages in extract_documents(
+        list(changed), settings.ingest_workers or None, settings.ingest_pages_per_task
+    ):
+        if pages is None:
             continue
         base_name = os.path.basename(path)
-        add_feedback_to_rag(user_id=0, feedback_text=text)
-        logger.info(f"✅ '{base_name}' 등록 완료")
-        count += 1
-    return count
+        chunk_ids = []
+        chunks = chunk_prose(pages, base_name, settings.rag_chunk_tokens, settings.rag_chunk_overlap_tokens)
+        # 청크는 배치 단위로 임베딩 → upsert (이미 등록된 청크는 임베딩 없이 건너뜀)
+        counts = ingest_chunks(chunks, label=base_name, collected_ids=chunk_ids, user_id=0)
+        previous_ids = manifest.record(path, changed[path], chunk_ids)
+        stale_ids.update(set(previous_ids) - set(chunk_ids))
+        manifest.save()
+        _add_totals(totals, counts)
+        logger.info(f"✅ '{base_name}' 등록 완료 {counts}")
+
+    # 변경 / 삭제된 파일의 예전 청크 제거 (다른 파일이 같은 청크를 쓰면 유지)
+    stale_ids -= manifest.referenced_ids()
+    if stale_ids:
+        delete_feedback(list(stale_ids))
+    manifest.save()
 
-# ✅ CSV 인코딩 감지
-def read_csv_safely(csv_path):
-    try:
-        return pd.read_csv(csv_path, encoding="utf-8")
-    except UnicodeDecodeError:
+    logger.info(f"📦 PDF/DOCX 반영 결과: {totals}")
+    return len(changed)
+
+# ✅ CSV 인코딩 감지 (파일 전체를 메모리에 올리지 않고 검사)
+def detect_csv_encoding(csv_path):
+    for enc in ("utf-8", "cp949"):
         try:
-            return pd.read_csv(csv_path, encoding="cp949")
+            with open(csv_path, "r", encoding=enc) as f:
+                while f.read(1 << 20):
+                    pass
+            return enc
         except UnicodeDecodeError:
-            with open(csv_path, "rb") as f:
-                raw_data = f.read(50000)
-                detected = chardet.detect(raw_data)
-                enc = detected.get("encoding", "utf-8")
-                logger.warning(f"⚠️ 인코딩 감지됨: {enc} ({os.path.basename(csv_path)})")
-                return pd.read_csv(csv_path, encoding=enc)
-
-# ✅ CSV 로드
+            continue
+    with open(csv_path, "rb") as f:
+        raw_data = f.read(50000)
+    detected = chardet.detect(raw_data)
+    enc = detected.get("encoding") or "utf-8"
+    logger.warning(f"⚠️ 인코딩 감지됨: {enc} ({os.path.basename(csv_path)})")
+    return enc
+
+# ✅ CSV 로드 (행 묶음 청크, 헤더 반복 / 변경된 CSV 만 다시 청크 → upsert)
 def load_csvs():
     csv_dir = os.path.join("data", "hotel")
     os.makedirs(csv_dir, exist_ok=True)
     csv_files = glob.glob(os.path.join(csv_dir, "*.csv"))
+
+    manifest = IngestManifest(settings.ingest_manifest_path)
+    stale_ids = set()
+    for path in manifest.missing(csv_files, csv_dir):
+        stale_ids.update(manifest.forget(path))
+        logger.info(f"🗑️ 삭제된 CSV 정리: {os.path.basename(path)}")
+
     if not csv_files:
         logger.warning("⚠️ data/hotel 폴더에 CSV 파일이 없습니다.")
-        return 0
 
-    logger.info(f"📊 {len(csv_files)}개의 CSV 파일을 찾았습니다.")
+    changed, unchanged = manifest.classify(csv_files)
+    logger.info(f"📊 CSV {len(csv_files)}개 — 변경 {len(changed)}개, 변경 없음 {len(unchanged)}개")
+    totals = {}
     count = 0
-    for csv_path in csv_files:
+    for csv_path in changed:
+        base_name = os.path.basename(csv_path)
         try:
-            df = read_csv_safely(csv_path)
-            text = df.to_string(index=False)
-            base_name = os.path.basename(csv_path)
-            add_feedback_to_rag(user_id=0, feedback_text=text)
-            logger.info(f"✅ '{base_name}' 등록 완료")
+            chunk_ids = []
+            with open(csv_path, "r", encoding=detect_csv_encoding(csv_path), newline="") as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if not header:
+                    logger.warning(f"⚠️ '{base_name}' 내용이 비어있음")
+                    continue
+                chunks = chunk_table(header, reader, base_name, settings.rag_chunk_tokens)
+                counts = ingest_chunks(chunks, label=base_name, collected_ids=chunk_ids, user_id=0)
+            # 수정된 CSV 의 예전 청크 중 이번에 다시 만들어지지 않은 것은 삭제 대상
+            previous_ids = manifest.record(csv_path, changed[csv_path], chunk_ids)
+            stale_ids.update(set(previous_ids) - set(chunk_ids))
+            manifest.save()
+            _add_totals(totals, counts)
+            logger.info(f"✅ '{base_name}' 등록 완료 {counts}")
             count += 1
         except Exception as e:
             logger.error(f"❌ '{csv_path}' 처리 실패: {e}")
+
+    # 다른 파일이 같은 청크를 쓰면 유지
+    stale_ids -= manifest.referenced_ids()
+    if stale_ids:
+        delete_feedback(list(stale_ids))
+    manifest.save()
+    logger.info(f"📦 CSV 반영 결과: {totals}")
     return count
 
 # ✅ 전체 실행
@@ -104,7 +137,7 @@ def main():
     total_docs = load_docs()
     total_csvs = load_csvs()
     status = get_rag_status()
-    logger.info(f"📦 총 {total_docs}개 문서(PDF/DOCX), {total_csvs}개 CSV 등록 완료")
+    logger.info(f"📦 새로 반영한 문서(PDF/DOCX) {total_docs}개, CSV {total_csvs}개 등록 완료")
     logger.info(f"📊 현재 RAG 문서 총 {status.get('total_documents', '?')}개")
     logger.info("🏁 모든 데이터 등록 완료!")
 
@@ -1,51 +1,79 @@
 # scripts/load_pdf_to_db.py
-import os, glob
-from PyPDF2 import PdfReader
+import os, sys, glob
 from datetime import datetime
+
+# ✅ SoulStay 루트 경로 인식
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.config import settings
 from app.database import SessionLocal
 from app.models.pdf_data import PDFData
+from app.services.document_extraction import extract_documents
+from app.services.ingest_manifest import IngestManifest
 
-def extract_pdf_text(path: str) -> tuple[str, int]:
-    """PDF 파일에서 텍스트와 페이지 수 추출"""
-    try:
-        reader = PdfReader(path)
-        text = ""
-        for page in reader.pages:
-            text += (page.extract_text() or "") + "\n"
-        return text.strip(), len(reader.pages)
-    except Exception as e:
-        print(f"❌ PDF 읽기 실패 ({path}): {e}")
-        return "", 0
+# DB 적재 전용 매니페스트 (RAG 수집 매니페스트와 별도)
+MANIFEST_PATH = os.path.join("data", "cache", "pdf_db_manifest.json")
 
 def load_pdfs_to_db():
-    db = SessionLocal()
     folder = "data/pdfs"
     os.makedirs(folder, exist_ok=True)
 
     pdf_files = glob.glob(os.path.join(folder, "*.pdf"))
+    manifest = IngestManifest(MANIFEST_PATH)
+
+    # ✅ 삭제 / 이름이 바뀐 PDF 의 레코드 정리
+    removed = manifest.missing(pdf_files, folder)
+    if removed:
+        db = SessionLocal()
+        try:
+            for pdf_path in removed:
+                db.query(PDFData).filter(PDFData.file_name == os.path.basename(pdf_path)).delete()
+                manifest.forget(pdf_path)
+                print(f"🗑️ 삭제된 PDF 정리: {os.path.basename(pdf_path)}")
+            db.commit()
+        finally:
+            db.close()
+        manifest.save()
+
     if not pdf_files:
         print("⚠️ data/pdfs 폴더에 PDF 파일이 없습니다.")
         return
 
-    for pdf_path in pdf_files:
-        file_name = os.path.basename(pdf_path)
-        text, page_count = extract_pdf_text(pdf_path)
-        if not text:
-            print(f"⚠️ {file_name}: 내용이 비어있어 건너뜀")
-            continue
-
-        # DB에 저장
-        pdf_record = PDFData(
-            file_name=file_name,
-            page_count=page_count,
-            text_content=text,
-            created_at=datetime.utcnow()
-        )
-        db.add(pdf_record)
-        db.commit()
-        print(f"✅ {file_name} → DB 저장 완료 ({page_count}쪽)")
-
-    db.close()
+    # ✅ 크기 / mtime / 내용 해시가 같은 파일은 다시 파싱하지 않음
+    changed, unchanged = manifest.classify(pdf_files)
+    print(f"📂 PDF {len(pdf_files)}개 — 변경 {len(changed)}개, 변경 없음 {len(unchanged)}개")
+    if not changed:
+        manifest.save()  # 내용은 같고 mtime 만 바뀐 파일의 stat 갱신 (다음 실행에서 다시 해시하지 않도록)
+        print("🏁 변경된 PDF 가 없습니다.")
+        return
+
+    db = SessionLocal()
+    try:
+        # ✅ 페이지 단위 병렬 추출
+        for pdf_path, pages in extract_documents(
+            list(changed), settings.ingest_workers or None, settings.ingest_pages_per_task
+        ):
+            file_name = os.path.basename(pdf_path)
+            text = "\n".join(pages).strip() if pages else ""
+            if not text:
+                print(f"⚠️ {file_name}: 내용이 비어있어 건너뜀")
+                continue
+
+            # 변경된 파일은 예전 레코드를 교체
+            db.query(PDFData).filter(PDFData.file_name == file_name).delete()
+            pdf_record = PDFData(
+                file_name=file_name,
+                page_count=len(pages),
+                text_content=text,
+                created_at=datetime.utcnow()
+            )
+            db.add(pdf_record)
+            db.commit()
+            manifest.record(pdf_path, changed[pdf_path])
+            manifest.save()
+            print(f"✅ {file_name} → DB 저장 완료 ({len(pages)}쪽)")
+    finally:
+        db.close()
     print("🏁 모든 PDF 파일 저장 완료")
 
 if __name__ == "__main__":
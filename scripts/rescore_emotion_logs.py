@@ -0,0 +1,35 @@
+# scripts/rescore_emotion_logs.py
+import os, sys, argparse, logging
+
+# ✅ SoulStay 루트 경로 인식
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.services.rescore_service import rescore_emotion_logs, DEFAULT_CHECKPOINT_PATH
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+)
+logger = logging.getLogger("soulstay.rescore_cli")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="emotion_logs 감정 라벨 재분석 (중단 후 이어서 실행 가능)")
+    parser.add_argument("--batch-size", type=int, default=256, help="추론/UPDATE 배치 크기")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH, help="체크포인트 파일 경로")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 실행")
+    parser.add_argument("--limit", type=int, default=None, help="이번 실행에서 처리할 최대 행 수")
+    args = parser.parse_args()
+
+    summary = rescore_emotion_logs(
+        batch_size=args.batch_size,
+        checkpoint_path=args.checkpoint,
+        resume=not args.restart,
+        limit=args.limit,
+    )
+    print(f"\n📊 처리 {summary['processed']}행 | 변경 {summary['changed']}행 | "
+          f"{summary['rows_per_second']} rows/s | last_id={summary['last_id']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# scripts/sync_feedback_csv.py
+import os, sys, argparse, logging
+
+# ✅ SoulStay 루트 경로 인식
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.services.embedding_client import logging_progress
+from app.services.rag_service import sync_feedback_csv
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+)
+logger = logging.getLogger("soulstay.sync_feedback_csv")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="피드백 CSV ↔ RAG 벡터DB 증분 동기화 (바뀐 행만 임베딩)")
+    parser.add_argument("--csv", default="data/feedback_samples.csv", help="피드백 CSV 경로 (text, emotion 컬럼)")
+    parser.add_argument("--rebuild", action="store_true", help="이 CSV 에서 온 문서를 모두 지우고 다시 적재")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv):
+        print(f"⚠️ CSV 파일이 없습니다: {args.csv}")
+        return
+
+    summary = sync_feedback_csv(args.csv, rebuild=args.rebuild, progress=logging_progress("임베딩"))
+    print(f"\n📊 추가 {summary['added']}행 | 갱신 {summary['updated']}행 | "
+          f"삭제 {summary['deleted']}행 | 변경 없음 {summary['unchanged']}행")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
 # train_emotion_model.py
 import os
+import copy
+import json
+import time
+import argparse
+import numpy as np
 import torch
+import torch.nn.functional as F
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datasets import load_dataset
@@ -12,35 +18,27 @@ from transformers import (
 )
 from sklearn.metrics import accuracy_score, f1_score, confusion_matrix, classification_report
 
-# ✅ 1. 모델 및 토크나이저 불러오기
+# ✅ 기본 설정
 model_name = "monologg/koelectra-base-v3-discriminator"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-
-# ✅ 2. 데이터셋 로드
-dataset = load_dataset("csv", data_files={
+DATA_FILES = {
     "train": "data/hotel/train.csv",
     "test": "data/hotel/test.csv"
-})
-
-# ✅ 3. 토크나이징
-def tokenize(batch):
-    return tokenizer(batch["text"], truncation=True, padding="max_length", max_length=128)
-dataset = dataset.map(tokenize, batched=True)
-
-# ✅ 4. 라벨 인코딩
+}
 labels = {"positive": 0, "negative": 1, "neutral": 2}
-def encode_labels(example):
-    example["labels"] = labels[example["emotion"]]  # emotion 컬럼 기준
-    return example
-dataset = dataset.map(encode_labels)
 
-# ✅ 5. 포맷 설정 (PyTorch 텐서로 변환)
-dataset.set_format(type="torch", columns=["input_ids", "attention_mask", "labels"])
+# ✅ 증류(distillation) 기본값
+DEFAULT_TEACHER = "WhitePeak/bert-base-cased-Korean-sentiment"
+STUDENT_OUTPUT_DIR = "models/emotion_student"
+# 학생 모델 라벨 순서 = app/services/local_emotion_model.LABELS (부정, 중립, 긍정)
+STUDENT_LABELS = ["negative", "neutral", "positive"]
+_LABEL_ALIASES = {
+    "negative": "negative", "neg": "negative", "부정": "negative",
+    "neutral": "neutral", "neu": "neutral", "중립": "neutral",
+    "positive": "positive", "pos": "positive", "긍정": "positive",
+}
 
-# ✅ 6. 모델 정의
-model = AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=3)
 
-# ✅ 7. 평가 함수 정의
+# ✅ 평가 함수 정의
 def compute_metrics(pred):
     preds = pred.predictions.argmax(-1)
     labels_true = pred.label_ids
@@ -48,63 +46,345 @@ def compute_metrics(pred):
     f1 = f1_score(labels_true, preds, average="weighted")
     return {"accuracy": acc, "f1": f1}
 
-# ✅ 8. 학습 설정
-training_args = TrainingArguments(
-    output_dir="models/emotion_classifier",
-    evaluation_strategy="epoch",
-    save_strategy="epoch",
-    num_train_epochs=3,
-    per_device_train_batch_size=8,
-    per_device_eval_batch_size=8,
-    learning_rate=2e-5,
-    weight_decay=0.01,
-    warmup_steps=100,
-    load_best_model_at_end=True,
-    metric_for_best_model="f1",
-    logging_dir="logs",
-    logging_steps=50,
-    save_total_limit=2,
-)
 
-trainer = Trainer(
-    model=model,
-    args=training_args,
-    train_dataset=dataset["train"],
-    eval_dataset=dataset["test"],
-    tokenizer=tokenizer,
-    compute_metrics=compute_metrics,
-)
+def run_finetune():
+    """KoELECTRA 파인튜닝 (기존 학습 모드)"""
+    # ✅ 1. 모델 및 토크나이저 불러오기
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    # ✅ 2. 데이터셋 로드
+    dataset = load_dataset("csv", data_files=DATA_FILES)
+
+    # ✅ 3. 토크나이징
+    def tokenize(batch):
+        return tokenizer(batch["text"], truncation=True, padding="max_length", max_length=128)
+    dataset = dataset.map(tokenize, batched=True)
+
+    # ✅ 4. 라벨 인코딩
+    def encode_labels(example):
+        example["labels"] = labels[example["emotion"]]  # emotion 컬럼 기준
+        return example
+    dataset = dataset.map(encode_labels)
+
+    # ✅ 5. 포맷 설정 (PyTorch 텐서로 변환)
+    dataset.set_format(type="torch", columns=["input_ids", "attention_mask", "labels"])
+
+    # ✅ 6. 모델 정의 (라벨 이름을 config 에 기록 → 증류 시 교사 라벨 순서로 사용)
+    model = AutoModelForSequenceClassification.from_pretrained(
+        model_name,
+        num_labels=3,
+        id2label={i: name for name, i in labels.items()},
+        label2id=labels,
+    )
+
+    # ✅ 8. 학습 설정
+    training_args = TrainingArguments(
+        output_dir="models/emotion_classifier",
+        eval_strategy="epoch",
+        save_strategy="epoch",
+        num_train_epochs=3,
+        per_device_train_batch_size=8,
+        per_device_eval_batch_size=8,
+        learning_rate=2e-5,
+        weight_decay=0.01,
+        warmup_steps=100,
+        load_best_model_at_end=True,
+        metric_for_best_model="f1",
+        logging_dir="logs",
+        logging_steps=50,
+        save_total_limit=2,
+    )
+
+    trainer = Trainer(
+        model=model,
+        args=training_args,
+        train_dataset=dataset["train"],
+        eval_dataset=dataset["test"],
+        tokenizer=tokenizer,
+        compute_metrics=compute_metrics,
+    )
+
+    # ✅ 9. 학습 시작
+    print("🚀 모델 학습 시작...")
+    trainer.train()
+
+    # ✅ 10. 모델 저장
+    os.makedirs("models/emotion_classifier", exist_ok=True)
+    model.save_pretrained("models/emotion_classifier")
+    tokenizer.save_pretrained("models/emotion_classifier")
+    print("✅ 모델 학습 및 저장 완료")
+
+    # ✅ 11. 테스트 평가
+    print("\n📊 테스트 데이터 평가 중...")
+    predictions = trainer.predict(dataset["test"])
+    pred_labels = predictions.predictions.argmax(-1)
+    true_labels = predictions.label_ids
+
+    print("\n📈 Classification Report:")
+    print(classification_report(true_labels, pred_labels, target_names=list(labels.keys())))
+
+    # ✅ 12. 혼동 행렬 시각화
+    cm = confusion_matrix(true_labels, pred_labels)
+    plt.figure(figsize=(8, 6))
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
+                xticklabels=list(labels.keys()), yticklabels=list(labels.keys()))
+    plt.xlabel("Predicted")
+    plt.ylabel("Actual")
+    plt.title("Emotion Classification Confusion Matrix")
+    plt.tight_layout()
+
+    os.makedirs("models", exist_ok=True)
+    plt.savefig("models/confusion_matrix.png", dpi=300, bbox_inches='tight')
+    print("✅ Confusion Matrix 저장 완료: models/confusion_matrix.png")
+    plt.show()
+
+
+# =====================================================================
+# ✅ 증류(distillation) 모드
+# =====================================================================
+
+def teacher_label_permutation(teacher, teacher_labels: list[str] | None = None) -> list[int]:
+    """
+    교사 출력 인덱스 → 학생 라벨 순서(STUDENT_LABELS) 매핑
+    - teacher_labels 가 주어지면 교사 출력 0, 1, 2 번의 라벨로 사용 (--teacher-labels)
+    - 없으면 config.id2label 의 라벨 이름 사용 (예: 파인튜닝 모델)
+    - LABEL_0 처럼 이름으로 알 수 없으면 오류 (순서를 추측하면 라벨이 뒤섞인 채 학습됨)
+    """
+    if teacher.config.num_labels != len(STUDENT_LABELS):
+        raise ValueError(
+            f"교사 모델 라벨 수({teacher.config.num_labels})가 학생 라벨 수({len(STUDENT_LABELS)})와 다릅니다."
+        )
+
+    names = teacher_labels or [str(teacher.config.id2label[i]) for i in range(teacher.config.num_labels)]
+    if len(names) != len(STUDENT_LABELS):
+        raise ValueError(f"교사 라벨은 {len(STUDENT_LABELS)}개여야 합니다: {names}")
+    mapped = [_LABEL_ALIASES.get(str(n).strip().lower()) for n in names]
+    if all(mapped) and len(set(mapped)) == len(STUDENT_LABELS):
+        return [mapped.index(label) for label in STUDENT_LABELS]
+    raise ValueError(
+        f"교사 라벨 {names} 을(를) {STUDENT_LABELS} 에 대응시킬 수 없습니다. "
+        f"--teacher-labels 로 교사 출력 순서대로 지정하세요 (예: --teacher-labels positive,negative,neutral)"
+    )
+
+
+def build_student(teacher, num_layers: int, permutation: list[int]):
+    """교사 설정에서 레이어 수만 줄인 학생 모델 생성 + 교사 가중치로 초기화 (균등 간격 레이어 선택)"""
+    teacher_layers = teacher.config.num_hidden_layers
+    if not 1 <= num_layers < teacher_layers:
+        raise ValueError(f"학생 레이어 수는 1 이상 {teacher_layers} 미만이어야 합니다: {num_layers}")
+
+    config = copy.deepcopy(teacher.config)
+    config.num_hidden_layers = num_layers
+    config.num_labels = len(STUDENT_LABELS)
+    config.id2label = dict(enumerate(STUDENT_LABELS))
+    config.label2id = {name: i for i, name in enumerate(STUDENT_LABELS)}
+    student = AutoModelForSequenceClassification.from_config(config)
+
+    # 교사의 0, k, 2k, ... 번째 레이어를 학생 레이어로 복사
+    picked = np.linspace(0, teacher_layers - 1, num_layers).round().astype(int).tolist()
+    teacher_state = teacher.state_dict()
+    student_state = student.state_dict()
+
+    for key in student_state:
+        source_key = key
+        if ".layer." in key:
+            prefix, rest = key.split(".layer.", 1)
+            index, suffix = rest.split(".", 1)
+            source_key = f"{prefix}.layer.{picked[int(index)]}.{suffix}"
+        if source_key not in teacher_state or teacher_state[source_key].shape != student_state[key].shape:
+            continue
+        value = teacher_state[source_key]
+        # 분류기 출력층은 학생 라벨 순서로 재배열
+        if key.startswith("classifier") and value.shape[0] == len(STUDENT_LABELS):
+            value = value[permutation]
+        student_state[key] = value.clone()
+
+    student.load_state_dict(student_state)
+    print(f"🎓 학생 모델 생성: {num_layers}층 (교사 {teacher_layers}층 중 {picked} 복사)")
+    return student
+
+
+class DistillationTrainer(Trainer):
+    """정답 라벨 CE + 교사 soft label KL 을 함께 최소화"""
+
+    def __init__(self, *args, temperature: float = 2.0, alpha: float = 0.5, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        teacher_logits = inputs.pop("teacher_logits")
+        outputs = model(**inputs)
+        student_logits = outputs.logits
+
+        t = self.temperature
+        kd_loss = F.kl_div(
+            F.log_softmax(student_logits / t, dim=-1),
+            F.softmax(teacher_logits / t, dim=-1),
+            reduction="batchmean",
+        ) * (t * t)
+
+        if "labels" in inputs and self.alpha > 0:
+            ce_loss = F.cross_entropy(student_logits, inputs["labels"])
+            loss = self.alpha * ce_loss + (1 - self.alpha) * kd_loss
+        else:
+            loss = kd_loss
+        return (loss, outputs) if return_outputs else loss
+
+
+def teacher_logits_for(teacher, tokenizer, texts: list[str], permutation: list[int],
+                       batch_size: int = 64) -> np.ndarray:
+    """교사 logits 를 1회만 계산 (학생 라벨 순서로 재배열)"""
+    outputs = []
+    teacher.eval()
+    with torch.no_grad():
+        for i in range(0, len(texts), batch_size):
+            inputs = tokenizer(texts[i:i + batch_size], return_tensors="pt",
+                               truncation=True, padding=True, max_length=128)
+            outputs.append(teacher(**inputs).logits[:, permutation].numpy())
+    return np.concatenate(outputs, axis=0)
+
+
+def benchmark_model(model, tokenizer, texts: list[str], true_labels: list[int],
+                    label_permutation: list[int] | None = None, batch_size: int = 32) -> dict:
+    """같은 CPU 에서 정확도 / 단건 지연 / 배치 처리량 측정"""
+    model.eval()
+    preds = []
+    with torch.no_grad():
+        started = time.perf_counter()
+        for i in range(0, len(texts), batch_size):
+            inputs = tokenizer(texts[i:i + batch_size], return_tensors="pt",
+                               truncation=True, padding=True, max_length=128)
+            logits = model(**inputs).logits
+            if label_permutation is not None:
+                logits = logits[:, label_permutation]
+            preds.extend(logits.argmax(-1).tolist())
+        throughput = len(texts) / (time.perf_counter() - started)
+
+        latencies = []
+        for text in texts[:100]:
+            inputs = tokenizer([text], return_tensors="pt", truncation=True, max_length=128)
+            started = time.perf_counter()
+            model(**inputs)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "accuracy": round(accuracy_score(true_labels, preds), 4),
+        "f1": round(f1_score(true_labels, preds, average="weighted"), 4),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 2),
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)), 2),
+        "throughput_per_sec": round(throughput, 1),
+        "parameters": sum(p.numel() for p in model.parameters()),
+    }
+
+
+def run_distill(teacher_name: str, student_layers: int, epochs: int,
+                temperature: float, alpha: float, output_dir: str, teacher_labels: list[str] | None = None):
+    """교사 soft label 로 4~6층 학생 모델 학습 + 교사/학생 정확도·속도 비교 리포트"""
+    print(f"🚀 증류 학습 시작 (교사: {teacher_name}, 학생: {student_layers}층)")
+    tokenizer = AutoTokenizer.from_pretrained(teacher_name)
+    teacher = AutoModelForSequenceClassification.from_pretrained(teacher_name)
+    permutation = teacher_label_permutation(teacher, teacher_labels)
+    student = build_student(teacher, student_layers, permutation)
+
+    dataset = load_dataset("csv", data_files=DATA_FILES)
+    student_label_ids = {name: i for i, name in enumerate(STUDENT_LABELS)}
+
+    # ✅ 교사 soft label 사전 계산 + 토크나이징
+    for split in ("train", "test"):
+        split_logits = teacher_logits_for(teacher, tokenizer, dataset[split]["text"], permutation)
+        dataset[split] = dataset[split].add_column("teacher_logits", split_logits.tolist())
+
+    def preprocess(batch):
+        encoded = tokenizer(batch["text"], truncation=True, padding="max_length", max_length=128)
+        encoded["labels"] = [student_label_ids[e] for e in batch["emotion"]]
+        return encoded
+    dataset = dataset.map(preprocess, batched=True)
+    columns = [c for c in ("input_ids", "token_type_ids", "attention_mask", "labels", "teacher_logits")
+               if c in dataset["train"].column_names]
+    dataset.set_format(type="torch", columns=columns)
+
+    training_args = TrainingArguments(
+        output_dir=output_dir,
+        eval_strategy="epoch",
+        save_strategy="epoch",
+        num_train_epochs=epochs,
+        per_device_train_batch_size=16,
+        per_device_eval_batch_size=32,
+        learning_rate=5e-5,
+        weight_decay=0.01,
+        warmup_steps=100,
+        load_best_model_at_end=True,
+        metric_for_best_model="f1",
+        logging_dir="logs",
+        logging_steps=50,
+        save_total_limit=2,
+        remove_unused_columns=False,
+    )
+
+    trainer = DistillationTrainer(
+        model=student,
+        args=training_args,
+        train_dataset=dataset["train"],
+        eval_dataset=dataset["test"],
+        tokenizer=tokenizer,
+        compute_metrics=compute_metrics,
+        temperature=temperature,
+        alpha=alpha,
+    )
+    trainer.train()
+
+    os.makedirs(output_dir, exist_ok=True)
+    student.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    print(f"✅ 학생 모델 저장 완료: {output_dir}")
+
+    # ✅ 교사 vs 학생 비교 (같은 CPU, 같은 테스트셋)
+    print("\n📊 교사/학생 정확도 · 속도 비교 중...")
+    test_texts = list(dataset["test"]["text"])
+    true_labels = [student_label_ids[e] for e in dataset["test"]["emotion"]]
+    report = {
+        "teacher": {"name": teacher_name,
+                    **benchmark_model(teacher, tokenizer, test_texts, true_labels, permutation)},
+        "student": {"name": output_dir, "layers": student_layers,
+                    **benchmark_model(student, tokenizer, test_texts, true_labels)},
+        "settings": {"temperature": temperature, "alpha": alpha, "epochs": epochs,
+                     "torch_threads": torch.get_num_threads()},
+    }
+    report["speedup"] = round(
+        report["student"]["throughput_per_sec"] / report["teacher"]["throughput_per_sec"], 2
+    )
+
+    os.makedirs("models", exist_ok=True)
+    report_path = os.path.join("models", "distill_report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n{'model':<8} {'acc':>7} {'f1':>7} {'p50(ms)':>8} {'p95(ms)':>8} {'texts/s':>9} {'params':>12}")
+    for role in ("teacher", "student"):
+        r = report[role]
+        print(f"{role:<8} {r['accuracy']:>7.4f} {r['f1']:>7.4f} {r['latency_ms_p50']:>8.2f} "
+              f"{r['latency_ms_p95']:>8.2f} {r['throughput_per_sec']:>9.1f} {r['parameters']:>12,}")
+    print(f"\n⚡ 처리량 향상: {report['speedup']}x — 리포트 저장: {report_path}")
+    print(f"ℹ️ 서비스 적용: .env 에 EMOTION_MODEL_PATH={output_dir} 설정")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="감정 분류 모델 학습 (파인튜닝 / 증류)")
+    parser.add_argument("--mode", choices=["finetune", "distill"], default="finetune")
+    parser.add_argument("--teacher", default=DEFAULT_TEACHER,
+                        help="교사 모델 (예: WhitePeak/bert-base-cased-Korean-sentiment 또는 models/emotion_classifier)")
+    parser.add_argument("--student-layers", type=int, default=4, help="학생 모델 레이어 수 (4~6 권장)")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--temperature", type=float, default=2.0)
+    parser.add_argument("--alpha", type=float, default=0.5, help="정답 라벨 CE 가중치 (나머지는 KD)")
+    parser.add_argument("--output-dir", default=STUDENT_OUTPUT_DIR)
+    parser.add_argument("--teacher-labels", type=lambda v: [x.strip() for x in v.split(",")], default=None,
+                        help="교사 출력 0,1,2 번의 라벨 (id2label 이 LABEL_0 형태일 때 필수, 예: positive,negative,neutral)")
+    args = parser.parse_args()
 
-# ✅ 9. 학습 시작
-print("🚀 모델 학습 시작...")
-trainer.train()
-
-# ✅ 10. 모델 저장
-os.makedirs("models/emotion_classifier", exist_ok=True)
-model.save_pretrained("models/emotion_classifier")
-tokenizer.save_pretrained("models/emotion_classifier")
-print("✅ 모델 학습 및 저장 완료")
-
-# ✅ 11. 테스트 평가
-print("\n📊 테스트 데이터 평가 중...")
-predictions = trainer.predict(dataset["test"])
-pred_labels = predictions.predictions.argmax(-1)
-true_labels = predictions.label_ids
-
-print("\n📈 Classification Report:")
-print(classification_report(true_labels, pred_labels, target_names=list(labels.keys())))
-
-# ✅ 12. 혼동 행렬 시각화
-cm = confusion_matrix(true_labels, pred_labels)
-plt.figure(figsize=(8, 6))
-sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
-            xticklabels=list(labels.keys()), yticklabels=list(labels.keys()))
-plt.xlabel("Predicted")
-plt.ylabel("Actual")
-plt.title("Emotion Classification Confusion Matrix")
-plt.tight_layout()
-
-os.makedirs("models", exist_ok=True)
-plt.savefig("models/confusion_matrix.png", dpi=300, bbox_inches='tight')
-print("✅ Confusion Matrix 저장 완료: models/confusion_matrix.png")
-plt.show()
+    if args.mode == "distill":
+        run_distill(args.teacher, args.student_layers, args.epochs,
+                    args.temperature, args.alpha, args.output_dir, args.teacher_labels)
+    else:
+        run_finetune()